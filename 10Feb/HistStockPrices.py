@@ -1,13 +1,16 @@
+import sys
+from pathlib import Path
+
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
+
+# Make the shared fintech package importable when run from this folder
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from fintech import price_store, reports
 
 # Load your historical price data
-data = pd.read_csv(
-    r"historical_stock_prices2.csv",
-    index_col="Date",
-    parse_dates=True
-)
+# The CSV in this folder is the source; after the first run it is read back from the price store cache
+store = price_store.PriceStore(fetcher=price_store.FixtureFetcher(Path(__file__).resolve().parent))
+data = store.get("historical_stock_prices2")
 
 # Calculate daily returns
 returns = data["Close"].pct_change().dropna()
@@ -18,13 +21,13 @@ VaR_hist = np.percentile(returns, (1 - confidence_level) * 100)
 
 print(f"Historical VaR (95%): {VaR_hist:.2%}")
 
-# Visualize the returns distribution with VaR marker
-plt.hist(returns, bins=50, alpha=0.75, edgecolor="black")
-plt.axvline(VaR_hist, color="red", linestyle="--", linewidth=2, label="VaR (95%)")
-
-plt.title("Returns Distribution and Historical VaR")
-plt.xlabel("Returns")
-plt.ylabel("Frequency")
-plt.legend()
-plt.grid(alpha=0.3)
-plt.show()
\ No newline at end of file
+# Visualize the returns distribution with VaR marker, rendered headless to a PNG
+# (fintech/reports.py); the histogram is binned with NumPy before drawing
+chart = reports.Chart("returns_distribution_var.png", [reports.Panel(
+    [reports.histogram(returns, bins=50, alpha=0.75, edgecolor="black"),
+     reports.vline(VaR_hist, color="red", linestyle="--", linewidth=2, label="VaR (95%)")],
+    title="Returns Distribution and Historical VaR", xlabel="Returns", ylabel="Frequency",
+    grid={"alpha": 0.3}, legend=True,
+)])
+chart_path = reports.render([chart], reports.report_directory("hist_stock_prices"))[0]
+print(f"Chart saved to: {chart_path}")
@@ -1,21 +1,38 @@
 # Assignment to code using python Calculate VaR for 2 Stocks portfolio and compare all all 3 methods Historical VaR, Parametric VaR, Monte Carlo VaR
 
+import sys
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
-import yfinance as yf
-import matplotlib.pyplot as plt
 from scipy import stats
 from datetime import datetime, timedelta
 
+# Make the shared fintech package importable when run from this folder
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from fintech import backtest, covariance, instrumentation, optimizer, price_store, reports, var_engine
+
 # Configuration
 STOCKS = ['AAPL', 'MSFT']  # Two stocks for portfolio
 WEIGHTS = [0.5, 0.5]  # Equal weights
+WEIGHT_METHOD = "fixed"  # "fixed" uses WEIGHTS, or "min_variance" / "max_sharpe" to optimize them
+WEIGHT_BOUNDS = (0.0, 1.0)  # Long-only bounds per stock for the optimizer
+RISK_FREE_RATE = 0.0  # Annual rate used for the max Sharpe portfolio
+COVARIANCE_METHOD = "sample"  # "sample", "ewma" or "ledoit_wolf"; one estimate shared by VaR and the optimizer
 INITIAL_INVESTMENT = 1000000  # $1 million portfolio
 CONFIDENCE_LEVEL = 0.95  # 95% confidence level
 HOLDING_PERIOD = 1  # 1 day holding period
 START_DATE = '2023-01-01'
 END_DATE = '2025-02-10'  # Adjusted to valid historical date
 MONTE_CARLO_SIMULATIONS = 10000
+BACKTEST_WINDOW = 250  # Rolling window (trading days) for the VaR backtest
+MONTE_CARLO_WORKERS = 1  # Processes for the simulation, results are the same for any value
+REPORT_DIR = reports.report_directory("var_revision")  # Where the charts are saved (reports/var_revision/)
+CHART_WORKERS = reports.chart_workers()  # Processes used to render the charts ($FINTECH_CHART_WORKERS)
+
+# Per-step timings and memory use, written as JSON next to the charts when
+# FINTECH_METRICS is set (e.g. FINTECH_METRICS=1 or FINTECH_METRICS=profile,memory)
+metrics = instrumentation.Recorder.from_environment("VaR_Revision").start()
 
 print("="*70)
 print("Value at Risk (VaR) Analysis for 2-Stock Portfolio")
@@ -30,75 +47,24 @@ print(f"Data Period: {START_DATE} to {END_DATE}")
 print("="*70)
 
 # Step 1: Download historical stock data
-print("\n[Step 1] Downloading historical stock price data...")
-
-try:
-    # Download stocks individually for better reliability
-    stock_data = {}
-    for stock in STOCKS:
-        try:
-            print(f"  Downloading {stock}...")
-            temp_data = yf.download(stock, start=START_DATE, end=END_DATE, progress=False)
-            if not temp_data.empty:
-                if 'Adj Close' in temp_data.columns:
-                    stock_data[stock] = temp_data['Adj Close']
-                elif 'Close' in temp_data.columns:
-                    stock_data[stock] = temp_data['Close']
-                else:
-                    stock_data[stock] = temp_data.iloc[:, 0]
-                print(f"  ✓ {stock}: {len(stock_data[stock])} days downloaded")
-        except Exception as e:
-            print(f"  ✗ Failed to download {stock}: {e}")
-
-    if len(stock_data) >= len(STOCKS):
-        data = pd.DataFrame(stock_data)
-        data = data.dropna()  # Remove any rows with NaN values
-        print(f"\n✓ Successfully downloaded data for all {len(STOCKS)} stocks")
-        print(f"Total: {len(data)} days of historical data")
-        print(f"\nLatest Prices:")
-        print(data.tail())
-    elif len(stock_data) > 0:
-        print(f"\n⚠ Warning: Only {len(stock_data)} of {len(STOCKS)} stocks downloaded")
-        raise ValueError(f"Insufficient stocks. Need {len(STOCKS)}, got {len(stock_data)}")
-    else:
-        raise ValueError("Unable to download any stock data")
-
-except Exception as e:
-    print(f"\n✗ Error downloading data: {e}")
-    print("\nAttempting to use existing CSV files...")
-
-    # Fallback: Try to load from existing CSV files
-    csv_path_aapl = "C:/Users/Jainh/OneDrive/Desktop/FinTech/Advance Web Scrapping/AAPL.csv"
-    csv_path_msft = "C:/Users/Jainh/OneDrive/Desktop/FinTech/Advance Web Scrapping/MSFT.csv"
+print("\n[Step 1] Loading historical stock price data (downloading only missing dates)...")
 
+with metrics.stage("download"):
     try:
-        aapl_data = pd.read_csv(csv_path_aapl, index_col=0, parse_dates=True)
-        msft_data = pd.read_csv(csv_path_msft, index_col=0, parse_dates=True)
+        # Prices come from the local price store, which only downloads dates it has not seen yet
+        store = price_store.PriceStore()
+        data = store.close_prices(STOCKS, START_DATE, END_DATE)
 
-        # Use 'Close' or 'Adj Close' column
-        aapl_close = aapl_data['Adj Close'] if 'Adj Close' in aapl_data.columns else aapl_data['Close']
-        msft_close = msft_data['Adj Close'] if 'Adj Close' in msft_data.columns else msft_data['Close']
+        if data.empty:
+            raise ValueError("Unable to download any stock data")
 
-        data = pd.DataFrame({
-            'AAPL': aapl_close,
-            'MSFT': msft_close
-        })
-
-        # Filter by date range if needed
-        if START_DATE:
-            data = data[data.index >= START_DATE]
-        if END_DATE:
-            data = data[data.index <= END_DATE]
-
-        # Remove any NaN values
-        data = data.dropna()
-
-        print(f"✓ Loaded {len(data)} days of historical data from CSV files")
+        print(f"\n✓ Loaded data for all {len(STOCKS)} stocks")
+        print(f"Total: {len(data)} days of historical data")
         print(f"\nLatest Prices:")
         print(data.tail())
 
-    except Exception as csv_error:
-        print(f"✗ Failed to load from CSV: {csv_error}")
+    except Exception as e:
+        print(f"\n✗ Error loading data: {e}")
         print("\n⚠ Generating sample data for demonstration purposes...")
 
         # Generate synthetic data as last resort
@@ -118,10 +84,31 @@ except Exception as e:
 
 # Step 2: Calculate daily returns
 print("\n[Step 2] Calculating daily returns...")
-returns = data.pct_change().dropna()
+with metrics.stage("returns"):
+    returns = data.pct_change().dropna()
 print(f"\nReturns Statistics:")
 print(returns.describe())
 
+# Daily covariance of the stock returns, estimated once and cached for this run
+with metrics.stage("covariance"):
+    daily_covariance = covariance.estimate(returns, COVARIANCE_METHOD)
+print(f"\nDaily Covariance ({COVARIANCE_METHOD}):")
+print(daily_covariance)
+
+# Optional: choose the weights with the mean-variance optimizer instead of WEIGHTS
+if WEIGHT_METHOD != "fixed":
+    print(f"\n[Step 2b] Optimizing weights ({WEIGHT_METHOD})...")
+    weight_optimizer = optimizer.MeanVarianceOptimizer.from_returns(
+        returns, bounds=WEIGHT_BOUNDS, covariance_method=COVARIANCE_METHOD
+    )
+    if WEIGHT_METHOD == "min_variance":
+        optimal = weight_optimizer.min_variance()
+    else:
+        optimal = weight_optimizer.max_sharpe(risk_free=RISK_FREE_RATE)
+    WEIGHTS = optimal.weights.reindex(returns.columns).tolist()
+    print(f"Optimized Weights: {optimal.weights.round(4).to_dict()}")
+    print(f"Expected Annual Return: {optimal.expected_return:.2%}, Volatility: {optimal.volatility:.2%}")
+
 # Step 3: Calculate portfolio returns
 print("\n[Step 3] Calculating portfolio returns...")
 portfolio_returns = returns.dot(WEIGHTS)
@@ -137,17 +124,15 @@ print("\n" + "="*70)
 print("METHOD 1: HISTORICAL VaR")
 print("="*70)
 
-def historical_var(returns, confidence_level, initial_investment):
-    """
-    Calculate VaR using the historical method (non-parametric).
-    This method uses actual historical returns distribution.
-    """
-    # Find the percentile corresponding to the confidence level
-    var_percentile = np.percentile(returns, (1 - confidence_level) * 100)
-    var_dollar = initial_investment * var_percentile
-    return var_percentile, var_dollar
+# The engine works on the asset returns matrix and a (portfolios x assets) weights matrix
+with metrics.stage("var"):
+    var_results = var_engine.compute_var(
+        returns, [WEIGHTS], CONFIDENCE_LEVEL, HOLDING_PERIOD, INITIAL_INVESTMENT,
+        covariance=daily_covariance, num_simulations=MONTE_CARLO_SIMULATIONS, workers=MONTE_CARLO_WORKERS
+    )
 
-hist_var_pct, hist_var_dollar = historical_var(portfolio_returns, CONFIDENCE_LEVEL, INITIAL_INVESTMENT)
+hist_var_pct = var_results["historical"].var[0, 0, 0]
+hist_var_dollar = var_results["historical"].var_dollar[0, 0, 0]
 
 print(f"\nHistorical VaR at {CONFIDENCE_LEVEL*100}% confidence level:")
 print(f"  - VaR (percentage): {hist_var_pct:.4%}")
@@ -162,26 +147,10 @@ print("\n" + "="*70)
 print("METHOD 2: PARAMETRIC VaR (Variance-Covariance)")
 print("="*70)
 
-def parametric_var(returns, confidence_level, initial_investment):
-    """
-    Calculate VaR using the parametric method.
-    Assumes returns follow a normal distribution.
-    """
-    mean = returns.mean()
-    std = returns.std()
-
-    # Z-score for the given confidence level
-    z_score = stats.norm.ppf(1 - confidence_level)
-
-    # VaR calculation
-    var_percentile = mean + z_score * std
-    var_dollar = initial_investment * var_percentile
-
-    return var_percentile, var_dollar, mean, std
-
-param_var_pct, param_var_dollar, mean_return, std_return = parametric_var(
-    portfolio_returns, CONFIDENCE_LEVEL, INITIAL_INVESTMENT
-)
+param_var_pct = var_results["parametric"].var[0, 0, 0]
+param_var_dollar = var_results["parametric"].var_dollar[0, 0, 0]
+mean_return = portfolio_returns.mean()
+std_return = np.sqrt(np.dot(WEIGHTS, daily_covariance @ WEIGHTS))
 
 print(f"\nParametric VaR at {CONFIDENCE_LEVEL*100}% confidence level:")
 print(f"  - Mean Return: {mean_return:.4%}")
@@ -199,27 +168,13 @@ print("\n" + "="*70)
 print("METHOD 3: MONTE CARLO VaR")
 print("="*70)
 
-def monte_carlo_var(returns, confidence_level, initial_investment, num_simulations=10000):
-    """
-    Calculate VaR using Monte Carlo simulation.
-    Simulates future returns based on historical mean and covariance.
-    """
-    mean = returns.mean()
-    std = returns.std()
-
-    # Simulate returns
-    np.random.seed(42)  # For reproducibility
-    simulated_returns = np.random.normal(mean, std, num_simulations)
-
-    # Calculate VaR
-    var_percentile = np.percentile(simulated_returns, (1 - confidence_level) * 100)
-    var_dollar = initial_investment * var_percentile
-
-    return var_percentile, var_dollar, simulated_returns
-
-mc_var_pct, mc_var_dollar, simulated_returns = monte_carlo_var(
-    portfolio_returns, CONFIDENCE_LEVEL, INITIAL_INVESTMENT, MONTE_CARLO_SIMULATIONS
-)
+mc_var_pct = var_results["monte_carlo"].var[0, 0, 0]
+mc_var_dollar = var_results["monte_carlo"].var_dollar[0, 0, 0]
+# Simulated returns are only kept for the histogram below
+with metrics.stage("simulate"):
+    simulated_returns = var_engine.simulate_portfolio_returns(
+        returns, [WEIGHTS], MONTE_CARLO_SIMULATIONS, covariance=daily_covariance
+    )[:, 0]
 
 print(f"\nMonte Carlo VaR at {CONFIDENCE_LEVEL*100}% confidence level:")
 print(f"  - Number of Simulations: {MONTE_CARLO_SIMULATIONS:,}")
@@ -269,60 +224,44 @@ print("   - Results depend on assumptions and number of simulations")
 # ============================================================================
 print("\n[Creating Visualizations...]")
 
-fig, axes = plt.subplots(2, 2, figsize=(15, 12))
-
-# Plot 1: Portfolio Returns Distribution
-ax1 = axes[0, 0]
-ax1.hist(portfolio_returns, bins=50, alpha=0.7, edgecolor='black')
-ax1.axvline(hist_var_pct, color='r', linestyle='--', linewidth=2, label=f'Historical VaR: {hist_var_pct:.4%}')
-ax1.axvline(param_var_pct, color='g', linestyle='--', linewidth=2, label=f'Parametric VaR: {param_var_pct:.4%}')
-ax1.axvline(mc_var_pct, color='b', linestyle='--', linewidth=2, label=f'Monte Carlo VaR: {mc_var_pct:.4%}')
-ax1.set_xlabel('Daily Returns')
-ax1.set_ylabel('Frequency')
-ax1.set_title('Portfolio Returns Distribution with VaR Levels')
-ax1.legend()
-ax1.grid(True, alpha=0.3)
-
-# Plot 2: Monte Carlo Simulated Returns
-ax2 = axes[0, 1]
-ax2.hist(simulated_returns, bins=50, alpha=0.7, color='blue', edgecolor='black')
-ax2.axvline(mc_var_pct, color='r', linestyle='--', linewidth=2, label=f'VaR: {mc_var_pct:.4%}')
-ax2.set_xlabel('Simulated Returns')
-ax2.set_ylabel('Frequency')
-ax2.set_title(f'Monte Carlo Simulated Returns ({MONTE_CARLO_SIMULATIONS:,} simulations)')
-ax2.legend()
-ax2.grid(True, alpha=0.3)
-
-# Plot 3: VaR Comparison (Dollar Values)
-ax3 = axes[1, 0]
+# Charts are rendered headless (Agg) by fintech/reports.py; long series are
+# downsampled and histograms pre-binned before drawing
 methods = ['Historical', 'Parametric', 'Monte Carlo']
 var_values = [abs(hist_var_dollar), abs(param_var_dollar), abs(mc_var_dollar)]
 colors = ['red', 'green', 'blue']
-bars = ax3.bar(methods, var_values, color=colors, alpha=0.7, edgecolor='black')
-ax3.set_ylabel('VaR (USD)')
-ax3.set_title(f'VaR Comparison at {CONFIDENCE_LEVEL*100}% Confidence Level')
-ax3.grid(True, alpha=0.3, axis='y')
-
-# Add value labels on bars
-for bar, value in zip(bars, var_values):
-    height = bar.get_height()
-    ax3.text(bar.get_x() + bar.get_width()/2., height,
-             f'${value:,.0f}',
-             ha='center', va='bottom', fontweight='bold')
-
-# Plot 4: Cumulative Returns
-ax4 = axes[1, 1]
 cumulative_returns = (1 + portfolio_returns).cumprod()
-ax4.plot(cumulative_returns.index, cumulative_returns.values, linewidth=2)
-ax4.set_xlabel('Date')
-ax4.set_ylabel('Cumulative Return')
-ax4.set_title('Portfolio Cumulative Returns Over Time')
-ax4.grid(True, alpha=0.3)
-ax4.axhline(y=1, color='r', linestyle='--', alpha=0.5)
 
-plt.tight_layout()
-plt.savefig('C:/Users/Jainh/OneDrive/Desktop/FinTech/11Feb/VaR_Analysis.png', dpi=300, bbox_inches='tight')
-print("Visualization saved as 'VaR_Analysis.png'")
+var_chart = reports.Chart("VaR_Analysis.png", shape=(2, 2), figsize=(15, 12), dpi=300, panels=[
+    # Plot 1: Portfolio Returns Distribution
+    reports.Panel([
+        reports.histogram(portfolio_returns, bins=50, alpha=0.7, edgecolor='black'),
+        reports.vline(hist_var_pct, color='r', linestyle='--', linewidth=2, label=f'Historical VaR: {hist_var_pct:.4%}'),
+        reports.vline(param_var_pct, color='g', linestyle='--', linewidth=2, label=f'Parametric VaR: {param_var_pct:.4%}'),
+        reports.vline(mc_var_pct, color='b', linestyle='--', linewidth=2, label=f'Monte Carlo VaR: {mc_var_pct:.4%}'),
+    ], title='Portfolio Returns Distribution with VaR Levels', xlabel='Daily Returns', ylabel='Frequency',
+        grid={"alpha": 0.3}, legend=True),
+    # Plot 2: Monte Carlo Simulated Returns
+    reports.Panel([
+        reports.histogram(simulated_returns, bins=50, alpha=0.7, color='blue', edgecolor='black'),
+        reports.vline(mc_var_pct, color='r', linestyle='--', linewidth=2, label=f'VaR: {mc_var_pct:.4%}'),
+    ], title=f'Monte Carlo Simulated Returns ({MONTE_CARLO_SIMULATIONS:,} simulations)',
+        xlabel='Simulated Returns', ylabel='Frequency', grid={"alpha": 0.3}, legend=True),
+    # Plot 3: VaR Comparison (Dollar Values), with value labels on the bars
+    reports.Panel([
+        reports.bar(methods, var_values, [f'${value:,.0f}' for value in var_values],
+                    color=colors, alpha=0.7, edgecolor='black'),
+    ], title=f'VaR Comparison at {CONFIDENCE_LEVEL*100}% Confidence Level', ylabel='VaR (USD)',
+        grid={"alpha": 0.3, "axis": 'y'}),
+    # Plot 4: Cumulative Returns
+    reports.Panel([
+        reports.line(cumulative_returns.index, cumulative_returns.values, linewidth=2),
+        reports.hline(1, color='r', linestyle='--', alpha=0.5),
+    ], title='Portfolio Cumulative Returns Over Time', xlabel='Date', ylabel='Cumulative Return',
+        grid={"alpha": 0.3}),
+])
+with metrics.stage("charts"):
+    chart_paths = reports.render([var_chart], REPORT_DIR, workers=CHART_WORKERS)
+print(f"Visualization saved as '{chart_paths[0]}'")
 
 # ============================================================================
 # ADDITIONAL ANALYSIS: Conditional VaR (CVaR / Expected Shortfall)
@@ -332,8 +271,8 @@ print("BONUS: CONDITIONAL VAR (CVaR / Expected Shortfall)")
 print("="*70)
 
 # CVaR is the expected loss given that the loss exceeds VaR
-cvar_historical = portfolio_returns[portfolio_returns <= hist_var_pct].mean()
-cvar_historical_dollar = INITIAL_INVESTMENT * cvar_historical
+cvar_historical = var_results["historical"].cvar[0, 0, 0]
+cvar_historical_dollar = var_results["historical"].cvar_dollar[0, 0, 0]
 
 print(f"\nConditional VaR (Expected Shortfall) at {CONFIDENCE_LEVEL*100}% confidence:")
 print(f"  - CVaR (percentage): {cvar_historical:.4%}")
@@ -341,8 +280,49 @@ print(f"  - CVaR (dollar): ${abs(cvar_historical_dollar):,.2f}")
 print(f"\nInterpretation: Given that losses exceed the VaR threshold,")
 print(f"the expected loss is ${abs(cvar_historical_dollar):,.2f}.")
 
+# ============================================================================
+# ADDITIONAL ANALYSIS: Rolling VaR Backtest
+# ============================================================================
 print("\n" + "="*70)
-print("ANALYSIS COMPLETE!")
+print(f"BONUS: ROLLING {BACKTEST_WINDOW}-DAY VaR BACKTEST")
+print("="*70)
+
+if len(portfolio_returns) > BACKTEST_WINDOW:
+    # Each day's VaR is forecast from the previous window and compared with that day's return
+    with metrics.stage("backtest"):
+        backtest_summary = backtest.backtest(portfolio_returns.rename("Portfolio"), BACKTEST_WINDOW, CONFIDENCE_LEVEL)
+    print("\n", backtest_summary[["method", "observations", "exceptions", "expected",
+                                  "kupiec_pvalue", "independence_pvalue",
+                                  "conditional_coverage_pvalue"]].to_string(index=False))
+    print("\nA p-value below 0.05 means the VaR model should be rejected.")
+else:
+    print(f"\nNot enough data for a {BACKTEST_WINDOW}-day backtest ({len(portfolio_returns)} days)")
+
+# ============================================================================
+# ADDITIONAL ANALYSIS: Risk Attribution per Stock
+# ============================================================================
+print("\n" + "="*70)
+print("BONUS: VaR ATTRIBUTION PER STOCK")
 print("="*70)
 
-plt.show()
+# Component VaR (weight x marginal VaR) splits each method's VaR across the stocks;
+# incremental VaR is how much the VaR changes when the stock is dropped
+with metrics.stage("attribution"):
+    attribution = var_engine.attribute_var(
+        returns, WEIGHTS, CONFIDENCE_LEVEL, HOLDING_PERIOD, INITIAL_INVESTMENT,
+        covariance=daily_covariance, num_simulations=MONTE_CARLO_SIMULATIONS
+    )
+for method, result in attribution.items():
+    table = result.to_frame().droplevel(["confidence_level", "holding_period"])
+    print(f"\n{method}:")
+    print(table[["weight", "marginal_var", "component_var_share", "component_var_dollar",
+                 "incremental_var_dollar", "component_cvar_dollar"]].to_string(float_format=lambda value: f"{value:,.4f}"))
+
+metrics_path = metrics.stop().write(instrumentation.metrics_directory(REPORT_DIR))
+if metrics_path is not None:
+    print("\n" + metrics.summary())
+    print(f"Metrics saved to: {metrics_path}")
+
+print("\n" + "="*70)
+print("ANALYSIS COMPLETE!")
+print("="*70)
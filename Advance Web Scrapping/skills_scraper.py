@@ -0,0 +1,51 @@
+# Batch skills scraper: crawl many resume pages and save every extracted skill
+# to one file. Extraction and crawling live in fintech/skills.py.
+#
+#   python skills_scraper.py https://a.example/resume.html https://b.example/cv.html
+#   python skills_scraper.py --urls resume_urls.txt --output skills.parquet --workers 4
+#
+# Works against any web server, e.g. a local one for offline runs:
+#   python -m http.server 8000 --directory resumes
+#   python skills_scraper.py http://localhost:8000/resume1.html http://localhost:8000/resume2.html
+import argparse
+import sys
+from pathlib import Path
+
+# Make the shared fintech package importable when run from this folder
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from fintech.skills import DEFAULT_CACHE, SkillsCrawler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract the skills section from many resume pages.")
+    parser.add_argument("url", nargs="*", help="resume page URLs")
+    parser.add_argument("--urls", help="text file with one URL per line")
+    parser.add_argument("--output", default="extracted_skills.csv", help=".csv or .parquet file to write")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight at once")
+    parser.add_argument("--rate-limit", type=float, default=5, help="requests per second per host")
+    parser.add_argument("--workers", type=int, default=None, help="parse processes (default: parse in-process)")
+    parser.add_argument("--cache", default=str(DEFAULT_CACHE), help="HTML cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="always download every page")
+    args = parser.parse_args()
+
+    urls = list(args.url)
+    if args.urls:
+        urls += Path(args.urls).read_text().splitlines()
+    if not urls:
+        parser.error("give resume page URLs or --urls FILE")
+
+    crawler = SkillsCrawler(max_concurrency=args.concurrency, rate_limit=args.rate_limit,
+                            workers=args.workers, cache_dir=None if args.no_cache else args.cache)
+    try:
+        skills = crawler.crawl(urls, args.output)
+    finally:
+        crawler.close()
+
+    print(skills)
+    print(f"\n{len(skills)} skills from {skills['URL'].nunique()} of {len(urls)} pages saved to: {args.output}")
+    print(f"Downloaded {crawler.stats['fetched']}, unchanged in cache {crawler.stats['not_modified']}, "
+          f"failed {crawler.stats['failed']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,29 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from pandas.io.sas.sas_constants import platform_length
+import sys
+from pathlib import Path
 
-data = pd.read_csv('financial_time_series.csv')
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+from fintech import ingest, reports
+from fintech.rollups import RollupStore
 
-data.info()
+# Daily / weekly / monthly buckets are kept next to the CSV and only the rows
+# appended since the last run are parsed
+source = HERE / "financial_time_series.csv"
+store = RollupStore(source, date_format=ingest.schema_for(source).dates["date"])
+new_bytes = store.refresh()
+print(f"Rollups refreshed ({new_bytes} new bytes read)")
 
-# Convert date datatype to date time
-data["date"] = pd.to_datetime(data["date"], dayfirst=True)
-data.info()
-
-
-data.set_index("date", inplace=True)
 # Daily total transaction amount
-daily_total = data.resample("D")["amount"].sum()
+daily_total = store.query("D")["sum"].rename("amount")
 print(daily_total.head())
 
 
 # Weekly Average transaction amount
-weekly_average = data.resample("W")["amount"].mean()
+weekly_average = store.query("W")["mean"].rename("amount")
 print(weekly_average.head())
 
 # Monthly Average transaction amount
-monthly_average = data.resample("ME")["amount"].mean()
+monthly_average = store.query("ME")["mean"].rename("amount")
 print(monthly_average.head())
 
 # Create readable week labels like "Jan Week 1"
@@ -38,34 +37,37 @@ print(weekly_df[["Week_label", "amount"]])
 
 
 # Monthly total transaction amount
-monthly_total = data.resample("ME")["amount"].sum()
+monthly_total = store.query("ME")["sum"].rename("amount")
 # Convert index to month name
 monthly_df = monthly_total.reset_index()
 # B for full name like JANUARY and b for jan
 monthly_df["Month"] = monthly_df["date"].dt.strftime("%B")
 print(monthly_df[["Month", "amount"]])
 
-# Plot of Month with Total Amount using Seaborn
-plt.figure(figsize = (8,6))
-sns.barplot(x = monthly_df["Month"], y = monthly_df["amount"], palette = "Blues_d")
-plt.xlabel("Month")
-plt.ylabel("Amount")
-plt.show()
-
-# Plot of month with total amount using matplot lib
-plt.figure(figsize = (8,6))
-plt.plot(monthly_df["Month"], monthly_df["amount"])
-plt.title("Monthly total transaction amount")
-plt.xlabel("Month")
-plt.ylabel("Amount")
-plt.show()
-
-# Weekly graph
-plt.figure(figsize = (12,10))
-plt.plot(weekly_df["Week_label"], weekly_df["amount"], marker = "o")
-plt.title("Weekly average transaction")
-plt.xticks(rotation = 90)
-plt.xlabel("Week")
-plt.ylabel("Amount")
-plt.grid(True)
-plt.show()
+# Charts are rendered headless (Agg) to PNG files by fintech/reports.py, into
+# reports/financial_time_series/ (or $FINTECH_REPORT_DIR), in parallel with one
+# process per CPU unless $FINTECH_CHART_WORKERS is set
+REPORT_DIR = reports.report_directory("financial_time_series")
+CHART_WORKERS = reports.chart_workers()
+
+charts = [
+    # Plot of Month with Total Amount (bar colours shaded along the Blues colormap)
+    reports.Chart("monthly_total_bar.png", [reports.Panel(
+        [reports.bar(monthly_df["Month"], monthly_df["amount"],
+                     color=reports.palette("Blues", len(monthly_df)))],
+        xlabel="Month", ylabel="Amount",
+    )]),
+    # Plot of month with total amount as a line
+    reports.Chart("monthly_total_line.png", [reports.Panel(
+        [reports.line(monthly_df["Month"], monthly_df["amount"])],
+        title="Monthly total transaction amount", xlabel="Month", ylabel="Amount",
+    )]),
+    # Weekly graph
+    reports.Chart("weekly_average.png", figsize=(12, 10), panels=[reports.Panel(
+        [reports.line(weekly_df["Week_label"], weekly_df["amount"], marker="o")],
+        title="Weekly average transaction", xlabel="Week", ylabel="Amount",
+        grid={}, xtick_rotation=90,
+    )]),
+]
+for path in reports.render(charts, REPORT_DIR, workers=CHART_WORKERS):
+    print(f"Chart saved to: {path}")
@@ -0,0 +1,15 @@
+"""
+Scaling benchmarks for the fintech package.
+
+generators.py produces any of the repo's datasets at any size (10^3 to 10^8
+rows, or N assets) from a seed, and suite.py times the VaR, cleaning,
+resampling and scoring pipelines on them and records the results as JSON.
+Run from the repository root:
+
+    python -m benchmarks run --sizes 1e3,1e5,1e6 --output before.json
+    python -m benchmarks run --sizes 1e3,1e5,1e6 --output after.json
+    python -m benchmarks compare before.json after.json
+    python -m benchmarks startup       # startup budgets of python -m fintech
+    python -m benchmarks offline       # offline checks: HTTP clients, price store, indicators, Monte Carlo
+    python -m benchmarks generate bank_transactions 1e7 bank_1e7.csv
+"""
@@ -0,0 +1,89 @@
+import argparse
+import sys
+
+from benchmarks import generators, offline, startup, suite
+
+
+def _sizes(text):
+    # "1e3,1e5,250000" -> [1000, 100000, 250000]
+    return [int(float(size)) for size in text.split(",") if size.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Fintech pipeline benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="time the pipelines and save the results as JSON")
+    run.add_argument("benchmark", nargs="*", help=f"benchmarks to run (default: all of {', '.join(suite.BENCHMARKS)})")
+    run.add_argument("--sizes", type=_sizes, default=list(suite.DEFAULT_SIZES), help="comma separated row counts")
+    run.add_argument("--repeat", type=int, default=suite.DEFAULT_REPEAT, help="timed runs per case")
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--assets", type=int, default=generators.DEFAULT_ASSETS, help="assets in the VaR benchmark")
+    run.add_argument("--simulations", type=int, default=10_000, help="Monte Carlo paths in the VaR benchmark")
+    run.add_argument("--output", default="benchmark_results.json")
+
+    boot = commands.add_parser("startup", help="check the CLI's no-plot startup budgets; exit 1 on a failure")
+    boot.add_argument("--repeat", type=int, default=5, help="timed runs per subcommand")
+    boot.add_argument("--output", default="startup_results.json")
+
+    stubs = commands.add_parser("offline", help="check the HTTP clients, price store, indicators and Monte Carlo "
+                                               "offline; exit 1 on a failure")
+    stubs.add_argument("check", nargs="*", help=f"checks to run (default: all of {', '.join(offline.CHECKS)})")
+
+    compare = commands.add_parser("compare", help="compare two result files; exit 1 on a regression")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=suite.DEFAULT_THRESHOLD,
+                         help="allowed slowdown / memory growth as a fraction (0.25 = 25%%)")
+
+    generate = commands.add_parser("generate", help="write a synthetic dataset to CSV")
+    generate.add_argument("dataset", choices=sorted(generators.GENERATORS))
+    generate.add_argument("rows", type=lambda text: int(float(text)))
+    generate.add_argument("output")
+    generate.add_argument("--seed", type=int, default=0)
+    generate.add_argument("--assets", type=int, default=None, help="assets in portfolio_prices")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        options = {"var": {"assets": args.assets, "num_simulations": args.simulations}}
+        document = suite.run(args.benchmark, args.sizes, args.repeat, args.seed, options)
+        suite.save(document, args.output)
+        print(f"\nResults saved to: {args.output}")
+        return 0
+
+    if args.command == "startup":
+        document = startup.run(args.repeat)
+        suite.save(document, args.output)
+        print(f"\nResults saved to: {args.output}")
+        return 1 if startup.failures(document) else 0
+
+    if args.command == "offline":
+        unknown = [name for name in args.check if name not in offline.CHECKS]
+        if unknown:
+            parser.error(f"unknown checks {unknown}; choose from {sorted(offline.CHECKS)}")
+        failed = offline.failures(offline.run(args.check))
+        print(f"\n{len(failed)} check(s) failed." if failed else "\nAll checks passed.")
+        return 1 if failed else 0
+
+    if args.command == "compare":
+        table = suite.compare(suite.load(args.baseline), suite.load(args.current), args.threshold)
+        if table.empty:
+            print("No benchmark cases in common.")
+            return 0
+        print(table.to_string(index=False, float_format=lambda value: f"{value:.4g}"))
+        regressions = table[table["regression"]]
+        if not regressions.empty:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}.")
+            return 1
+        print("\nNo regressions.")
+        return 0
+
+    options = {"assets": args.assets} if args.assets is not None and args.dataset == "portfolio_prices" else {}
+    generators.write_csv(args.dataset, args.output, args.rows, args.seed, **options)
+    print(f"{args.rows:,} rows of {args.dataset} saved to: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""
+Deterministic synthetic versions of the repo's datasets, at any size.
+
+Each generator writes the same columns (names, formats and typical value
+ranges) as the fixture it is modelled on:
+
+    bank_transactions       Data Cleaning/bank_transactions.csv
+    financial_time_series   Financial Time Series/financial_time_series.csv
+    portfolio_prices        updated portfolio management/Updated_Portfolio_Management.csv
+                            (one _Close / _Return pair per asset plus NSE)
+    loan_repayment          MachineLearning2nd/Loan_Repayment_Training_Data.csv
+    house_prices            House Price Prediction/House_Price_Training_Data.csv
+    uncleaned               Data Cleaning/Uncleaned.csv, typos and bad values included
+
+Rows are produced in chunks, each drawn from its own generator seeded with
+(seed, chunk number), so the output depends only on the seed, row count and
+chunk size, and 10^8 rows can be written to disk in bounded memory:
+
+    frame("loan_repayment", 100_000)
+    write_csv("bank_transactions", "bank_1e7.csv", 10_000_000)
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+DEFAULT_ASSETS = 10
+# Transactions are an hour apart while they fit in this span, closer together beyond it
+SPAN_HOURS = 20 * 365 * 24
+
+CHANNELS = ["ATM", "Card", "NetBanking", "UPI"]
+CUSTOMERS = ["Rahul", "Priya", "Ravi", "Anita"]
+TRANSACTION_TYPES = ["Credit", "Debit"]
+FIRST_NAMES = ["Christopher", "Jennifer", "Michael", "Jessica", "David", "Sarah", "James", "Ashley",
+               "Robert", "Amanda", "John", "Emily", "Daniel", "Laura", "Kevin", "Megan"]
+LAST_NAMES = ["Reilly", "Newton", "Smith", "Johnson", "Williams", "Brown", "Garcia", "Miller",
+              "Davis", "Wilson", "Moore", "Taylor", "Anderson", "Thomas", "Jackson", "White"]
+
+
+def _timestamps(start, first, count, state):
+    step = 3600 * min(1.0, SPAN_HOURS / state["rows"])
+    return pd.Timestamp(start) + pd.to_timedelta(np.arange(first, first + count) * step, unit="s")
+
+
+def _bank_transactions(rng, first, count, state, accounts=3):
+    amount = rng.uniform(100, 10_000, count).round(2)
+    # The fixture's balance is the running total of every amount
+    balance = (state.get("balance", 0.0) + np.cumsum(amount)).round(2)
+    state["balance"] = balance[-1]
+    return pd.DataFrame({
+        "transaction_id": [f"TXN{1000 + i}" for i in range(first, first + count)],
+        "account_id": [f"ACC{101 + i}" for i in rng.integers(0, accounts, count)],
+        "customer_name": np.asarray(CUSTOMERS)[rng.integers(0, len(CUSTOMERS), count)],
+        "date": _timestamps("2023-01-01", first, count, state).strftime("%Y-%m-%d %H:%M:%S"),
+        "transaction_type": np.asarray(TRANSACTION_TYPES)[rng.integers(0, 2, count)],
+        "amount": amount,
+        "channel": np.asarray(CHANNELS)[rng.integers(0, len(CHANNELS), count)],
+        "balance": balance,
+    })
+
+
+def _financial_time_series(rng, first, count, state, accounts=3):
+    frame = pd.DataFrame({
+        "transaction_id": [f"TXN{1 + i}" for i in range(first, first + count)],
+        "account_id": [f"ACC{1001 + i}" for i in rng.integers(0, accounts, count)],
+        "date": _timestamps("2023-01-01", first, count, state).strftime("%d-%m-%Y %H:%M"),
+        "amount": rng.uniform(100, 5_000, count).round(2),
+        "transaction_type": np.asarray(TRANSACTION_TYPES)[rng.integers(0, 2, count)],
+    })
+    # The fixture's header ends in two unnamed, empty columns
+    frame[["", " "]] = np.nan
+    return frame.rename(columns={" ": ""})
+
+
+def _portfolio_prices(rng, first, count, state, assets=DEFAULT_ASSETS):
+    # One-factor model: every stock loads on the market return
+    if "betas" not in state:
+        setup = np.random.default_rng([state["seed"], 2 ** 32 - 1])
+        state["betas"] = setup.uniform(0.5, 1.5, assets)
+        state["prices"] = np.concatenate([[12_000.0], setup.uniform(100, 3_000, assets)])
+    market = rng.normal(0.0004, 0.011, count)
+    stocks = market[:, None] * state["betas"] + rng.normal(0.0002, 0.015, (count, assets))
+    returns = np.column_stack([market, stocks])
+    if first == 0:
+        # The first day has a price and no return
+        returns[0] = 0.0
+    prices = state["prices"] * np.cumprod(1 + returns, axis=0)
+    if first == 0:
+        returns[0] = np.nan
+    state["prices"] = prices[-1]
+
+    names = ["NSE"] + [f"STOCK{i + 1}" for i in range(assets)]
+    # Business days by offset, so neither the chunk position nor pandas' date range limits this
+    dates = np.busday_offset("2020-01-01", np.arange(first, first + count), roll="forward")
+    columns = {"Date": np.datetime_as_string(dates, unit="D")}
+    for i, name in enumerate(names):
+        columns[f"{name}_Close"] = prices[:, i]
+        columns[f"{name}_Return"] = returns[:, i]
+    return pd.DataFrame(columns, index=pd.RangeIndex(first, first + count))
+
+
+def _loan_repayment(rng, first, count, state):
+    age = rng.integers(21, 66, count)
+    income = np.clip(rng.gamma(2.7, 4.6, count), 1, 40.23).round(2)
+    borrowed = np.clip(rng.gamma(1.45, 6.9, count), 1, 40).round(2)
+    credit = np.clip(rng.normal(698, 98, count), 300, 900).round().astype(int)
+    tenure = rng.integers(12, 241, count)
+    employment = rng.choice(["Salaried", "Self-Employed", "Unemployed"], count, p=[0.6, 0.3, 0.1])
+    loans = np.minimum(rng.poisson(1.0, count), 7)
+    marital = rng.choice(["Married", "Single"], count, p=[0.61, 0.39])
+    education = rng.choice(["Graduate", "Post-Graduate", "Under-Graduate"], count, p=[0.6, 0.25, 0.15])
+    probability = (0.155 + 0.004 * (income - 12.3) - 0.003 * (borrowed - 9.9) + 0.0003 * (credit - 698)
+                   - 0.01 * (loans - 1) + 0.03 * (employment == "Salaried") - 0.05 * (employment == "Unemployed")
+                   + rng.normal(0, 0.05, count))
+    return pd.DataFrame({
+        "Age": age, "Annual Income (LPA)": income, "Borrowed Amount (LPA)": borrowed,
+        "Credit Score": credit, "Loan Tenure (months)": tenure, "Employment Status": employment,
+        "Existing Loans": loans, "Marital Status": marital, "Education Level": education,
+        "Repayment Probability": np.clip(probability, 0, 1).round(3),
+    })
+
+
+def _house_prices(rng, first, count, state):
+    age = rng.integers(1, 50, count)
+    area = rng.integers(500, 5_000, count)
+    bedrooms = rng.integers(1, 6, count)
+    bathrooms = rng.integers(1, 5, count)
+    distance = rng.uniform(1, 25, count).round(2)
+    crime = rng.uniform(1, 10, count).round(2)
+    schools = rng.integers(1, 6, count)
+    furnishing = rng.choice(["Furnished", "Semi-Furnished", "Unfurnished"], count)
+    locality = rng.choice(["Economy", "Premium", "Standard"], count)
+    parking = rng.integers(0, 3, count)
+    price = (60 + 0.04 * area + 8 * bedrooms + 6 * bathrooms - 1.2 * age - 2.5 * distance - 4 * crime
+             + 3 * schools + 5 * parking + 20 * (furnishing == "Furnished") + 40 * (locality == "Premium")
+             - 30 * (locality == "Economy") + rng.normal(0, 15, count))
+    return pd.DataFrame({
+        "House_Age": age, "Area_sqft": area, "No_of_Bedrooms": bedrooms, "No_of_Bathrooms": bathrooms,
+        "Distance_from_CityCenter_km": distance, "Crime_Rate_Index": crime, "Nearby_Schools": schools,
+        "Furnishing_Status": furnishing, "Locality_Category": locality, "Parking_Space": parking,
+        "Price_Lakhs": np.clip(price, 10, None).round(2),
+    })
+
+
+def _dirty(rng, values, rate, replacements):
+    # Overwrite about `rate` of the values with one of `replacements`
+    values = np.asarray(values, dtype=object)
+    hit = rng.random(len(values)) < rate
+    values[hit] = np.asarray(replacements, dtype=object)[rng.integers(0, len(replacements), hit.sum())]
+    return values
+
+
+def _uncleaned(rng, first, count, state, dirty_rate=0.02):
+    names = (np.asarray(FIRST_NAMES)[rng.integers(0, len(FIRST_NAMES), count)].astype(object) + " "
+             + np.asarray(LAST_NAMES)[rng.integers(0, len(LAST_NAMES), count)])
+    positions = rng.choice(["employee", "Techies", "Manager", "Administrator"], count)
+    salary = rng.uniform(30_000, 150_000, count).round().astype(object)
+    age = rng.integers(22, 60, count).astype(float)
+    hire = pd.Timestamp("2010-01-01") + pd.to_timedelta(rng.integers(0, 5_000, count), unit="D")
+    return pd.DataFrame({
+        "Employee ID": np.arange(first + 1, first + count + 1),
+        "Employee Name": names,
+        "Employee Position": _dirty(rng, positions, dirty_rate / 4, ["Tech@ies"]),
+        "Salary": _dirty(rng, salary, dirty_rate, ["Sixty Thousand", None, 5_000.0, 5_000_000.0]),
+        "Age": _dirty(rng, age, dirty_rate, [None, -5.0, 150.0]).astype(float),
+        "Gender": _dirty(rng, rng.choice(["Female", "Male"], count), dirty_rate,
+                         [None, "Unknown", "Not Disclosed"]),
+        "Department": _dirty(rng, rng.choice(["Manegement", "Sales", "Administration", "Accounts",
+                                              "Human_Resources"], count),
+                             dirty_rate, [None, "Sales&Marketing"]),
+        "Hire Date": _dirty(rng, hire.strftime("%Y-%m-%d"), dirty_rate, [None, "32-14-2020", "InvalidDate"]),
+    })
+
+
+GENERATORS = {
+    "bank_transactions": _bank_transactions,
+    "financial_time_series": _financial_time_series,
+    "portfolio_prices": _portfolio_prices,
+    "loan_repayment": _loan_repayment,
+    "house_prices": _house_prices,
+    "uncleaned": _uncleaned,
+}
+
+
+def generate(name, rows, seed=0, chunk_size=DEFAULT_CHUNK_SIZE, **options):
+    """
+    Yield DataFrame chunks of the `name` dataset, `rows` rows in total.
+    options go to the generator (accounts, assets, dirty_rate).
+    """
+    if name not in GENERATORS:
+        raise ValueError(f"Unknown dataset {name!r}; choose from {sorted(GENERATORS)}")
+    state = {"seed": seed, "rows": rows}
+    for chunk, first in enumerate(range(0, rows, chunk_size)):
+        rng = np.random.default_rng([seed, chunk])
+        yield GENERATORS[name](rng, first, min(chunk_size, rows - first), state, **options)
+
+
+def frame(name, rows, seed=0, **options):
+    """
+    The whole dataset as one DataFrame, indexed 0 .. rows - 1.
+    """
+    chunks = list(generate(name, rows, seed, **options))
+    if not chunks:
+        # No rows: the columns and dtypes of a one-row dataset
+        return frame(name, 1, seed, **options).iloc[:0]
+    return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+
+def write_csv(name, path, rows, seed=0, chunk_size=DEFAULT_CHUNK_SIZE, **options):
+    """
+    Stream the dataset to a CSV file chunk by chunk; returns the path.
+    With rows=0 the file holds just the header.
+    """
+    index = name == "portfolio_prices"
+    chunks = generate(name, rows, seed, chunk_size, **options) if rows else [frame(name, 0, seed, **options)]
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=index)
+    return path
@@ -0,0 +1,335 @@
+"""
+Offline checks of the HTTP clients against local stub servers, of the
+price store's fetch bookkeeping against a local fixture, of the
+indicator engine's precision, and of Monte Carlo VaR reproducibility.
+
+The quote fetcher normally talks to Yahoo Finance, which is neither
+reachable from CI nor predictable. Here it is pointed at a stub server on
+127.0.0.1 that answers with the same JSON layout and fails on purpose (a
+503 before the first success, a 404 for an unknown symbol), so retries,
+error reporting and the TTL cache can be checked without a network.
+
+The resume crawler is run against a static file server (the same handler
+as `python -m http.server`) over a temporary folder of resume pages, twice,
+to check the extraction, the handling of duplicate and missing pages and
+the If-Modified-Since / 304 revalidation of its HTML cache.
+
+The price store is pointed at a counting FixtureFetcher over a temporary
+CSV, to check that repeat get() calls, including ones over a weekend with
+no rows, are answered without fetching, and that editing the CSV is picked
+up.
+
+The indicators are run over a long trending series (20k bars, price from 5
+to 5000), where rolling sums lose precision, and compared with a directly
+computed rolling std, in batch and after thousands of streaming updates.
+
+Monte Carlo VaR is run for one portfolio alone and inside a batch of 500,
+which must draw the same paths, and with a process pool, which must give
+bit-identical results.
+
+Every check returns a list of {"check", "passed", "detail"} results;
+`python -m benchmarks offline` runs them all and exits 1 on a failure.
+"""
+
+import contextlib
+import functools
+import json
+import tempfile
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from fintech import indicators, monte_carlo
+from fintech.price_store import FixtureFetcher, PriceStore
+from fintech.quotes import QuoteFetcher
+from fintech.skills import SkillsCrawler
+
+QUOTES = {
+    "AAPL": {"longName": "Apple Inc.", "regularMarketPrice": 110.0, "previousClose": 100.0},
+    "FLAKY": {"shortName": "Flaky Corp", "regularMarketPrice": 50.0, "previousClose": 40.0},
+}
+
+RESUME = """<html><body><h1>Jane Doe</h1>
+<div id="Skills"><ul><li>Python</li><li>SQL</li><li>Risk modelling</li></ul></div>
+</body></html>"""
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """
+    Request handler that counts requests per path on its server, then
+    delegates to respond().
+    """
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        with self.server.lock:
+            self.server.requests[path] += 1
+            count = self.server.requests[path]
+        self.respond(path, count)
+
+    def send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep the check output readable
+        pass
+
+
+class _QuoteHandler(_StubHandler):
+    """
+    /chart/<symbol> in the Yahoo chart layout. FLAKY answers 503 to its first
+    request, unknown symbols 404.
+    """
+
+    def respond(self, path, count):
+        symbol = path.rsplit("/", 1)[-1]
+        if symbol not in QUOTES:
+            self.send(404)
+        elif symbol == "FLAKY" and count == 1:
+            self.send(503)
+        else:
+            payload = {"chart": {"result": [{"meta": QUOTES[symbol]}]}}
+            self.send(200, json.dumps(payload).encode(), {"Content-Type": "application/json"})
+
+
+class _StaticHandler(SimpleHTTPRequestHandler):
+    """
+    `python -m http.server`, quietly.
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def serve(handler):
+    """
+    Run `handler` on a free local port in a background thread; yields the
+    server, whose base_url is http://127.0.0.1:<port>/.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.requests = Counter()
+    server.lock = threading.Lock()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}/"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def _result(check, passed, detail=""):
+    return {"check": check, "passed": bool(passed), "detail": detail}
+
+
+def check_quotes():
+    """
+    QuoteFetcher against the stub: retries a 503, reports a 404 without
+    failing the batch, computes the change, and serves repeats from its cache.
+    """
+    results = []
+    with serve(_QuoteHandler) as server:
+        fetcher = QuoteFetcher(base_url=server.base_url + "chart", retries=2, backoff=0.01)
+        try:
+            quotes = fetcher.fetch(["aapl", "FLAKY", "MISSING"]).set_index("Symbol")
+            results.append(_result("quotes: batch keeps the symbols that succeed",
+                                   list(quotes.index) == ["AAPL", "FLAKY"], f"got {list(quotes.index)}"))
+            results.append(_result("quotes: change and % change",
+                                   quotes.loc["AAPL", "Change"] == 10.0 and quotes.loc["AAPL", "% Change"] == 10.0,
+                                   quotes.loc["AAPL"].to_dict()))
+            results.append(_result("quotes: 503 is retried",
+                                   server.requests["/chart/FLAKY"] == 2,
+                                   f"{server.requests['/chart/FLAKY']} requests"))
+            results.append(_result("quotes: failed symbol is reported in errors",
+                                   list(fetcher.errors) == ["MISSING"], fetcher.errors))
+
+            fetcher.fetch(["AAPL"])
+            results.append(_result("quotes: repeat within the TTL is served from the cache",
+                                   server.requests["/chart/AAPL"] == 1,
+                                   f"{server.requests['/chart/AAPL']} requests"))
+        finally:
+            fetcher.close()
+    return results
+
+
+def check_crawler():
+    """
+    SkillsCrawler against a static server: extracts the skills, gives a
+    page served under two URLs to both, reports a missing page, and
+    revalidates every cached page with a 304 on the second crawl.
+    """
+    results = []
+    with tempfile.TemporaryDirectory(prefix="fintech-offline-") as workdir:
+        pages = Path(workdir) / "pages"
+        pages.mkdir()
+        (pages / "resume.html").write_text(RESUME)
+        (pages / "copy.html").write_text(RESUME)
+
+        with serve(functools.partial(_StaticHandler, directory=str(pages))) as server:
+            urls = [server.base_url + name for name in ("resume.html", "copy.html", "missing.html")]
+            crawls = []
+            for _ in range(2):
+                crawler = SkillsCrawler(rate_limit=None, retries=0, cache_dir=Path(workdir) / "cache")
+                try:
+                    crawls.append((crawler.crawl(urls), crawler.stats))
+                finally:
+                    crawler.close()
+
+        (skills, first), (again, second) = crawls
+        expected = ["Python", "SQL", "Risk modelling"]
+        results.append(_result("crawler: skills extracted in page order",
+                               skills[skills["URL"] == urls[0]]["Skill"].tolist() == expected,
+                               skills.to_dict("records")))
+        results.append(_result("crawler: identical page under a second URL",
+                               skills[skills["URL"] == urls[1]]["Skill"].tolist() == expected,
+                               skills["URL"].value_counts().to_dict()))
+        results.append(_result("crawler: missing page is counted as failed",
+                               first == {"fetched": 2, "not_modified": 0, "failed": 1}, first))
+        results.append(_result("crawler: second crawl revalidates with 304",
+                               second == {"fetched": 0, "not_modified": 2, "failed": 1}, second))
+        results.append(_result("crawler: cached pages give the same skills",
+                               again.equals(skills), f"{len(again)} vs {len(skills)} rows"))
+    return results
+
+
+class _CountingFetcher(FixtureFetcher):
+    """
+    FixtureFetcher that records every fetch() call.
+    """
+
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.calls = []
+
+    def fetch(self, symbol, start, end):
+        self.calls.append((start, end))
+        return super().fetch(symbol, start, end)
+
+
+def check_price_store():
+    """
+    PriceStore over a fixture: a second get() makes no fetch call, an empty
+    past range (a weekend) is fetched once, and an edited fixture is re-read.
+    """
+    results = []
+    with tempfile.TemporaryDirectory(prefix="fintech-offline-") as workdir:
+        fixture = Path(workdir) / "TEST.csv"
+        # 2024-01-06 / 07 are a weekend
+        fixture.write_text("Date,Close\n2024-01-04,10\n2024-01-05,11\n2024-01-08,12\n")
+        fetcher = _CountingFetcher(workdir)
+        store = PriceStore(root=Path(workdir) / "store", fetcher=fetcher)
+
+        first = store.get("TEST")
+        store.get("TEST")
+        results.append(_result("price store: second get() makes no fetch call",
+                               len(fetcher.calls) == 1 and len(first) == 3, fetcher.calls))
+
+        weekend = PriceStore(root=Path(workdir) / "weekend", fetcher=_CountingFetcher(workdir))
+        weekend.get("TEST", "2024-01-04", "2024-01-06")
+        for _ in range(2):
+            rows = weekend.get("TEST", "2024-01-06", "2024-01-08")
+        results.append(_result("price store: empty past range is fetched once",
+                               len(weekend.fetcher.calls) == 2 and rows.empty, weekend.fetcher.calls))
+
+        with open(fixture, "a") as handle:
+            handle.write("2024-01-09,13\n")
+        calls = len(fetcher.calls)
+        edited = store.get("TEST")
+        results.append(_result("price store: edited fixture is re-read",
+                               len(fetcher.calls) == calls + 1 and edited["Close"].tolist() == [10, 11, 12, 13],
+                               edited["Close"].tolist()))
+    return results
+
+
+def check_indicators(tolerance=1e-8, stream_tolerance=1e-11):
+    """
+    Bollinger std of a trending series, batch and streaming, against the
+    sample std of every window computed directly. The streaming sums are
+    rebuilt every window, so their error must stay at the level of one
+    window's rounding, far below what 20k add/remove updates leave behind.
+    """
+    bars, window = 20_000, 20
+    rng = np.random.default_rng(0)
+    trend = np.exp(np.linspace(np.log(5), np.log(5000), bars))
+    prices = pd.DataFrame(trend[:, None] * np.exp(rng.normal(0, 0.001, (bars, 3)).cumsum(axis=0)))
+    exact = np.lib.stride_tricks.sliding_window_view(prices.to_numpy(), window, axis=0).std(axis=-1, ddof=1)
+
+    middle, upper, _ = indicators.bollinger_bands(prices, window, width=1.0)
+    batch = (upper - middle).to_numpy()[window - 1:]
+    batch_error = float(np.max(np.abs(batch - exact) / exact))
+
+    engine = indicators.IndicatorEngine.from_history(prices.iloc[:window])
+    for row in prices.to_numpy()[window:]:
+        latest = engine.update(row)
+    stream = latest["bollinger_upper"] - latest["bollinger_middle"]
+    stream_error = float(np.max(np.abs(stream / engine.spec.bollinger_width - exact[-1]) / exact[-1]))
+
+    return [
+        _result("indicators: batch rolling std on a trending series",
+                batch_error < tolerance, f"max relative error {batch_error:.2e}"),
+        _result("indicators: streaming rolling std after 20k updates",
+                stream_error < stream_tolerance, f"relative error {stream_error:.2e}"),
+    ]
+
+
+def check_monte_carlo(tolerance=1e-12):
+    """
+    A portfolio's Monte Carlo VaR alone and in a batch of 500: the chunks,
+    and so the paths, do not depend on the batch, leaving only the matrix
+    product's rounding. Two workers must reproduce the serial batch exactly.
+    """
+    assets, portfolios, paths = 10, 500, 100_000
+    rng = np.random.default_rng(0)
+    factor = rng.normal(0, 0.01, (assets, assets))
+    mean, cov = rng.normal(0, 1e-4, assets), factor @ factor.T
+    weights = rng.dirichlet(np.ones(assets), portfolios)
+
+    batch = monte_carlo.correlated_var(mean, cov, weights, [0.95, 0.99], num_simulations=paths)
+    alone = monte_carlo.correlated_var(mean, cov, weights[7:8], [0.95, 0.99], num_simulations=paths)
+    error = max(float(np.max(np.abs(b[7] - a[0]) / np.abs(a[0]))) for b, a in zip(batch, alone))
+    pooled = monte_carlo.correlated_var(mean, cov, weights, [0.95, 0.99], num_simulations=paths, workers=2)
+    return [
+        _result("monte carlo: a portfolio's VaR does not depend on its batch",
+                error < tolerance, f"max relative difference {error:.2e}"),
+        _result("monte carlo: two workers reproduce the serial batch",
+                all(np.array_equal(b, p) for b, p in zip(batch, pooled))),
+    ]
+
+
+CHECKS = {
+    "quotes": check_quotes,
+    "crawler": check_crawler,
+    "price_store": check_price_store,
+    "indicators": check_indicators,
+    "monte_carlo": check_monte_carlo,
+}
+
+
+def run(names=None, log=print):
+    """
+    Run the named checks (default: all) and return every result.
+    """
+    results = []
+    for name in names or CHECKS:
+        for result in CHECKS[name]():
+            results.append(result)
+            if log:
+                log(f"{'ok' if result['passed'] else 'FAIL':<6}{result['check']}"
+                    + ("" if result["passed"] else f"  ({result['detail']})"))
+    return results
+
+
+def failures(results):
+    return [result for result in results if not result["passed"]]
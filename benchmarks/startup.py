@@ -0,0 +1,113 @@
+"""
+Startup budget of the fintech CLI's no-plot paths.
+
+Short scheduled jobs spend most of their time starting the interpreter and
+importing libraries, so every subcommand in fintech.cli.STARTUP_BUDGETS is
+run in a fresh interpreter on a tiny generated input, timed from launch to
+exit, and checked against its budget. One more run with -X importtime lists
+the modules it loaded; any of fintech.cli.DEFERRED_MODULES (plotting, scipy,
+yfinance, ...) that the subcommand does not need is reported as a leak.
+"""
+
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks import generators
+from benchmarks.suite import ROOT, environment
+from fintech import cli
+
+TINY_ROWS = 200
+
+
+def _inputs(workdir, seed):
+    """
+    Command line arguments of every budgeted subcommand, on tiny files in workdir.
+    """
+    from sklearn.linear_model import LinearRegression
+
+    from fintech.encoding import CategoricalEncoder
+    from fintech.scoring import ScoringModel
+
+    workdir = Path(workdir)
+    prices = generators.frame("portfolio_prices", TINY_ROWS, seed, assets=2)
+    prices.set_index("Date")[["STOCK1_Close", "STOCK2_Close"]].to_csv(workdir / "prices.csv")
+    generators.write_csv("uncleaned", workdir / "Uncleaned.csv", TINY_ROWS, seed)
+    generators.write_csv("bank_transactions", workdir / "bank_transactions.csv", TINY_ROWS, seed)
+    generators.write_csv("financial_time_series", workdir / "financial_time_series.csv", TINY_ROWS, seed)
+
+    # A saved model to score with; fitted here so the timed run only loads it
+    loans = generators.frame("loan_repayment", TINY_ROWS, seed)
+    target = "Repayment Probability"
+    categorical = ["Employment Status", "Marital Status", "Education Level"]
+    numeric = [column for column in loans if column not in categorical and column != target]
+    encoder = CategoricalEncoder(categorical).fit(loans)
+    model = LinearRegression().fit(encoder.transform(loans, numeric), loans[target])
+    ScoringModel.from_encoder(model, encoder, numeric, target=target).save(workdir / "model.npz")
+    loans.drop(columns=target).to_csv(workdir / "loans.csv", index=False)
+
+    return {
+        "var": ["--prices", workdir / "prices.csv", "--simulations", "1000"],
+        "clean": [workdir / "Uncleaned.csv", workdir / "cleaned.csv"],
+        "txn-analytics": [workdir / "bank_transactions.csv"],
+        "timeseries": [workdir / "financial_time_series.csv"],
+        "score": [workdir / "model.npz", workdir / "loans.csv", workdir / "scored.csv"],
+    }
+
+
+def _run(command, arguments, importtime=False):
+    flags = ["-X", "importtime"] if importtime else []
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, *flags, "-m", "fintech", command, *map(str, arguments)],
+                             cwd=ROOT, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if process.returncode != 0:
+        raise RuntimeError(f"fintech {command} failed:\n{process.stderr[-2000:]}")
+    return elapsed, process.stderr
+
+
+def _imported(importtime_log):
+    # Lines look like "import time:   self [us] | cumulative | imported package"
+    modules = set()
+    for line in importtime_log.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            name = line.rsplit("|", 1)[1].strip()
+            if name != "imported package":
+                modules.add(name.split(".")[0])
+    return modules
+
+
+def run(repeat=5, seed=0, log=print):
+    """
+    Results document in the suite.run() format, one result per subcommand,
+    with its budget, whether it met it and the deferred modules it leaked.
+    """
+    results = []
+    with tempfile.TemporaryDirectory(prefix="fintech-startup-") as workdir:
+        inputs = _inputs(workdir, seed)
+        for command, budget in cli.STARTUP_BUDGETS.items():
+            arguments = inputs[command]
+            times = [_run(command, arguments)[0] for _ in range(repeat)]
+            allowed = set(cli.STARTUP_ALLOWED.get(command, ()))
+            leaked = sorted(_imported(_run(command, arguments, importtime=True)[1])
+                            & set(cli.DEFERRED_MODULES) - allowed)
+            result = {
+                "benchmark": f"startup:{command}", "size": TINY_ROWS, "options": {}, "repeat": repeat,
+                "seconds_min": min(times), "seconds_median": sorted(times)[len(times) // 2],
+                "seconds_all": times, "peak_memory_bytes": None,
+                "budget_seconds": budget, "within_budget": min(times) <= budget,
+                "leaked_modules": leaked,
+            }
+            results.append(result)
+            if log:
+                status = "ok" if result["within_budget"] and not leaked else "FAIL"
+                log(f"{command:<15}{result['seconds_min']:8.3f} s  (budget {budget:.1f} s)  {status}"
+                    + (f"  imports {', '.join(leaked)}" if leaked else ""))
+    return {"environment": environment(), "seed": seed, "results": results}
+
+
+def failures(document):
+    return [result for result in document["results"]
+            if not result["within_budget"] or result["leaked_modules"]]
@@ -0,0 +1,229 @@
+"""
+Timed, memory-profiled benchmarks of the fintech pipelines.
+
+Every benchmark prepares its input from benchmarks.generators outside the
+timed region and returns the call to time:
+
+    var         compute_var (historical, parametric, Monte Carlo) on a
+                `size`-day return history of `assets` stocks
+    cleaning    CleaningEngine with the Data Cleaning/1st.py spec on `size`
+                Uncleaned.csv-style rows
+    resampling  RollupStore refresh plus daily / weekly / monthly queries of
+                a `size`-row financial_time_series.csv-style file
+    scoring     ScoringModel.predict on `size` loan applications
+
+var, cleaning and scoring time in-memory calls, so their input is built as
+one DataFrame (about 100-200 bytes per row before the pipeline's own working
+copies) and run() refuses sizes above MAX_IN_MEMORY_ROWS (10^7) for them.
+resampling reads a CSV written chunk by chunk with generators.write_csv and
+streams it, so it is the one benchmark that reaches 10^8 rows.
+
+run() times each (benchmark, size) `repeat` times with perf_counter, then
+runs it once more under tracemalloc for the peak traced allocation (NumPy
+and pandas buffers included), and returns a JSON-ready document tagged with
+the git commit and library versions. compare() lines two such documents up
+and flags every case that got slower or bigger than the threshold.
+"""
+
+import gc
+import itertools
+import json
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import scipy
+from sklearn.linear_model import LinearRegression
+
+from benchmarks import generators
+from fintech.cleaning import UNCLEANED_SPEC, CleaningEngine
+from fintech.encoding import CategoricalEncoder
+from fintech.rollups import RollupStore
+from fintech.scoring import ScoringModel
+from fintech.var_engine import compute_var
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.25
+# Largest size of the benchmarks whose input is held in memory
+MAX_IN_MEMORY_ROWS = 10 ** 7
+ROOT = Path(__file__).resolve().parents[1]
+
+
+# ----------------------------------------------------------------------
+# Benchmarks: each takes (size, workdir, seed, options) and returns the call to time
+# ----------------------------------------------------------------------
+def var_benchmark(size, workdir, seed, assets=generators.DEFAULT_ASSETS, num_simulations=10_000):
+    prices = generators.frame("portfolio_prices", size + 1, seed, assets=assets)
+    columns = [column for column in prices if column.endswith("_Return") and column != "NSE_Return"]
+    returns = prices[columns].dropna().to_numpy()
+    weights = np.full(assets, 1 / assets)
+    return lambda: compute_var(returns, weights, (0.95, 0.99), (1, 10), 100_000,
+                               num_simulations=num_simulations)
+
+
+def cleaning_benchmark(size, workdir, seed):
+    data = generators.frame("uncleaned", size, seed)
+    engine = CleaningEngine(UNCLEANED_SPEC)
+    return lambda: engine.clean(data)
+
+
+def resampling_benchmark(size, workdir, seed):
+    source = generators.write_csv("financial_time_series", Path(workdir) / f"transactions_{size}.csv",
+                                  size, seed)
+    runs = itertools.count()
+
+    def run():
+        # A new store directory every time, so each run is a cold build
+        store = RollupStore(source, directory=Path(workdir) / f"rollups_{size}_{next(runs)}",
+                            date_format="%d-%m-%Y %H:%M")
+        store.refresh()
+        return [store.query(freq) for freq in ("D", "W", "ME")]
+    return run
+
+
+def scoring_benchmark(size, workdir, seed, training_rows=10_000):
+    training = generators.frame("loan_repayment", training_rows, seed + 1)
+    target = "Repayment Probability"
+    categorical = ["Employment Status", "Marital Status", "Education Level"]
+    numeric = [column for column in training if column not in categorical and column != target]
+    encoder = CategoricalEncoder(categorical).fit(training)
+    regression = LinearRegression().fit(encoder.transform(training, numeric), training[target])
+    model = ScoringModel.from_encoder(regression, encoder, numeric, target=target)
+
+    applications = generators.frame("loan_repayment", size, seed).drop(columns=target)
+    return lambda: model.predict(applications)
+
+
+BENCHMARKS = {
+    "var": var_benchmark,
+    "cleaning": cleaning_benchmark,
+    "resampling": resampling_benchmark,
+    "scoring": scoring_benchmark,
+}
+# Benchmarks that stream their input from disk and take any size
+STREAMING = {"resampling"}
+
+
+# ----------------------------------------------------------------------
+# Running
+# ----------------------------------------------------------------------
+def environment():
+    """
+    What the numbers were measured on: commit, interpreter, library versions.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scipy": scipy.__version__,
+    }
+
+
+def measure(call, repeat=DEFAULT_REPEAT):
+    """
+    Wall times of `repeat` calls and the peak traced memory of one more.
+    """
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "seconds_min": min(times),
+        "seconds_median": float(np.median(times)),
+        "seconds_all": times,
+        "peak_memory_bytes": peak,
+    }
+
+
+def run(names=None, sizes=DEFAULT_SIZES, repeat=DEFAULT_REPEAT, seed=0, options=None, log=print):
+    """
+    Run the named benchmarks (default: all) at every size. `options` maps a
+    benchmark name to extra keyword arguments for it, e.g. {"var": {"assets": 50}}.
+    """
+    names = list(names or BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmarks {unknown}; choose from {sorted(BENCHMARKS)}")
+    options = options or {}
+    too_big = [name for name in names if name not in STREAMING and max(sizes) > MAX_IN_MEMORY_ROWS]
+    if too_big:
+        raise ValueError(f"Benchmarks {too_big} hold their input in memory; sizes above "
+                         f"{MAX_IN_MEMORY_ROWS:,} rows only run for {sorted(STREAMING)}")
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="fintech-bench-") as workdir:
+        for name in names:
+            for size in sizes:
+                call = BENCHMARKS[name](size, workdir, seed, **options.get(name, {}))
+                result = {"benchmark": name, "size": size, "options": options.get(name, {}),
+                          "repeat": repeat, **measure(call, repeat)}
+                result["rows_per_second"] = size / result["seconds_min"] if result["seconds_min"] else None
+                results.append(result)
+                if log:
+                    log(f"{name:<12}{size:>12,}  {result['seconds_min']:10.4f} s"
+                        f"  {result['peak_memory_bytes'] / 2 ** 20:10.1f} MiB")
+    return {"environment": environment(), "seed": seed, "results": results}
+
+
+def save(document, path):
+    Path(path).write_text(json.dumps(document, indent=2))
+    return path
+
+
+def load(path):
+    return json.loads(Path(path).read_text())
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    One row per case measured in both documents, with current / baseline
+    ratios of the best time and peak memory. `regression` is True when
+    either ratio exceeds 1 + threshold.
+    """
+    def key(result):
+        return result["benchmark"], result["size"], json.dumps(result.get("options", {}), sort_keys=True)
+
+    before = {key(result): result for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        old = before.get(key(result))
+        if old is None:
+            continue
+        time_ratio = result["seconds_min"] / old["seconds_min"]
+        # Startup results have no memory figure
+        memory_ratio = (result["peak_memory_bytes"] / old["peak_memory_bytes"]
+                        if old["peak_memory_bytes"] and result["peak_memory_bytes"] else 1.0)
+        rows.append({
+            "benchmark": result["benchmark"], "size": result["size"],
+            "seconds_before": old["seconds_min"], "seconds_after": result["seconds_min"],
+            "time_ratio": time_ratio,
+            "memory_before": old["peak_memory_bytes"], "memory_after": result["peak_memory_bytes"],
+            "memory_ratio": memory_ratio,
+            "regression": time_ratio > 1 + threshold or memory_ratio > 1 + threshold,
+        })
+    return pd.DataFrame(rows)
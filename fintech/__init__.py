@@ -0,0 +1,7 @@
+"""
+Shared FinTech analytics code used by the scripts and notebooks in this repo.
+
+Each module is importable on its own, e.g.
+
+    from fintech import var_engine
+"""
@@ -0,0 +1,5 @@
+import sys
+
+from fintech.cli import main
+
+sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+Per-account streaming anomaly detection for bank transactions.
+
+Replaces the single global rule of Data Cleaning/2nd.py (amount > 8000) with
+checks against each account's own history:
+
+  - amount: EWMA mean / variance of the account's amounts, flag when the
+    amount is more than `z_threshold` standard deviations above the mean
+  - velocity: transactions of the account on the same channel within the
+    current time bucket (e.g. the same hour), flag above `max_velocity`
+  - balance drift: the balance column should equal the account's previous
+    balance plus a credit / minus a debit, flag when it is off by more
+    than `balance_tolerance`
+
+State lives in NumPy arrays with one slot per account (and per account and
+channel), so score() updates a live feed in O(1) per transaction.
+score_frame() scores a whole frame with vectorised pandas operations,
+starting from and updating the same state, so files can be processed in
+chunks and a live feed can pick up where a historical file ended.
+"""
+
+import numpy as np
+import pandas as pd
+
+SIGNS = {"Credit": 1.0, "Debit": -1.0}
+SCORE_COLUMNS = ["amount_z", "channel_velocity", "balance_drift",
+                 "flag_amount", "flag_velocity", "flag_balance", "suspicious"]
+
+
+class AccountAnomalyDetector:
+    """
+    alpha              EWMA weight of the newest amount
+    z_threshold        amount flag, in EWMA standard deviations above the mean
+    min_history        transactions an account needs before its amounts are scored
+    velocity_bucket    time bucket for the velocity count (pandas offset, e.g. "1h")
+    max_velocity       velocity flag threshold
+    check_balance      turn the balance drift check on or off
+    balance_tolerance  allowed absolute balance difference
+    """
+
+    def __init__(self, alpha=0.05, z_threshold=3.0, min_history=10, velocity_bucket="1h",
+                 max_velocity=5, check_balance=True, balance_tolerance=0.01, signs=SIGNS):
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.min_history = min_history
+        self.bucket_ns = pd.Timedelta(velocity_bucket).value
+        self.max_velocity = max_velocity
+        self.check_balance = check_balance
+        self.balance_tolerance = balance_tolerance
+        self.signs = signs
+
+        self.accounts = {}
+        self.channels = {}
+        self.count = np.zeros(0, dtype=np.int64)
+        self.mean = np.zeros(0)
+        self.var = np.zeros(0)
+        self.last_balance = np.zeros(0)
+        self.bucket = np.zeros((0, 0), dtype=np.int64)
+        self.bucket_count = np.zeros((0, 0), dtype=np.int64)
+
+    # ------------------------------------------------------------------
+    # Slots
+    # ------------------------------------------------------------------
+    def _grow(self, n_accounts, n_channels):
+        old_accounts, old_channels = self.bucket.shape
+        if n_accounts <= len(self.count) and n_channels <= old_channels:
+            return
+        # Double the capacity so growing stays amortised O(1)
+        accounts = max(n_accounts, 2 * len(self.count), 16)
+        channels = max(n_channels, old_channels, 4)
+
+        def extend(values, fill):
+            grown = np.full(accounts, fill, dtype=values.dtype)
+            grown[:len(values)] = values
+            return grown
+
+        self.count = extend(self.count, 0)
+        self.mean = extend(self.mean, 0.0)
+        self.var = extend(self.var, 0.0)
+        self.last_balance = extend(self.last_balance, np.nan)
+
+        bucket = np.full((accounts, channels), -1, dtype=np.int64)
+        bucket[:old_accounts, :old_channels] = self.bucket
+        bucket_count = np.zeros((accounts, channels), dtype=np.int64)
+        bucket_count[:old_accounts, :old_channels] = self.bucket_count
+        self.bucket, self.bucket_count = bucket, bucket_count
+
+    def _slots(self, keys, table):
+        keys = np.asarray(keys, dtype=object)
+        for key in pd.unique(keys):
+            if key not in table:
+                table[key] = len(table)
+        self._grow(len(self.accounts), len(self.channels))
+        return pd.Series(keys).map(table).to_numpy()
+
+    # ------------------------------------------------------------------
+    # Live feed
+    # ------------------------------------------------------------------
+    def score(self, account_id, timestamp, amount, channel, balance=np.nan, transaction_type=None):
+        """
+        Score one transaction and update the account state; returns a dict of SCORE_COLUMNS.
+        """
+        account = self._slots([account_id], self.accounts)[0]
+        channel = self._slots([channel], self.channels)[0]
+        bucket = pd.Timestamp(timestamp).value // self.bucket_ns
+
+        # Amount against the account's history before this transaction
+        count, mean, var = self.count[account], self.mean[account], self.var[account]
+        amount_z = (amount - mean) / np.sqrt(var) if count and var > 0 else 0.0
+        flag_amount = count >= self.min_history and amount_z > self.z_threshold
+
+        if self.bucket[account, channel] != bucket:
+            self.bucket[account, channel] = bucket
+            self.bucket_count[account, channel] = 0
+        self.bucket_count[account, channel] += 1
+        velocity = int(self.bucket_count[account, channel])
+
+        sign = self.signs.get(transaction_type, np.nan)
+        drift = balance - (self.last_balance[account] + sign * amount)
+        flag_balance = bool(self.check_balance and abs(drift) > self.balance_tolerance)
+
+        # Update the EWMA (same recursion as pandas ewm(adjust=False), bias=True)
+        if count == 0:
+            self.mean[account], self.var[account] = amount, 0.0
+        else:
+            delta = amount - mean
+            self.mean[account] = mean + self.alpha * delta
+            self.var[account] = (1 - self.alpha) * (var + self.alpha * delta ** 2)
+        self.count[account] = count + 1
+        if not np.isnan(balance):
+            self.last_balance[account] = balance
+
+        flags = (bool(flag_amount), velocity > self.max_velocity, flag_balance)
+        return dict(zip(SCORE_COLUMNS, (amount_z, velocity, drift) + flags + (any(flags),)))
+
+    # ------------------------------------------------------------------
+    # Batch
+    # ------------------------------------------------------------------
+    def score_frame(self, frame):
+        """
+        Score a frame of transactions (sorted by date) and update the state.
+        Expects account_id, date, amount, channel and optionally balance and
+        transaction_type columns. Returns SCORE_COLUMNS aligned with frame.
+        """
+        n = len(frame)
+        account = self._slots(frame["account_id"].to_numpy(), self.accounts)
+        channel = self._slots(frame["channel"].to_numpy(), self.channels)
+        amount = frame["amount"].to_numpy(dtype=float)
+        bucket = pd.to_datetime(frame["date"]).to_numpy().astype("datetime64[ns]").astype(np.int64) // self.bucket_ns
+        position = np.arange(n)
+
+        # Prior count per row: state count plus earlier rows of the account in this frame
+        step = pd.Series(account).groupby(account).cumcount().to_numpy()
+        prior_count = self.count[account] + step
+
+        # EWMA per account with the stored state as the starting point: accounts
+        # that already have history get a pseudo first row equal to their mean
+        known = np.unique(account[self.count[account] > 0])
+        keys = np.concatenate([known, account])
+        order_key = np.concatenate([np.full(len(known), -1), position])
+        values = np.concatenate([self.mean[known], amount])
+        order = np.lexsort((order_key, keys))
+        ewm = pd.Series(values[order]).groupby(keys[order]).ewm(alpha=self.alpha, adjust=False)
+        post_mean = np.empty(len(keys))
+        post_var = np.empty(len(keys))
+        post_mean[order] = ewm.mean().to_numpy()
+        post_var[order] = ewm.var(bias=True).to_numpy()
+
+        # Variance is affine in its starting value: add the stored variance decayed by (1 - alpha)^k
+        rows_since_state = np.empty(len(keys))
+        rows_since_state[order] = pd.Series(keys[order]).groupby(keys[order]).cumcount().to_numpy()
+        start_var = np.where(np.isin(keys, known), self.var[keys], 0.0)
+        post_var += start_var * (1 - self.alpha) ** rows_since_state
+        post_mean, post_var = post_mean[len(known):], post_var[len(known):]
+
+        # Values before each row: the previous row of the account, or the stored state
+        previous = _previous_in_group(account)
+        has_previous = previous >= 0
+        prior_mean = np.where(has_previous, post_mean[previous], self.mean[account])
+        prior_var = np.where(has_previous, post_var[previous], self.var[account])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            amount_z = np.where((prior_count > 0) & (prior_var > 0),
+                                (amount - prior_mean) / np.sqrt(prior_var), 0.0)
+        flag_amount = (prior_count >= self.min_history) & (amount_z > self.z_threshold)
+
+        # Velocity: rows in the same (account, channel, bucket), plus the stored bucket count
+        velocity = pd.Series(position).groupby([account, channel, bucket]).cumcount().to_numpy() + 1
+        same_bucket = self.bucket[account, channel] == bucket
+        velocity = velocity + np.where(same_bucket, self.bucket_count[account, channel], 0)
+        flag_velocity = velocity > self.max_velocity
+
+        if "balance" in frame:
+            balance = frame["balance"].to_numpy(dtype=float)
+        else:
+            balance = np.full(n, np.nan)
+        if "transaction_type" in frame:
+            sign = frame["transaction_type"].map(self.signs).to_numpy(dtype=float)
+        else:
+            sign = np.full(n, np.nan)
+        balance_known = pd.Series(balance).groupby(account).ffill().to_numpy()
+        prior_balance = np.where(has_previous, balance_known[np.maximum(previous, 0)], self.last_balance[account])
+        drift = balance - (prior_balance + sign * amount)
+        with np.errstate(invalid="ignore"):
+            flag_balance = self.check_balance & (np.abs(drift) > self.balance_tolerance)
+
+        # Store the state of the last row of every account / channel bucket
+        last = _last_in_group(account)
+        self.count[account[last]] = prior_count[last] + 1
+        self.mean[account[last]] = post_mean[last]
+        self.var[account[last]] = post_var[last]
+        has_balance = ~np.isnan(balance_known[last])
+        self.last_balance[account[last][has_balance]] = balance_known[last][has_balance]
+        last_pair = _last_in_group(account * max(len(self.channels), 1) + channel)
+        self.bucket[account[last_pair], channel[last_pair]] = bucket[last_pair]
+        self.bucket_count[account[last_pair], channel[last_pair]] = velocity[last_pair]
+
+        scores = pd.DataFrame({
+            "amount_z": amount_z,
+            "channel_velocity": velocity,
+            "balance_drift": drift,
+            "flag_amount": flag_amount,
+            "flag_velocity": flag_velocity,
+            "flag_balance": flag_balance,
+        }, index=frame.index)
+        scores["suspicious"] = flag_amount | flag_velocity | flag_balance
+        return scores
+
+    def is_suspicious(self, frame):
+        """
+        Boolean mask for txn_stream.analyse_transactions(is_suspicious=...).
+        """
+        return self.score_frame(frame)["suspicious"]
+
+
+def _previous_in_group(groups):
+    """
+    Index of the previous row with the same group value, -1 for the first.
+    """
+    order = np.argsort(groups, kind="stable")
+    previous = np.full(len(groups), -1)
+    same = groups[order][1:] == groups[order][:-1]
+    previous[order[1:][same]] = order[:-1][same]
+    return previous
+
+
+def _last_in_group(groups):
+    """
+    Index of the last row of every group value.
+    """
+    order = np.argsort(groups, kind="stable")
+    is_last = np.append(groups[order][1:] != groups[order][:-1], True)
+    return order[is_last]
@@ -0,0 +1,352 @@
+"""
+Rolling-window VaR backtesting.
+
+For every date t the VaR forecast is built from the previous `window` returns
+and compared with the realised return at t. All instruments are processed
+together as columns of a (T, M) returns matrix.
+
+Nothing is recomputed from scratch when the window moves:
+  - RollingMoments keeps running sums, so mean/std update in O(1) per instrument
+  - RollingQuantile keeps the two order statistics the percentile
+    interpolates between with a pair of heaps per instrument (the values
+    below and above the percentile), so a day costs O(log window) per
+    instrument instead of the O(window log window) of a re-sort
+
+Returns must not contain NaN: one missing value would stay in the running
+sums for good and cannot be ordered in the heaps, so RollingVaR rejects it. Drop or fill
+missing returns first.
+
+The exceptions are then scored with Kupiec's proportion-of-failures test and
+Christoffersen's independence / conditional coverage tests.
+"""
+
+import heapq
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from scipy.special import xlogy
+
+
+class RollingMoments:
+    """
+    Running mean and sample std of the last `window` rows for M instruments.
+    """
+
+    def __init__(self, first_window):
+        first_window = np.asarray(first_window, dtype=float)
+        self.window = first_window.shape[0]
+        self.resync(first_window)
+
+    def resync(self, current_window):
+        # Sums are kept around a per-instrument shift to limit cancellation error
+        self.shift = current_window.mean(axis=0)
+        centred = current_window - self.shift
+        self.total = centred.sum(axis=0)
+        self.total_sq = (centred ** 2).sum(axis=0)
+
+    def replace(self, leaving, entering):
+        """
+        Slide the window: `leaving` drops out and `entering` comes in.
+        """
+        leaving = leaving - self.shift
+        entering = entering - self.shift
+        self.total += entering - leaving
+        self.total_sq += entering ** 2 - leaving ** 2
+
+    @property
+    def mean(self):
+        return self.shift + self.total / self.window
+
+    @property
+    def std(self):
+        variance = (self.total_sq - self.total ** 2 / self.window) / (self.window - 1)
+        return np.sqrt(np.clip(variance, 0, None))
+
+
+class _OrderStatistic:
+    """
+    The `rank`-th and (`rank` + 1)-th smallest of a sliding window of one
+    instrument, with two heaps: `low` (a max-heap, stored negated) holds the
+    rank + 1 smallest values and `high` (a min-heap) the rest. Entries are
+    (value, day) so the value leaving the window is known by its day: it is
+    not searched for but left in its heap and skipped once it reaches the
+    top (lazy deletion). Each day costs O(log window).
+    """
+
+    def __init__(self, values, rank):
+        self.window = len(values)
+        self.rank = rank
+        self.day = self.window
+        # Which heap each day of the window sits in, indexed by day % window
+        self.in_low = np.zeros(self.window, dtype=bool)
+        self._build([(value, day) for day, value in enumerate(values)])
+
+    def _build(self, entries):
+        entries.sort()
+        low, high = entries[:self.rank + 1], entries[self.rank + 1:]
+        self.low = [(-value, day) for value, day in low]
+        self.high = list(high)
+        heapq.heapify(self.low)
+        heapq.heapify(self.high)
+        self.in_low[:] = False
+        for _, day in low:
+            self.in_low[day % self.window] = True
+        self.low_size, self.high_size = len(low), len(high)
+
+    def _prune(self):
+        # Drop expired entries from the heap tops
+        oldest = self.day - self.window
+        while self.low and self.low[0][1] < oldest:
+            heapq.heappop(self.low)
+        while self.high and self.high[0][1] < oldest:
+            heapq.heappop(self.high)
+
+    def _move(self, source, target, to_low):
+        # Top of one heap to the other (the stored values flip sign)
+        value, day = heapq.heappop(source)
+        heapq.heappush(target, (-value, day))
+        self.in_low[day % self.window] = to_low
+
+    def replace(self, entering):
+        """
+        Slide by one day: the oldest value leaves, `entering` comes in.
+        """
+        leaving_day = self.day - self.window
+        if self.in_low[leaving_day % self.window]:
+            self.low_size -= 1
+        else:
+            self.high_size -= 1
+        self.day += 1
+        self._prune()
+
+        if self.low and entering <= -self.low[0][0]:
+            heapq.heappush(self.low, (-entering, self.day - 1))
+            self.in_low[(self.day - 1) % self.window] = True
+            self.low_size += 1
+        else:
+            heapq.heappush(self.high, (entering, self.day - 1))
+            self.in_low[(self.day - 1) % self.window] = False
+            self.high_size += 1
+
+        # Rebalance so low holds exactly rank + 1 values
+        while self.low_size > self.rank + 1:
+            self._prune()
+            self._move(self.low, self.high, False)
+            self.low_size, self.high_size = self.low_size - 1, self.high_size + 1
+        while self.low_size < self.rank + 1:
+            self._prune()
+            self._move(self.high, self.low, True)
+            self.low_size, self.high_size = self.low_size + 1, self.high_size - 1
+        self._prune()
+
+        # Expired entries buried in a heap only leave at the top; rebuild
+        # when they make up half of it (amortised O(1) per day)
+        if len(self.low) + len(self.high) > 2 * self.window:
+            oldest = self.day - self.window
+            entries = [(-value, day) for value, day in self.low if day >= oldest]
+            self._build(entries + [entry for entry in self.high if entry[1] >= oldest])
+
+    def values(self):
+        """
+        (rank-th, (rank + 1)-th) smallest; the same value twice at the top rank.
+        """
+        lower = -self.low[0][0]
+        return lower, (self.high[0][0] if self.high else lower)
+
+
+class RollingQuantile:
+    """
+    The q-th percentile of the last `window` rows for M instruments, with
+    one pair of heaps per instrument (see _OrderStatistic), so each day
+    costs O(log window) per instrument. The window length is fixed, so the
+    percentile sits between two fixed ranks.
+    """
+
+    def __init__(self, first_window, q):
+        first_window = np.asarray(first_window, dtype=float)
+        self.window = first_window.shape[0]
+        position = q / 100 * (self.window - 1)
+        self.rank = int(np.floor(position))
+        self.fraction = position - self.rank
+        self.instruments = [_OrderStatistic(column.tolist(), self.rank) for column in first_window.T]
+
+    def replace(self, entering):
+        """
+        Slide every instrument's window by one day: the oldest row leaves
+        and `entering` (one value per instrument) comes in.
+        """
+        for instrument, value in zip(self.instruments, entering.tolist()):
+            instrument.replace(value)
+
+    def percentile(self):
+        """
+        Same as np.percentile(window, q, axis=0) with linear interpolation.
+        """
+        pairs = np.array([instrument.values() for instrument in self.instruments])
+        return pairs[:, 0] + self.fraction * (pairs[:, 1] - pairs[:, 0])
+
+
+class RollingVaR:
+    """
+    Incremental historical and parametric VaR forecasts for M instruments.
+    Call update() with each new day of returns to get the forecasts for the next day.
+    """
+
+    def __init__(self, first_window, confidence_level=0.95):
+        first_window = _check_finite(np.asarray(first_window, dtype=float))
+        self.window = first_window.shape[0]
+        self.confidence_level = confidence_level
+        self.z_score = stats.norm.ppf(1 - confidence_level)
+
+        # Circular buffer of raw returns tells us which value leaves the window
+        self.buffer = first_window.copy()
+        self.position = 0
+        self.steps = 0
+        self.moments = RollingMoments(first_window)
+        self.quantile = RollingQuantile(first_window, (1 - confidence_level) * 100)
+
+    def forecast(self):
+        """
+        (historical VaR, parametric VaR) for the next day, each of shape (M,).
+        """
+        historical = self.quantile.percentile()
+        parametric = self.moments.mean + self.z_score * self.moments.std
+        return historical, parametric
+
+    def update(self, returns):
+        returns = _check_finite(np.asarray(returns, dtype=float))
+        leaving = self.buffer[self.position].copy()
+        self.buffer[self.position] = returns
+        self.position = (self.position + 1) % self.window
+
+        self.moments.replace(leaving, returns)
+        self.quantile.replace(returns)
+
+        # Refresh the running sums once per window to stop rounding drift (amortised O(1))
+        self.steps += 1
+        if self.steps % self.window == 0:
+            self.moments.resync(self.buffer)
+        return self.forecast()
+
+
+def _check_finite(values):
+    if np.isnan(values).any():
+        raise ValueError("Returns contain NaN; drop or fill missing returns before the backtest")
+    return values
+
+
+def rolling_var(returns, window=250, confidence_level=0.95):
+    """
+    Historical and parametric VaR forecast for every date.
+    returns is (T, M) (or a DataFrame); the first `window` rows have no forecast (NaN).
+    Returns (historical, parametric) in the same shape and type as `returns`.
+    """
+    values = np.asarray(returns, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+    if values.shape[0] <= window:
+        raise ValueError(f"Need more than {window} rows of returns, got {values.shape[0]}")
+    _check_finite(values)
+
+    historical = np.full(values.shape, np.nan)
+    parametric = np.full(values.shape, np.nan)
+
+    engine = RollingVaR(values[:window], confidence_level)
+    historical[window], parametric[window] = engine.forecast()
+    for t in range(window, values.shape[0] - 1):
+        historical[t + 1], parametric[t + 1] = engine.update(values[t])
+
+    return _like(historical, returns), _like(parametric, returns)
+
+
+def _like(values, template):
+    if isinstance(template, pd.DataFrame):
+        return pd.DataFrame(values, index=template.index, columns=template.columns)
+    if isinstance(template, pd.Series):
+        return pd.Series(values[:, 0], index=template.index, name=template.name)
+    return values
+
+
+def exceptions(returns, var):
+    """
+    True where the realised return fell below the VaR forecast.
+    Dates without a forecast are dropped, so the result is (T - window, M).
+    """
+    returns = np.asarray(returns, dtype=float)
+    var = np.asarray(var, dtype=float)
+    if returns.ndim == 1:
+        returns, var = returns[:, None], var[:, None]
+    has_forecast = ~np.isnan(var).all(axis=1)
+    return returns[has_forecast] < var[has_forecast]
+
+
+def kupiec_test(hits, confidence_level=0.95):
+    """
+    Kupiec proportion-of-failures likelihood ratio and p-value per instrument.
+    """
+    hits = np.asarray(hits, dtype=bool)
+    n = hits.shape[0]
+    x = hits.sum(axis=0)
+    p = 1 - confidence_level
+    observed = x / n
+
+    log_null = xlogy(n - x, 1 - p) + xlogy(x, p)
+    log_alt = xlogy(n - x, 1 - observed) + xlogy(x, observed)
+    lr = -2 * (log_null - log_alt)
+    return lr, stats.chi2.sf(lr, 1)
+
+
+def christoffersen_test(hits):
+    """
+    Christoffersen independence likelihood ratio and p-value per instrument.
+    Checks whether an exception today makes one tomorrow more likely.
+    """
+    hits = np.asarray(hits, dtype=bool)
+    today, tomorrow = hits[:-1], hits[1:]
+    n00 = (~today & ~tomorrow).sum(axis=0)
+    n01 = (~today & tomorrow).sum(axis=0)
+    n10 = (today & ~tomorrow).sum(axis=0)
+    n11 = (today & tomorrow).sum(axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pi0 = np.nan_to_num(n01 / (n00 + n01))
+        pi1 = np.nan_to_num(n11 / (n10 + n11))
+        pi = (n01 + n11) / (n00 + n01 + n10 + n11)
+
+    log_null = xlogy(n00 + n10, 1 - pi) + xlogy(n01 + n11, pi)
+    log_alt = (xlogy(n00, 1 - pi0) + xlogy(n01, pi0)
+               + xlogy(n10, 1 - pi1) + xlogy(n11, pi1))
+    lr = -2 * (log_null - log_alt)
+    return lr, stats.chi2.sf(lr, 1)
+
+
+def backtest(returns, window=250, confidence_level=0.95):
+    """
+    Rolling VaR backtest summary, one row per instrument and method.
+    """
+    if isinstance(returns, pd.Series):
+        returns = returns.to_frame()
+    names = returns.columns if isinstance(returns, pd.DataFrame) else np.arange(np.shape(returns)[1])
+    forecasts = dict(zip(("historical", "parametric"), rolling_var(returns, window, confidence_level)))
+
+    rows = []
+    for method, var in forecasts.items():
+        hits = exceptions(returns, var)
+        pof_lr, pof_p = kupiec_test(hits, confidence_level)
+        ind_lr, ind_p = christoffersen_test(hits)
+        cc_lr = pof_lr + ind_lr
+        rows.append(pd.DataFrame({
+            "instrument": names,
+            "method": method,
+            "observations": hits.shape[0],
+            "exceptions": hits.sum(axis=0),
+            "expected": hits.shape[0] * (1 - confidence_level),
+            "kupiec_lr": pof_lr,
+            "kupiec_pvalue": pof_p,
+            "independence_lr": ind_lr,
+            "independence_pvalue": ind_p,
+            "conditional_coverage_lr": cc_lr,
+            "conditional_coverage_pvalue": stats.chi2.sf(cc_lr, 2),
+        }))
+    return pd.concat(rows, ignore_index=True)
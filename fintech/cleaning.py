@@ -0,0 +1,221 @@
+"""
+Declarative data-cleaning engine, generalising Data Cleaning/1st.py.
+
+Cleaning steps are declared per column with a ColumnRule instead of being
+written out as successive column rewrites:
+
+    spec = {
+        "Gender": ColumnRule(valid_values={"Male", "Female"}, invalid_value="Others"),
+        "Age": ColumnRule(numeric=True, valid_range=(18, 60), impute="mean", dtype="int64"),
+    }
+    cleaned = CleaningEngine(spec).clean(data)
+
+Each column is cleaned in one fused pass. Text columns are factorised once,
+so value maps, valid-value sets, number and date parsing run on the distinct
+values only, and the result is taken back through the codes. Numeric range
+checks and imputation are then single vectorised where / fillna calls.
+
+Imputation needs statistics of the whole column (mean / mode), so the engine
+works in two passes: fit() gathers them (chunk by chunk for big files) and
+transform() applies them. clean_csv() does both passes over a file in chunks.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+
+def _is_text(values):
+    return values.dtype == object or pd.api.types.is_string_dtype(values)
+
+
+@dataclass
+class ColumnRule:
+    """
+    Cleaning steps for one column, applied in this order:
+
+    value_map      {old: new} replacements, e.g. {"Manegement": "Management"}
+    valid_values   allowed values; anything else (missing too) becomes invalid_value
+    numeric        convert to numbers, unparseable values become NaN
+    date_format    parse as dates with this format, unparseable values become NaT
+    valid_range    (low, high); numbers outside become NaN
+    impute         "mean", "mode" or a constant used to fill what is still missing
+    dtype          final dtype, e.g. "int64", "float32" or "category"
+    """
+    value_map: dict = None
+    valid_values: set = None
+    invalid_value: object = np.nan
+    numeric: bool = False
+    date_format: str = None
+    valid_range: tuple = None
+    impute: object = None
+    dtype: str = None
+
+
+# The cleaning rules for Uncleaned.csv, used by Data Cleaning/1st.py, the CLI and the benchmarks
+UNCLEANED_SPEC = {
+    # Replacing a data in String format to numerical, changing the datatype to numeric,
+    # blanking salaries below 20000 or above 2000000 and filling the na places with the salary average
+    "Salary": ColumnRule(value_map={"Sixty Thousand": 60000}, numeric=True,
+                         valid_range=(20000, 2000000), impute="mean"),
+    # Age below 18 and above 60 is treated as missing and filled with the average age
+    "Age": ColumnRule(valid_range=(18, 60), impute="mean", dtype="int64"),
+    # Standardize the gender column: anything other than Male / Female becomes Others
+    "Gender": ColumnRule(valid_values={"Male", "Female"}, invalid_value="Others"),
+    # Fixing the department typos and filling empty departments with the most repeating department
+    "Department": ColumnRule(value_map={"Manegement": "Management", "Sales&Marketing": "Sales"},
+                             impute="mode"),
+    # Changing the datatype of date to dateTime
+    "Hire Date": ColumnRule(date_format="%Y-%m-%d", impute="Invalid Date"),
+}
+
+
+class _ColumnStats:
+    """
+    Running statistics of a prepared column, gathered chunk by chunk.
+    """
+
+    def __init__(self):
+        self.total = 0.0
+        self.count = 0
+        self.value_counts = None
+
+    def update(self, values, rule):
+        if rule.impute == "mean":
+            numbers = pd.to_numeric(values)
+            self.total += numbers.sum()
+            self.count += numbers.count()
+        if rule.impute == "mode" or rule.dtype == "category":
+            counts = values.value_counts()
+            self.value_counts = counts if self.value_counts is None else self.value_counts.add(counts, fill_value=0)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else np.nan
+
+    @property
+    def mode(self):
+        # Same tie break as Series.mode()[0]: the smallest of the most frequent values
+        counts = self.value_counts
+        return counts[counts == counts.max()].sort_index().index[0]
+
+
+class CleaningEngine:
+    """
+    Applies a {column: ColumnRule} spec; columns without a rule are left as they are.
+
+    max_categories  text columns with at most this many distinct values (after
+                    cleaning) are stored as category unless a rule sets a dtype
+    """
+
+    def __init__(self, spec, max_categories=64):
+        self.spec = spec
+        self.max_categories = max_categories
+        self.stats = {}
+
+    def _prepare(self, values, rule):
+        """
+        Everything before imputation, as one pass over the column.
+        """
+        if _is_text(values):
+            codes, uniques = pd.factorize(values)
+            uniques = pd.Series(uniques, dtype=object)
+            missing = rule.invalid_value if rule.valid_values is not None else np.nan
+
+            if rule.value_map:
+                uniques = uniques.replace(rule.value_map)
+            if rule.valid_values is not None:
+                uniques = uniques.where(uniques.isin(rule.valid_values), rule.invalid_value)
+            if rule.numeric:
+                uniques = pd.to_numeric(uniques, errors="coerce")
+                missing = np.nan
+            if rule.date_format:
+                uniques = pd.to_datetime(uniques, format=rule.date_format, errors="coerce")
+                missing = pd.NaT
+
+            # Back to full length through the codes; code -1 is a missing value
+            taken = uniques.take(np.where(codes < 0, 0, codes)) if len(uniques) else uniques.reindex(codes)
+            prepared = pd.Series(taken.to_numpy(), index=values.index, name=values.name)
+            if (codes < 0).any():
+                prepared = prepared.where(codes >= 0, missing)
+        else:
+            prepared = values
+            if rule.value_map:
+                prepared = prepared.replace(rule.value_map)
+            if rule.valid_values is not None:
+                prepared = prepared.where(prepared.isin(rule.valid_values), rule.invalid_value)
+            if rule.numeric:
+                prepared = pd.to_numeric(prepared, errors="coerce")
+
+        if rule.valid_range is not None:
+            low, high = rule.valid_range
+            prepared = pd.to_numeric(prepared)
+            prepared = prepared.where((prepared >= low) & (prepared <= high))
+        return prepared
+
+    def fit(self, chunks):
+        """
+        First pass: statistics needed for imputation and categories.
+        `chunks` is a DataFrame or an iterable of DataFrames.
+        """
+        if isinstance(chunks, pd.DataFrame):
+            chunks = [chunks]
+        self.stats = {column: _ColumnStats() for column in self.spec}
+        for chunk in chunks:
+            for column, rule in self.spec.items():
+                self.stats[column].update(self._prepare(chunk[column], rule), rule)
+        return self
+
+    def _fill_value(self, column, rule):
+        if rule.impute == "mean":
+            return self.stats[column].mean
+        if rule.impute == "mode":
+            return self.stats[column].mode
+        return rule.impute
+
+    def transform(self, frame):
+        """
+        Second pass: clean a frame (or one chunk) with the fitted statistics.
+        """
+        cleaned = frame.copy()
+        for column, rule in self.spec.items():
+            values = self._prepare(frame[column], rule)
+            if rule.impute is not None:
+                fill = self._fill_value(column, rule)
+                if pd.api.types.is_datetime64_any_dtype(values) and isinstance(fill, str):
+                    # e.g. "Invalid Date": the dates become text in their own format, so
+                    # every chunk looks the same whether or not it had a missing date
+                    values = values.dt.strftime(rule.date_format or "%Y-%m-%d %H:%M:%S").fillna(fill)
+                else:
+                    values = values.fillna(fill)
+
+            if rule.dtype == "category":
+                # Categories come from the whole file so every chunk agrees
+                categories = self.stats[column].value_counts.index.sort_values()
+                values = pd.Categorical(values, categories=categories)
+            elif rule.dtype is not None:
+                values = values.astype(rule.dtype)
+            elif _is_text(values) and values.nunique() <= self.max_categories:
+                values = values.astype("category")
+            cleaned[column] = values
+        return cleaned
+
+    def clean(self, frame):
+        """
+        Fit and transform an in-memory frame.
+        """
+        return self.fit(frame).transform(frame)
+
+    def clean_csv(self, source, destination, chunk_size=DEFAULT_CHUNK_SIZE, **read_options):
+        """
+        Clean a CSV too big for memory: one pass for statistics, one to write.
+        """
+        self.fit(pd.read_csv(source, chunksize=chunk_size, **read_options))
+        header = True
+        for chunk in pd.read_csv(source, chunksize=chunk_size, **read_options):
+            self.transform(chunk).to_csv(destination, mode="w" if header else "a",
+                                         header=header, index=False)
+            header = False
@@ -0,0 +1,292 @@
+"""
+One command line for the repo's pipelines:
+
+    python -m fintech var AAPL MSFT --weights 0.5 0.5 --start 2023-01-01
+    python -m fintech clean "Data Cleaning/Uncleaned.csv" cleaned.csv
+    python -m fintech txn-analytics "Data Cleaning/bank_transactions.csv" --suspicious suspicious.csv
+    python -m fintech timeseries "Financial Time Series/financial_time_series.csv"
+    python -m fintech score loan_model.npz new_applications.csv scored.csv
+    python -m fintech scrape https://a.example/resume.html --output skills.csv
+
+The scripts in the repo folders import numpy, pandas, scipy, matplotlib and
+seaborn at the top and then run from top to bottom. Here only argparse is
+imported up front; every subcommand imports the fintech modules it needs
+when it runs, so scipy is only loaded by var, matplotlib only when --charts
+is given, and yfinance only when prices have to be downloaded.
+STARTUP_BUDGETS records how long each no-plot path may take on a tiny
+input, and `python -m benchmarks startup` checks it.
+
+--metrics DIR writes the run's stage timings and memory use as JSON into
+DIR (fintech/instrumentation.py). Without it, FINTECH_METRICS=1 (optionally
+"profile" / "memory", e.g. FINTECH_METRICS=profile,memory) turns recording
+on and the files go to $FINTECH_METRICS_DIR, or the current folder. The
+metrics are written even when the command fails.
+"""
+
+import argparse
+import sys
+
+# Seconds from interpreter start to exit for a tiny input, per no-plot subcommand
+STARTUP_BUDGETS = {
+    "clean": 1.5,
+    "txn-analytics": 1.5,
+    "timeseries": 1.5,
+    "score": 1.5,
+    "var": 3.0,
+}
+# Heavy modules the no-plot paths must not import...
+DEFERRED_MODULES = ("matplotlib", "seaborn", "scipy", "sklearn", "yfinance")
+# ...except where the computation needs them (parametric VaR uses scipy.stats)
+STARTUP_ALLOWED = {"var": ("scipy",)}
+
+
+def _print_frame(frame):
+    print(frame.to_string())
+
+
+# ----------------------------------------------------------------------
+# Subcommands
+# ----------------------------------------------------------------------
+def var(args):
+    import pandas as pd
+
+    from fintech import covariance, var_engine
+
+    if args.prices:
+        prices = pd.read_csv(args.prices, index_col=0, parse_dates=True)
+        prices = prices[args.symbols] if args.symbols else prices
+    elif not args.symbols:
+        raise SystemExit("Give ticker symbols or --prices")
+    else:
+        from fintech import price_store
+
+        fetcher = price_store.FixtureFetcher(args.fixtures) if args.fixtures else None
+        prices = price_store.PriceStore(fetcher=fetcher).close_prices(args.symbols, args.start, args.end)
+    if prices.empty:
+        raise SystemExit("No prices for the requested symbols and dates")
+
+    returns = prices.pct_change().dropna()
+    weights = args.weights or [1 / returns.shape[1]] * returns.shape[1]
+    if len(weights) != returns.shape[1]:
+        raise SystemExit(f"{len(weights)} weights for {returns.shape[1]} assets")
+    daily_covariance = covariance.estimate(returns, args.covariance)
+    results = var_engine.compute_var(
+        returns, [weights], args.confidence, args.holding, args.investment,
+        covariance=daily_covariance, num_simulations=args.simulations, workers=args.workers,
+    )
+    table = pd.concat([result.to_frame().droplevel("portfolio") for result in results.values()])
+    _print_frame(table.reset_index())
+
+    if args.attribution:
+        attribution = var_engine.attribute_var(
+            returns, weights, args.confidence, args.holding, args.investment,
+            covariance=daily_covariance, num_simulations=args.simulations,
+        )
+        print("\nRisk attribution per asset:")
+        _print_frame(pd.concat([result.to_frame() for result in attribution.values()]).reset_index())
+
+    if args.charts:
+        from fintech import reports
+
+        portfolio = returns.dot(weights)
+        colors = {"historical": "r", "parametric": "g", "monte_carlo": "b"}
+        chart = reports.Chart("VaR_Analysis.png", shape=(1, 2), figsize=(15, 6), panels=[
+            reports.Panel([reports.histogram(portfolio, alpha=0.7, edgecolor="black")]
+                          + [reports.vline(result.var[0, 0, 0], color=colors[method], linestyle="--",
+                                           label=f"{method}: {result.var[0, 0, 0]:.4%}")
+                             for method, result in results.items()],
+                          title="Portfolio Returns Distribution with VaR Levels", xlabel="Daily Returns",
+                          ylabel="Frequency", grid={"alpha": 0.3}, legend=True),
+            reports.Panel([reports.line(portfolio.index, (1 + portfolio).cumprod().values)],
+                          title="Portfolio Cumulative Returns", xlabel="Date", ylabel="Cumulative Return",
+                          grid={"alpha": 0.3}),
+        ])
+        for path in reports.render([chart], args.charts):
+            print(f"Chart saved to: {path}")
+
+
+def clean(args):
+    from fintech import cleaning
+
+    engine = cleaning.CleaningEngine(cleaning.UNCLEANED_SPEC)
+    engine.clean_csv(args.source, args.destination, chunk_size=args.chunk_size)
+    print(f"Cleaned data saved to: {args.destination}")
+
+
+def txn_analytics(args):
+    from fintech import anomaly, txn_stream
+
+    sink = txn_stream.CsvSink(args.suspicious) if args.suspicious else None
+    # The repo's balance column is a running total of the whole file, so the
+    # balance drift check is off unless asked for
+    detector = anomaly.AccountAnomalyDetector(check_balance=args.check_balance)
+    summary = txn_stream.analyse_transactions(args.source, chunk_size=args.chunk_size, sink=sink,
+                                              is_suspicious=detector.is_suspicious)
+    print("Rows processed:", summary.rows)
+    if summary.errors:
+        print("Data Validation Failed")
+        for error in summary.errors:
+            print("-", error)
+    else:
+        print("Data Validation Successful")
+    print("Daily total transaction amount:")
+    _print_frame(summary.daily_summary)
+    print("Monthly total transaction amount:")
+    _print_frame(summary.monthly_summary)
+    print("Total suspicious transactions:", summary.suspicious_count)
+    if args.suspicious:
+        print(f"Suspicious transactions saved to: {args.suspicious}")
+
+
+def timeseries(args):
+    from fintech import ingest
+    from fintech.rollups import RollupStore
+
+    date_format = args.date_format or ingest.schema_for(args.source).dates.get("date")
+    store = RollupStore(args.source, date_format=date_format)
+    print(f"Rollups refreshed ({store.refresh()} new bytes read)")
+    tables = {freq: store.query(freq, args.start, args.end) for freq in args.freq}
+    for freq, table in tables.items():
+        print(f"\n{freq} buckets:")
+        _print_frame(table)
+
+    if args.charts:
+        from fintech import reports
+
+        charts = [
+            reports.Chart(f"rollup_{freq}.png", figsize=(12, 6), panels=[reports.Panel(
+                [reports.line(table.index, table["sum"], label="total"),
+                 reports.line(table.index, table["mean"], label="average")],
+                title=f"{freq} transaction amounts", xlabel="Date", ylabel="Amount", grid={}, legend=True,
+            )])
+            for freq, table in tables.items()
+        ]
+        for path in reports.render(charts, args.charts, workers=args.workers):
+            print(f"Chart saved to: {path}")
+
+
+def score(args):
+    from fintech.scoring import ScoringModel
+
+    model = ScoringModel.load(args.model)
+    rows = model.score_csv(args.source, args.destination, output_column=args.output_column,
+                           chunk_size=args.chunk_size)
+    print(f"{rows} rows scored and saved to: {args.destination}")
+
+
+def scrape(args):
+    from pathlib import Path
+
+    from fintech.skills import DEFAULT_CACHE, SkillsCrawler
+
+    urls = list(args.url)
+    if args.urls:
+        urls += Path(args.urls).read_text().splitlines()
+    if not urls:
+        raise SystemExit("No URLs given")
+    crawler = SkillsCrawler(max_concurrency=args.concurrency, rate_limit=args.rate_limit, workers=args.workers,
+                            cache_dir=None if args.no_cache else args.cache or DEFAULT_CACHE)
+    try:
+        skills = crawler.crawl(urls, args.output)
+    finally:
+        crawler.close()
+    print(f"{len(skills)} skills from {skills['URL'].nunique()} of {len(urls)} pages saved to: {args.output}")
+    print(f"Downloaded {crawler.stats['fetched']}, unchanged in cache {crawler.stats['not_modified']}, "
+          f"failed {crawler.stats['failed']}")
+
+
+# ----------------------------------------------------------------------
+# Parser
+# ----------------------------------------------------------------------
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m fintech", description="FinTech analytics pipelines.")
+    parser.add_argument("--metrics", help="write stage timings and memory use as JSON into this folder "
+                                          "(default: off, unless $FINTECH_METRICS is set)")
+    parser.add_argument("--profile", action="store_true", help="with --metrics: cProfile the run")
+    parser.add_argument("--trace-memory", action="store_true", help="with --metrics: tracemalloc peaks per stage")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("var", help="historical, parametric and Monte Carlo VaR of a portfolio")
+    command.add_argument("symbols", nargs="*", help="tickers (or columns of --prices)")
+    command.add_argument("--prices", help="CSV of close prices, dates in the first column, one column per asset")
+    command.add_argument("--fixtures", help="read <symbol>.csv files from this folder instead of downloading")
+    command.add_argument("--weights", type=float, nargs="+", help="portfolio weights (default: equal)")
+    command.add_argument("--start", default="2023-01-01")
+    command.add_argument("--end", default=None)
+    command.add_argument("--confidence", type=float, nargs="+", default=[0.95])
+    command.add_argument("--holding", type=int, nargs="+", default=[1], help="holding periods in days")
+    command.add_argument("--investment", type=float, default=1_000_000)
+    command.add_argument("--simulations", type=int, default=10_000)
+    command.add_argument("--covariance", choices=["sample", "ewma", "ledoit_wolf"], default="sample")
+    command.add_argument("--workers", type=int, default=None, help="Monte Carlo processes")
+    command.add_argument("--attribution", action="store_true",
+                         help="also print marginal, component and incremental VaR / CVaR per asset")
+    command.add_argument("--charts", help="render the charts into this folder")
+    command.set_defaults(handler=var)
+
+    command = commands.add_parser("clean", help="clean an Uncleaned.csv style employee file")
+    command.add_argument("source")
+    command.add_argument("destination")
+    command.add_argument("--chunk-size", type=int, default=1_000_000)
+    command.set_defaults(handler=clean)
+
+    command = commands.add_parser("txn-analytics", help="validate, summarise and flag bank transactions")
+    command.add_argument("source")
+    command.add_argument("--suspicious", help="CSV file for the suspicious transactions")
+    command.add_argument("--check-balance", action="store_true", help="flag per-account balance drift")
+    command.add_argument("--chunk-size", type=int, default=1_000_000)
+    command.set_defaults(handler=txn_analytics)
+
+    command = commands.add_parser("timeseries", help="daily / weekly / monthly transaction rollups")
+    command.add_argument("source")
+    command.add_argument("--freq", nargs="+", choices=["D", "W", "ME"], default=["D", "W", "ME"])
+    command.add_argument("--date-format", help="strftime format of the date column (default: from the schema)")
+    command.add_argument("--start", default=None)
+    command.add_argument("--end", default=None)
+    command.add_argument("--charts", help="render the charts into this folder")
+    command.add_argument("--workers", type=int, default=None, help="chart rendering processes")
+    command.set_defaults(handler=timeseries)
+
+    command = commands.add_parser("score", help="score a CSV with a saved ScoringModel (.npz)")
+    command.add_argument("model")
+    command.add_argument("source")
+    command.add_argument("destination")
+    command.add_argument("--output-column", default="prediction")
+    command.add_argument("--chunk-size", type=int, default=1_000_000)
+    command.set_defaults(handler=score)
+
+    command = commands.add_parser("scrape", help="extract the skills section from resume pages")
+    command.add_argument("url", nargs="*")
+    command.add_argument("--urls", help="text file with one URL per line")
+    command.add_argument("--output", default="extracted_skills.csv", help=".csv or .parquet file to write")
+    command.add_argument("--concurrency", type=int, default=16)
+    command.add_argument("--rate-limit", type=float, default=5, help="requests per second per host")
+    command.add_argument("--workers", type=int, default=None, help="parse processes")
+    command.add_argument("--cache", default=None, help="HTML cache directory (default: .skills_cache)")
+    command.add_argument("--no-cache", action="store_true")
+    command.set_defaults(handler=scrape)
+    return parser
+
+
+def main(argv=None):
+    from fintech.instrumentation import Recorder, metrics_directory
+
+    args = build_parser().parse_args(argv)
+    if args.metrics:
+        recorder = Recorder(args.command, profile=args.profile, trace_memory=args.trace_memory)
+    else:
+        recorder = Recorder.from_environment(args.command)
+    try:
+        # Library stages (var_engine, txn_stream, scoring, ...) nest under the command
+        with recorder, recorder.stage(args.command):
+            args.handler(args)
+    finally:
+        # Also on failure: the stages that ran show where the time went
+        path = recorder.write(args.metrics or metrics_directory("."))
+        if path is not None:
+            print(f"Metrics saved to: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""
+Covariance estimators with O(N^2) per-day updates, and a shared cache.
+
+Three estimators of the daily (N, N) covariance of a returns matrix:
+
+  - SampleCovariance      unbiased sample covariance, expanding or over a
+                          rolling window
+  - EWMACovariance        RiskMetrics exponentially weighted covariance
+  - LedoitWolfCovariance  sample covariance shrunk towards a scaled identity
+                          (Ledoit & Wolf 2004, as sklearn.covariance.LedoitWolf)
+
+Each keeps running sums instead of the returns themselves, so update(row)
+folds in a new day in O(N^2) rather than recomputing from all T rows in
+O(T * N^2). A rolling window also removes the row that leaves the window.
+
+estimate() caches estimators by (universe, window, method): VaR, the
+optimizer and anything else that asks for the same estimate in a run get
+the same matrix, and a returns frame that has grown by a few rows only
+costs the updates for those rows. The shared cache keeps the 32 most
+recently used estimators; default_cache.clear() frees them.
+
+    cov = covariance.estimate(returns, method="ledoit_wolf", window=250)
+"""
+
+from collections import OrderedDict, deque
+
+import numpy as np
+import pandas as pd
+
+METHODS = ("sample", "ewma", "ledoit_wolf")
+RISKMETRICS_DECAY = 0.94
+DEFAULT_CACHE_ENTRIES = 32
+
+
+class SampleCovariance:
+    """
+    Unbiased sample covariance (ddof=1), over all rows or the last `window`.
+    Sums are kept around a fixed shift (the first rows' mean) to limit
+    cancellation error.
+    """
+
+    def __init__(self, n_assets, window=None):
+        self.window = window
+        self.rows = deque()
+        self.shift = None
+        self.count = 0
+        self.total = np.zeros(n_assets)
+        self.cross = np.zeros((n_assets, n_assets))
+
+    def fit(self, returns):
+        returns = np.asarray(returns, dtype=float)
+        if self.window is not None:
+            returns = returns[-self.window:]
+        if self.shift is None:
+            self.shift = returns.mean(axis=0) if len(returns) else np.zeros(returns.shape[1])
+        centred = returns - self.shift
+        self.count += len(centred)
+        self.total += centred.sum(axis=0)
+        self.cross += centred.T @ centred
+        self._fit_extra(centred)
+        if self.window is not None:
+            self.rows.extend(centred)
+            while len(self.rows) > self.window:
+                self._remove(self.rows.popleft())
+        return self
+
+    def _fit_extra(self, centred):
+        pass
+
+    def update(self, row):
+        """
+        Add one day of returns, dropping the oldest day for a rolling window.
+        """
+        row = np.asarray(row, dtype=float)
+        if self.shift is None:
+            self.shift = row.copy()
+        centred = row - self.shift
+        self.count += 1
+        self.total += centred
+        self.cross += np.outer(centred, centred)
+        self._update_extra(centred, 1)
+        if self.window is not None:
+            self.rows.append(centred)
+            if len(self.rows) > self.window:
+                self._remove(self.rows.popleft())
+        return self
+
+    def _remove(self, centred):
+        self.count -= 1
+        self.total -= centred
+        self.cross -= np.outer(centred, centred)
+        self._update_extra(centred, -1)
+
+    def _update_extra(self, centred, sign):
+        pass
+
+    @property
+    def mean(self):
+        return self.shift + self.total / self.count
+
+    def _scatter(self):
+        # Sum of outer products of the rows around their own mean
+        centre = self.total / self.count
+        return self.cross - self.count * np.outer(centre, centre)
+
+    @property
+    def covariance(self):
+        return self._scatter() / (self.count - 1)
+
+
+class EWMACovariance:
+    """
+    RiskMetrics covariance around a zero mean:
+    C_t = decay * C_{t-1} + (1 - decay) * r_t r_t', seeded with r_1 r_1'.
+    fit() applies the recursion to a whole block as one weighted product.
+    """
+
+    def __init__(self, n_assets, decay=RISKMETRICS_DECAY):
+        self.decay = decay
+        self.count = 0
+        self.cov = np.zeros((n_assets, n_assets))
+
+    def fit(self, returns):
+        returns = np.asarray(returns, dtype=float)
+        if self.count == 0 and len(returns):
+            self.update(returns[0])
+            returns = returns[1:]
+        # C_k = decay^k C_0 + sum_t (1 - decay) decay^(k - 1 - t) r_t r_t'
+        k = len(returns)
+        weights = (1 - self.decay) * self.decay ** np.arange(k - 1, -1, -1)
+        self.cov = self.decay ** k * self.cov + (returns * weights[:, None]).T @ returns
+        self.count += k
+        return self
+
+    def update(self, row):
+        row = np.asarray(row, dtype=float)
+        if self.count == 0:
+            self.cov = np.outer(row, row)
+        else:
+            self.cov = self.decay * self.cov + (1 - self.decay) * np.outer(row, row)
+        self.count += 1
+        return self
+
+    @property
+    def covariance(self):
+        return self.cov
+
+
+class LedoitWolfCovariance(SampleCovariance):
+    """
+    Ledoit-Wolf shrinkage towards mu * I, mu the average variance. Besides
+    the sample sums it keeps sum |r|^2, sum |r|^4 and sum |r|^2 r, which give
+    the shrinkage intensity for the current mean without revisiting the rows.
+    Uses the maximum likelihood (ddof=0) sample covariance, like sklearn.
+    """
+
+    def __init__(self, n_assets, window=None):
+        super().__init__(n_assets, window)
+        self.norm2 = 0.0
+        self.norm4 = 0.0
+        self.weighted = np.zeros(n_assets)
+
+    def _fit_extra(self, centred):
+        squared = (centred ** 2).sum(axis=1)
+        self.norm2 += squared.sum()
+        self.norm4 += (squared ** 2).sum()
+        self.weighted += squared @ centred
+
+    def _update_extra(self, centred, sign):
+        squared = centred @ centred
+        self.norm2 += sign * squared
+        self.norm4 += sign * squared ** 2
+        self.weighted += sign * squared * centred
+
+    @property
+    def shrinkage(self):
+        n, n_assets = self.count, len(self.total)
+        empirical = self._scatter() / n
+        mu = np.trace(empirical) / n_assets
+        delta = ((empirical - mu * np.eye(n_assets)) ** 2).sum() / n_assets
+
+        # sum_t |r_t - m|^4 expanded around the stored sums
+        m = self.total / n
+        m_norm2 = m @ m
+        projected = self.total @ m
+        fourth = (self.norm4 - 4 * self.weighted @ m + 4 * m @ self.cross @ m
+                  + 2 * m_norm2 * self.norm2 - 4 * m_norm2 * projected + n * m_norm2 ** 2)
+        beta = (fourth / n - (empirical ** 2).sum()) / (n_assets * n)
+        return 0.0 if delta == 0 else min(beta, delta) / delta
+
+    @property
+    def covariance(self):
+        n_assets = len(self.total)
+        empirical = self._scatter() / self.count
+        mu = np.trace(empirical) / n_assets
+        shrinkage = self.shrinkage
+        return (1 - shrinkage) * empirical + shrinkage * mu * np.eye(n_assets)
+
+
+def make_estimator(method, n_assets, window=None, **options):
+    """
+    Estimator for a method name. EWMA has no window (its memory is set by
+    `decay`) and the windowed methods take no options, so either mismatch
+    raises instead of being dropped.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown covariance method: {method}")
+    if method == "ewma":
+        if window is not None:
+            raise ValueError("EWMA covariance takes no window; set its memory with decay")
+        return EWMACovariance(n_assets, **options)
+    if options:
+        raise ValueError(f"Unexpected options for {method} covariance: {sorted(options)}")
+    if method == "sample":
+        return SampleCovariance(n_assets, window)
+    return LedoitWolfCovariance(n_assets, window)
+
+
+class CovarianceCache:
+    """
+    Estimators keyed by (universe, window, method, options). A returns frame
+    that extends the one seen last (same earlier rows, more at the end) is
+    folded in with update() for the new rows only. "Same earlier rows" is
+    checked on a hash of every row (index and values), so a revised row
+    anywhere in the history forces a refit.
+
+    At most `max_entries` estimators are kept; the least recently used one
+    is dropped first. clear() empties the cache.
+    """
+
+    def __init__(self, max_entries=DEFAULT_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def clear(self):
+        self.entries.clear()
+
+    def estimate(self, returns, method="sample", window=None, **options):
+        returns = pd.DataFrame(returns).dropna()
+        key = (tuple(returns.columns), window, method, tuple(sorted(options.items())))
+        row_hashes = pd.util.hash_pandas_object(returns, index=True).to_numpy()
+        entry = self.entries.get(key)
+        seen = 0
+        if entry is not None:
+            estimator, seen_hashes = entry
+            seen = len(seen_hashes)
+            if len(returns) < seen or not np.array_equal(row_hashes[:seen], seen_hashes):
+                entry, seen = None, 0
+
+        if entry is None:
+            estimator = make_estimator(method, returns.shape[1], window, **options)
+            estimator.fit(returns.to_numpy(dtype=float))
+        else:
+            for row in returns.to_numpy(dtype=float)[seen:]:
+                estimator.update(row)
+
+        self.entries[key] = (estimator, row_hashes)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return pd.DataFrame(estimator.covariance, index=returns.columns, columns=returns.columns)
+
+
+# Shared by estimate(); bounded, and default_cache.clear() frees it
+default_cache = CovarianceCache()
+
+
+def estimate(returns, method="sample", window=None, cache=default_cache, **options):
+    """
+    Daily covariance of a (T, N) returns frame as an (N, N) DataFrame.
+    window limits sample / Ledoit-Wolf to the last `window` rows; options
+    go to the estimator (decay for EWMA). Rows with a missing return are
+    skipped, since running sums cannot do pairwise deletion. Pass
+    cache=None to skip the shared cache.
+    """
+    if cache is None:
+        returns = pd.DataFrame(returns).dropna()
+        estimator = make_estimator(method, returns.shape[1], window, **options)
+        estimator.fit(returns.to_numpy(dtype=float))
+        return pd.DataFrame(estimator.covariance, index=returns.columns, columns=returns.columns)
+    return cache.estimate(returns, method, window, **options)
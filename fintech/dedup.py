@@ -0,0 +1,290 @@
+"""
+Memory-bounded duplicate transaction_id detection.
+
+data.duplicated("transaction_id") needs every id in memory as a Python
+string. Here ids are turned into 64-bit integer keys first:
+
+  - ids shaped like "TXN1000" (a short letter prefix and a number) are
+    interned exactly: the prefix gets a small code and the number is kept as is
+  - anything else is hashed, and the hash is only used to find candidates
+
+Two ways to find the duplicates in a file, both streaming:
+
+  - "bloom": one pass through a Bloom filter collects candidate keys, then a
+    second pass counts only those ids as strings to confirm them exactly
+  - "partition": keys are spilled to disk in hash partitions and each
+    partition is checked on its own with np.unique, so memory is bounded by
+    the partition size even when the candidates themselves are many
+
+KeySet is an exact compact in-memory set of keys for single-pass use
+(txn_stream uses it).
+"""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+# Interned keys: bit 63 clear, prefix code in bits 59-62, number in bits 0-58
+# Hashed keys: bit 63 set
+_HASHED = np.uint64(1 << 63)
+_PREFIX_SHIFT = np.uint64(59)
+_NUMBER_LIMIT = 1 << 59
+_MAX_PREFIXES = 16
+_MAX_DIGITS = 17
+_POWERS = 10 ** np.arange(_MAX_DIGITS, dtype=np.uint64)
+
+
+def _split_ids(ids):
+    """
+    Split ids into (prefix, number) without a per-id Python loop.
+    Works on the ids as a (n, width) byte matrix. Returns the prefixes as
+    fixed-width bytes, the numbers as uint64 and a mask of ids that fit
+    <letters/_/-><number>. Leading zeros are rejected so "TXN01" and "TXN1"
+    never share a key.
+    """
+    try:
+        raw = np.asarray(ids, dtype=object).astype("S")
+    except UnicodeEncodeError:
+        return None, None, np.zeros(len(ids), dtype=bool)
+    width = raw.dtype.itemsize
+    chars = raw.view(np.uint8).reshape(len(raw), width)
+    columns = np.arange(width)
+
+    length = (chars != 0).sum(axis=1)
+    is_digit = (chars >= ord("0")) & (chars <= ord("9"))
+    # The number is the run of digits (and padding) at the end of each id
+    trailing = np.logical_and.accumulate((is_digit | (chars == 0))[:, ::-1], axis=1).sum(axis=1)
+    start = width - trailing
+    n_digits = length - start
+
+    letters = (((chars | 0x20) >= ord("a")) & ((chars | 0x20) <= ord("z"))) | (chars == ord("_")) | (chars == ord("-"))
+    in_prefix = columns[None, :] < start[:, None]
+    first_digit = chars[np.arange(len(raw)), np.minimum(start, width - 1)]
+    fits = ((letters | ~in_prefix).all(axis=1)
+            & (n_digits >= 1) & (n_digits <= _MAX_DIGITS)
+            & ((first_digit != ord("0")) | (n_digits == 1)))
+
+    exponent = np.clip(length[:, None] - 1 - columns[None, :], 0, _MAX_DIGITS - 1)
+    in_number = ~in_prefix & (columns[None, :] < length[:, None]) & fits[:, None]
+    digits = np.where(in_number, chars - ord("0"), 0).astype(np.uint64)
+    numbers = (digits * _POWERS[exponent]).sum(axis=1, dtype=np.uint64)
+    prefixes = np.where(in_prefix, chars, 0).view(f"S{width}").ravel()
+    return prefixes, numbers, fits
+
+
+class IdEncoder:
+    """
+    Turns id strings into uint64 keys; `exact` turns False once any id had to be hashed.
+    """
+
+    def __init__(self):
+        self.prefixes = {}
+        self.exact = True
+
+    def encode(self, ids):
+        ids = pd.Series(ids, dtype=object).reset_index(drop=True)
+        prefixes, numbers, interned = _split_ids(ids.to_numpy())
+
+        keys = np.empty(len(ids), dtype=np.uint64)
+        if interned.any():
+            unique, inverse = np.unique(prefixes[interned], return_inverse=True)
+            for prefix in unique:
+                if prefix not in self.prefixes and len(self.prefixes) < _MAX_PREFIXES:
+                    self.prefixes[prefix] = len(self.prefixes)
+            codes = np.array([self.prefixes.get(prefix, -1) for prefix in unique])[inverse]
+
+            # Ids past the prefix table fall back to hashing
+            fits = codes >= 0
+            rows = np.flatnonzero(interned)
+            keys[rows[fits]] = (codes[fits].astype(np.uint64) << _PREFIX_SHIFT) | numbers[rows[fits]]
+            interned[rows[~fits]] = False
+
+        if not interned.all():
+            self.exact = False
+            keys[~interned] = pd.util.hash_array(ids[~interned].to_numpy()) | _HASHED
+        return keys
+
+    def decode(self, key):
+        """
+        Original id of an interned key.
+        """
+        key = int(key)
+        if key & (1 << 63):
+            raise ValueError("Hashed keys cannot be decoded")
+        codes = {code: prefix.decode() for prefix, code in self.prefixes.items()}
+        return f"{codes[key >> 59]}{key & (_NUMBER_LIMIT - 1)}"
+
+
+def _within_chunk_duplicates(keys):
+    unique, counts = np.unique(keys, return_counts=True)
+    return unique[counts > 1]
+
+
+class KeySet:
+    """
+    Exact set of uint64 keys kept as a few sorted NumPy runs (8 bytes per key).
+    New keys form a run; runs of similar size are merged, so there are only
+    O(log n) runs to search.
+    """
+
+    def __init__(self):
+        self.runs = []
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs)
+
+    def __contains__(self, key):
+        return bool(self.contains(np.array([key], dtype=np.uint64))[0])
+
+    def contains(self, keys):
+        found = np.zeros(len(keys), dtype=bool)
+        for run in self.runs:
+            positions = np.searchsorted(run, keys).clip(max=len(run) - 1)
+            found |= run[positions] == keys
+        return found
+
+    def add(self, keys):
+        """
+        Add a chunk of keys; returns the keys that were already present or
+        repeat within the chunk.
+        """
+        keys = np.asarray(keys, dtype=np.uint64)
+        unique = np.unique(keys)
+        seen = self.contains(unique)
+        duplicates = np.union1d(unique[seen], _within_chunk_duplicates(keys))
+
+        if (~seen).any():
+            self.runs.append(unique[~seen])
+            while len(self.runs) > 1 and len(self.runs[-2]) <= 2 * len(self.runs[-1]):
+                newest = self.runs.pop()
+                self.runs[-1] = np.union1d(self.runs[-1], newest)
+        return duplicates
+
+
+class BloomFilter:
+    """
+    Bloom filter over uint64 keys with k probes from double hashing.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(int(capacity), 1)
+        self.size = max(int(-capacity * np.log(error_rate) / np.log(2) ** 2), 64)
+        self.probes = max(int(round(self.size / capacity * np.log(2))), 1)
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+
+    @staticmethod
+    def _mix(keys):
+        # splitmix64 finaliser
+        with np.errstate(over="ignore"):
+            keys = (keys ^ (keys >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+            keys = (keys ^ (keys >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return keys ^ (keys >> np.uint64(31))
+
+    def _positions(self, keys):
+        first = self._mix(keys)
+        second = self._mix(keys ^ np.uint64(0x9E3779B97F4A7C15)) | np.uint64(1)
+        steps = np.arange(self.probes, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            return (first[:, None] + steps[None, :] * second[:, None]) % np.uint64(self.size)
+
+    def add(self, keys):
+        """
+        Add a chunk of keys; returns True for keys that may have been seen
+        before (in an earlier chunk or earlier in this one).
+        """
+        keys = np.asarray(keys, dtype=np.uint64)
+        positions = self._positions(keys)
+        byte, bit = positions >> np.uint64(3), (positions & np.uint64(7)).astype(np.uint8)
+        maybe_seen = ((self.bits[byte] >> bit) & 1).all(axis=1)
+        maybe_seen |= np.isin(keys, _within_chunk_duplicates(keys))
+        np.bitwise_or.at(self.bits, byte.ravel(), np.left_shift(1, bit.ravel()).astype(np.uint8))
+        return maybe_seen
+
+
+def _read_ids(path, column, chunk_size):
+    for chunk in pd.read_csv(path, usecols=[column], dtype={column: str}, chunksize=chunk_size):
+        yield chunk[column]
+
+
+def _bloom_candidates(path, column, chunk_size, encoder, capacity, error_rate):
+    bloom = BloomFilter(capacity, error_rate)
+    candidates = [np.empty(0, dtype=np.uint64)]
+    for ids in _read_ids(path, column, chunk_size):
+        keys = encoder.encode(ids)
+        candidates.append(np.unique(keys[bloom.add(keys)]))
+    return np.unique(np.concatenate(candidates))
+
+
+def _partition_candidates(path, column, chunk_size, encoder, partitions, spill_dir):
+    directory = Path(tempfile.mkdtemp(dir=spill_dir, prefix="dedup_"))
+    try:
+        files = [open(directory / f"part_{i}.bin", "wb") for i in range(partitions)]
+        try:
+            for ids in _read_ids(path, column, chunk_size):
+                keys = encoder.encode(ids)
+                # Partition on mixed bits so sequential ids spread evenly
+                part = BloomFilter._mix(keys) % np.uint64(partitions)
+                order = np.argsort(part, kind="stable")
+                bounds = np.searchsorted(part[order], np.arange(partitions + 1, dtype=np.uint64))
+                for i in range(partitions):
+                    files[i].write(keys[order[bounds[i]:bounds[i + 1]]].tobytes())
+        finally:
+            for handle in files:
+                handle.close()
+
+        duplicates, counts = [], []
+        for i in range(partitions):
+            keys = np.fromfile(directory / f"part_{i}.bin", dtype=np.uint64)
+            unique, count = np.unique(keys, return_counts=True)
+            duplicates.append(unique[count > 1])
+            counts.append(count[count > 1])
+        return np.concatenate(duplicates), np.concatenate(counts)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _confirm(path, column, chunk_size, encoder, candidates):
+    # Second pass: only ids whose key is a candidate are kept, as strings
+    counts = []
+    for ids in _read_ids(path, column, chunk_size):
+        keys = encoder.encode(ids)
+        counts.append(ids[np.isin(keys, candidates)].value_counts())
+    if not counts:
+        return pd.Series(dtype="int64")
+    counts = pd.concat(counts).groupby(level=0).sum()
+    return counts[counts > 1]
+
+
+def find_duplicates(path, column="transaction_id", method="bloom", chunk_size=DEFAULT_CHUNK_SIZE,
+                    capacity=None, error_rate=0.001, partitions=64, spill_dir=None):
+    """
+    Duplicate ids in a CSV column, as a Series of occurrence counts indexed by id.
+
+    method     "bloom" or "partition"
+    capacity   expected number of ids for the Bloom filter (defaults to a
+               count from a cheap line count of the file)
+    spill_dir  where partition files go (defaults to the system temp dir)
+    """
+    encoder = IdEncoder()
+    if method == "bloom":
+        if capacity is None:
+            with open(path, "rb") as handle:
+                capacity = sum(block.count(b"\n") for block in iter(lambda: handle.read(1 << 20), b""))
+        candidates = _bloom_candidates(path, column, chunk_size, encoder, capacity, error_rate)
+    elif method == "partition":
+        candidates, counts = _partition_candidates(path, column, chunk_size, encoder, partitions, spill_dir)
+        if encoder.exact:
+            # Interned keys are exact, so the partition counts are final
+            ids = [encoder.decode(key) for key in candidates]
+            return pd.Series(counts, index=pd.Index(ids, name=column), name="count").sort_index()
+    else:
+        raise ValueError(f"Unknown duplicate detection method: {method}")
+
+    counts = _confirm(path, column, chunk_size, encoder, candidates)
+    counts.index.name = column
+    return counts.rename("count").sort_index()
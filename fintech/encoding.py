@@ -0,0 +1,133 @@
+"""
+One-hot encoding with a fixed vocabulary, as compact codes or CSR features.
+
+ML2.ipynb and ML3.ipynb call pd.get_dummies separately on the training and
+the scoring data. Each call builds a dense bool column per category and
+derives the columns from whatever categories that file happens to contain,
+so the two layouts only agree when both files hold the same categories.
+CategoricalEncoder learns the vocabulary once and encodes every later frame
+against it:
+
+    encoder = CategoricalEncoder(categorical_cols).fit(data)
+    X = encoder.transform(data, numeric)      # scipy CSR, get_dummies layout
+    model = LinearRegression().fit(X, y)
+    model.predict(encoder.transform(new_data, numeric))
+
+Per categorical column a frame is stored as one small integer code per row
+(int8 below 128 categories) instead of one bool per row and category, and
+transform() emits the one-hot block as CSR with one stored value per row
+and column. sklearn's linear models take the CSR matrix directly. A category
+outside the vocabulary (or a missing value) is code -1 and an all-zero
+dummy row, unless unknown="error".
+
+scipy is imported on first use, so scoring by codes alone (scoring.py)
+does not pay for it.
+"""
+
+import numpy as np
+import pandas as pd
+
+UNKNOWN_CODE = -1
+
+
+class CategoricalEncoder:
+    """
+    columns     categorical columns to encode
+    categories  optional {column: [category, ...]} fixed vocabulary; the
+                columns are then its keys and fit() is not needed
+    unknown     "ignore" (all-zero dummies) or "error" for categories
+                outside the vocabulary
+    """
+
+    def __init__(self, columns=(), categories=None, unknown="ignore"):
+        if unknown not in ("ignore", "error"):
+            raise ValueError(f"unknown must be 'ignore' or 'error', not {unknown!r}")
+        if categories is not None:
+            columns = list(categories)
+        self.columns = list(columns)
+        self.categories = {column: list((categories or {}).get(column, ())) for column in self.columns}
+        self.unknown = unknown
+
+    def fit(self, frame):
+        """
+        Learn the sorted categories of every column, as get_dummies orders them.
+        """
+        self.categories = {column: [] for column in self.columns}
+        return self.partial_fit(frame)
+
+    def partial_fit(self, frame):
+        """
+        Add the categories of one more frame (e.g. a chunk of a large file).
+        Codes from before this call are not valid afterwards.
+        """
+        for column in self.columns:
+            seen = set(self.categories[column]).union(frame[column].dropna().unique().tolist())
+            self.categories[column] = sorted(seen)
+        return self
+
+    # ------------------------------------------------------------------
+    # Vocabulary
+    # ------------------------------------------------------------------
+    @property
+    def n_features(self):
+        return sum(len(values) for values in self.categories.values())
+
+    def feature_names(self, numeric=()):
+        """
+        Column names of transform(frame, numeric), as pd.get_dummies names them.
+        """
+        return list(numeric) + [f"{column}_{value}" for column, values in self.categories.items()
+                                for value in values]
+
+    def dtypes(self):
+        """
+        read_csv dtypes that parse the categorical columns straight to codes.
+        """
+        return {column: pd.CategoricalDtype(values) for column, values in self.categories.items()}
+
+    # ------------------------------------------------------------------
+    # Encoding
+    # ------------------------------------------------------------------
+    def codes(self, frame):
+        """
+        Integer code of every row's category, per column, as a DataFrame;
+        UNKNOWN_CODE where the category is missing or not in the vocabulary.
+        """
+        codes = {}
+        for column in self.columns:
+            values = frame[column]
+            codes[column] = pd.Categorical(values, categories=self.categories[column]).codes
+            if self.unknown == "error":
+                unseen = values[(codes[column] == UNKNOWN_CODE) & values.notna().to_numpy()]
+                if len(unseen):
+                    raise ValueError(f"Categories of {column!r} not in the vocabulary: "
+                                     f"{sorted(unseen.unique(), key=str)}")
+        return pd.DataFrame(codes, index=frame.index)
+
+    def one_hot(self, frame, dtype=np.float64):
+        """
+        (rows, n_features) CSR matrix of the dummies of every column.
+        """
+        from scipy import sparse
+
+        codes = self.codes(frame).to_numpy(dtype=np.int64)
+        offsets = np.cumsum([0] + [len(self.categories[column]) for column in self.columns])[:-1]
+        known = codes != UNKNOWN_CODE
+        # Row-major order of the known entries is already CSR order
+        indices = (codes + offsets)[known]
+        indptr = np.concatenate([[0], np.cumsum(known.sum(axis=1))])
+        data = np.ones(len(indices), dtype=dtype)
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(frame), self.n_features))
+
+    def transform(self, frame, numeric=(), dtype=np.float64):
+        """
+        CSR design matrix: the `numeric` columns followed by the dummies,
+        in the column order of feature_names(numeric).
+        """
+        from scipy import sparse
+
+        dummies = self.one_hot(frame, dtype)
+        if not len(numeric):
+            return dummies
+        values = sparse.csr_matrix(frame[list(numeric)].to_numpy(dtype=dtype))
+        return sparse.hstack([values, dummies], format="csr")
@@ -0,0 +1,61 @@
+"""
+Pooled HTTP session and retry loop shared by the quote fetcher and the
+resume crawler.
+
+pooled_session() sizes the connection pool to the number of threads that
+use it, so every request reuses a TCP/TLS connection. get_with_retry()
+retries connection errors, timeouts and RETRY_STATUS answers with an
+exponential backoff, jittered to 50-100% of each delay so clients that
+failed together do not retry together.
+"""
+
+import random
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Status codes worth retrying: rate limiting and temporary server errors
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+def pooled_session(max_connections, user_agent="Mozilla/5.0"):
+    """
+    requests.Session with room for `max_connections` pooled connections per host.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = user_agent
+    return session
+
+
+def backoff_delay(backoff, attempt):
+    """
+    Seconds to wait before retry number `attempt` + 1.
+    """
+    return backoff * 2 ** attempt * random.uniform(0.5, 1.0)
+
+
+def get_with_retry(session, url, retries=3, backoff=0.5, timeout=10, before_attempt=None, **options):
+    """
+    session.get(url, **options) with up to `retries` extra attempts.
+    before_attempt() is called before every attempt (e.g. a rate limiter).
+    Returns the response; raises requests.HTTPError for an error status,
+    or the last connection error, once the attempts are used up.
+    """
+    for attempt in range(retries + 1):
+        if before_attempt is not None:
+            before_attempt()
+        try:
+            response = session.get(url, timeout=timeout, **options)
+            if response.status_code not in RETRY_STATUS:
+                response.raise_for_status()
+                return response
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == retries:
+                raise
+        if attempt < retries:
+            time.sleep(backoff_delay(backoff, attempt))
+    response.raise_for_status()
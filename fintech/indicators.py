@@ -0,0 +1,437 @@
+"""
+Technical indicators for many tickers at once, in batch or one bar at a time.
+
+Web scrapping/WebScrapping.ipynb computes a 7- and a 30-day moving average
+for one ticker with Series.rolling(). Here every indicator is computed over a
+(T, N) price matrix, one column per ticker, with no loop over tickers:
+
+    indicators = compute(closes)                 # {name: (T, N) DataFrame}
+    indicators["rsi_14"].iloc[-1]
+
+  - sma_<w>           simple moving average over w bars
+  - ema_<span>        exponential moving average (pandas ewm(span).mean())
+  - volatility_<w>    annualised rolling std of daily simple returns
+  - rsi_<n>           Wilder's relative strength index
+  - bollinger_*       middle / upper / lower band: SMA +- width * rolling std
+  - drawdown          price / running peak - 1
+
+Rolling windows come from cumulative sums, the EMA from a linear filter down
+the time axis, so the cost is O(T * N) whatever the window lengths. The
+cumulative sums restart every BLOCK_ROWS rows around that block's own means,
+so a long trending series keeps the precision of rolling().std(). A NaN
+price means "no bar" (e.g. before a ticker listed); windowed indicators are
+NaN until they hold `w` bars, as rolling(w) is.
+
+IndicatorEngine is the streaming form: it keeps ring buffers of the last
+bars and running sums, so update(bar) with one new row of N prices updates
+every indicator in O(1) per ticker instead of recomputing the history.
+The running sums are recomputed from the ring buffer once per window, so
+their rounding error does not grow with the number of updates.
+
+    engine = IndicatorEngine.from_history(closes)
+    latest = engine.update(new_closes)           # {name: (N,) array}
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+from fintech.portfolio import TRADING_DAYS
+
+# Rows per block of the batch rolling sums, each block shifted by its own means
+BLOCK_ROWS = 1024
+
+
+@dataclass
+class IndicatorSet:
+    """
+    Which indicators to compute, and their windows.
+    """
+    sma_windows: tuple = (7, 30)
+    ema_spans: tuple = (12, 26)
+    volatility_window: int = 21
+    rsi_period: int = 14
+    bollinger_window: int = 20
+    bollinger_width: float = 2.0
+    trading_days: int = TRADING_DAYS
+
+    def names(self):
+        return ([f"sma_{w}" for w in self.sma_windows] + [f"ema_{span}" for span in self.ema_spans]
+                + [f"volatility_{self.volatility_window}", f"rsi_{self.rsi_period}",
+                   "bollinger_middle", "bollinger_upper", "bollinger_lower", "drawdown"])
+
+
+# ----------------------------------------------------------------------
+# Batch
+# ----------------------------------------------------------------------
+def _values(prices):
+    values = np.asarray(prices, dtype=float)
+    return values[:, None] if values.ndim == 1 else values
+
+
+def _column_means(values):
+    # nanmean without the warning for all-NaN columns, which get NaN
+    mask = ~np.isnan(values)
+    count = mask.sum(axis=0)
+    return np.where(count > 0, np.where(mask, values, 0.0).sum(axis=0) / np.maximum(count, 1), np.nan)
+
+
+def _trailing(term, window):
+    # Sum of the trailing `window` rows for every row, from one cumulative sum
+    total = np.cumsum(term, axis=0)
+    total[window:] = total[window:] - total[:-window].copy()
+    return total
+
+
+def _rolling_mean_std(values, window, with_std=True):
+    """
+    Rolling mean and sample std over `window` rows, NaN unless the window
+    holds `window` prices. The sums are taken block by block, each block of
+    BLOCK_ROWS rows (plus the window rows before it) shifted by its own
+    column means, so the cumulative sums stay small and rounding does not
+    build up along a long or trending series.
+    """
+    mask = ~np.isnan(values)
+    if mask.all():
+        full = np.broadcast_to((np.arange(len(values)) >= window - 1)[:, None], values.shape)
+    else:
+        full = np.rint(_trailing(mask.astype(float), window)) == window
+    mean = np.full(values.shape, np.nan)
+    std = np.full(values.shape, np.nan) if with_std else None
+    block = max(BLOCK_ROWS, window)
+    for start in range(0, len(values), block):
+        # The segment begins window - 1 rows early, so its first kept row has a full window
+        lower = max(0, start - window + 1)
+        segment = values[lower:start + block]
+        shift = np.nan_to_num(_column_means(segment))
+        centred = np.where(mask[lower:start + block], segment - shift, 0.0)
+        total = _trailing(centred, window)[start - lower:]
+        rows = slice(start, start + len(total))
+        mean[rows] = np.where(full[rows], shift + total / window, np.nan)
+        if with_std:
+            variance = (_trailing(centred ** 2, window)[start - lower:] - total ** 2 / window) / (window - 1)
+            std[rows] = np.where(full[rows], np.sqrt(np.clip(variance, 0, None)), np.nan)
+    return mean, std
+
+
+def _returns(values):
+    returns = np.full_like(values, np.nan)
+    returns[1:] = values[1:] / values[:-1] - 1
+    return returns
+
+
+def _frame(result, prices):
+    if isinstance(prices, pd.Series):
+        return pd.Series(result[:, 0], index=prices.index, name=prices.name)
+    if isinstance(prices, pd.DataFrame):
+        return pd.DataFrame(result, index=prices.index, columns=prices.columns)
+    return result
+
+
+def sma(prices, window):
+    """
+    Simple moving average, as prices.rolling(window).mean().
+    """
+    return _frame(_rolling_mean_std(_values(prices), window, with_std=False)[0], prices)
+
+
+def _ema_sums(values, span):
+    # ewm(adjust=True): numerator and weight total of the decaying sums, both
+    # one first-order recursion down the time axis; a NaN adds no weight
+    decay = 1 - 2 / (span + 1)
+    mask = ~np.isnan(values)
+    numerator = lfilter([1.0], [1.0, -decay], np.where(mask, values, 0.0), axis=0)
+    weight = lfilter([1.0], [1.0, -decay], mask.astype(float), axis=0)
+    return numerator, weight
+
+
+def ema(prices, span):
+    """
+    Exponential moving average, as prices.ewm(span=span).mean().
+    """
+    numerator, weight = _ema_sums(_values(prices), span)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return _frame(np.where(weight > 0, numerator / weight, np.nan), prices)
+
+
+def volatility(prices, window, trading_days=TRADING_DAYS):
+    """
+    Rolling std of daily simple returns over `window` returns, annualised
+    with sqrt(trading_days) (trading_days=1 for the daily figure).
+    """
+    std = _rolling_mean_std(_returns(_values(prices)), window)[1]
+    return _frame(std * np.sqrt(trading_days), prices)
+
+
+def _wilder(values, period):
+    """
+    Wilder-smoothed average gain and loss per row, and the count of price
+    changes seen: the first `period` changes are averaged, later ones
+    smoothed as avg = (avg * (period - 1) + change) / period. Rows are
+    walked in time order, every ticker at once.
+    """
+    changes = np.diff(values, axis=0, prepend=np.nan)
+    n = values.shape[1]
+    gain, loss, seen = np.zeros(n), np.zeros(n), np.zeros(n)
+    gains, losses, counts = (np.empty_like(values) for _ in range(3))
+    for t, change in enumerate(changes):
+        gain, loss, seen = _wilder_step(gain, loss, seen, change, period)
+        gains[t], losses[t], counts[t] = gain, loss, seen
+    return gains, losses, counts
+
+
+def _wilder_step(gain, loss, seen, change, period):
+    valid = ~np.isnan(change)
+    up = np.where(valid, np.clip(change, 0, None), 0.0)
+    down = np.where(valid, np.clip(-change, 0, None), 0.0)
+    seen = seen + valid
+    seeding = valid & (seen <= period)
+    smoothing = valid & (seen > period)
+    # While seeding the state holds running sums, divided once the period is full
+    gain = np.where(seeding, gain + up, np.where(smoothing, (gain * (period - 1) + up) / period, gain))
+    loss = np.where(seeding, loss + down, np.where(smoothing, (loss * (period - 1) + down) / period, loss))
+    filled = valid & (seen == period)
+    gain = np.where(filled, gain / period, gain)
+    loss = np.where(filled, loss / period, loss)
+    return gain, loss, seen
+
+
+def _rsi_from(gain, loss, seen, price, period):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rsi = 100 * gain / (gain + loss)
+    return np.where((seen >= period) & ~np.isnan(price), rsi, np.nan)
+
+
+def rsi(prices, period=14):
+    """
+    Wilder's RSI, 100 * average gain / (average gain + average loss).
+    """
+    values = _values(prices)
+    gains, losses, counts = _wilder(values, period)
+    return _frame(_rsi_from(gains, losses, counts, values, period), prices)
+
+
+def bollinger_bands(prices, window=20, width=2.0):
+    """
+    (middle, upper, lower) bands: rolling mean +- width * rolling sample std.
+    """
+    mean, std = _rolling_mean_std(_values(prices), window)
+    return _frame(mean, prices), _frame(mean + width * std, prices), _frame(mean - width * std, prices)
+
+
+def drawdown(prices):
+    """
+    Fall from the running peak, price / peak - 1 (0 at a new high).
+    """
+    values = _values(prices)
+    peak = np.fmax.accumulate(values, axis=0)
+    return _frame(values / peak - 1, prices)
+
+
+def compute(prices, indicators=None):
+    """
+    Every indicator of an IndicatorSet for a (T, N) price frame, as a dict of
+    (T, N) frames keyed by IndicatorSet.names().
+    """
+    spec = indicators or IndicatorSet()
+    result = {f"sma_{w}": sma(prices, w) for w in spec.sma_windows}
+    result.update({f"ema_{span}": ema(prices, span) for span in spec.ema_spans})
+    result[f"volatility_{spec.volatility_window}"] = volatility(prices, spec.volatility_window,
+                                                                spec.trading_days)
+    result[f"rsi_{spec.rsi_period}"] = rsi(prices, spec.rsi_period)
+    bands = bollinger_bands(prices, spec.bollinger_window, spec.bollinger_width)
+    result.update(zip(["bollinger_middle", "bollinger_upper", "bollinger_lower"], bands))
+    result["drawdown"] = drawdown(prices)
+    return result
+
+
+# ----------------------------------------------------------------------
+# Streaming
+# ----------------------------------------------------------------------
+class _RollingSums:
+    """
+    Sum, sum of squares and count of the non-NaN values among the last
+    `window` rows, around a per-ticker shift. Adding and removing rows
+    leaves rounding error behind, so every `window` slides the owner calls
+    rebuild() with the rows now in the window, which recomputes the sums
+    around the window's own mean: O(1) per update on average, and the
+    error never outlives one window.
+    """
+
+    def __init__(self, window, shift):
+        self.window = window
+        self.shift = shift
+        self.total = np.zeros(len(shift))
+        self.total_sq = np.zeros(len(shift))
+        self.count = np.zeros(len(shift))
+        self.slides = 0
+
+    def slide(self, entering, leaving):
+        for value, sign in ((entering, 1.0), (leaving, -1.0)):
+            valid = ~np.isnan(value)
+            centred = np.where(valid, value - self.shift, 0.0)
+            self.total += sign * centred
+            self.total_sq += sign * centred ** 2
+            self.count += sign * valid
+        self.slides += 1
+
+    def rebuild(self, rows):
+        """
+        Recompute the sums from the rows in the window, re-anchored on their
+        mean (tickers with no rows keep their shift).
+        """
+        valid = ~np.isnan(rows)
+        self.shift = np.where(valid.any(axis=0), np.nan_to_num(_column_means(rows)), self.shift)
+        centred = np.where(valid, rows - self.shift, 0.0)
+        self.total = centred.sum(axis=0)
+        self.total_sq = (centred ** 2).sum(axis=0)
+        self.count = valid.sum(axis=0).astype(float)
+        self.slides = 0
+
+    def mean_std(self):
+        full = self.count == self.window
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(full, self.shift + self.total / self.window, np.nan)
+            variance = (self.total_sq - self.total ** 2 / self.window) / (self.window - 1)
+            std = np.where(full, np.sqrt(np.clip(variance, 0, None)), np.nan)
+        return mean, std
+
+
+class IndicatorEngine:
+    """
+    Streaming indicators for a fixed list of tickers: update(bar) takes one
+    row of N prices (NaN for no bar) and returns every indicator for that
+    row as {name: (N,) array}, the same values compute() gives for the last
+    row of the whole history.
+    """
+
+    def __init__(self, symbols, indicators=None):
+        self.symbols = list(symbols)
+        self.spec = indicators or IndicatorSet()
+        n = len(self.symbols)
+        spec = self.spec
+        self.price_windows = sorted(set(spec.sma_windows) | {spec.bollinger_window})
+        # Ring buffers of the last prices and returns; slot `position` is the oldest
+        self.prices = np.full((max(self.price_windows), n), np.nan)
+        self.returns = np.full((spec.volatility_window, n), np.nan)
+        self.position = 0
+        self.shift = np.full(n, np.nan)
+        self.price_sums = None
+        self.return_sums = _RollingSums(spec.volatility_window, np.zeros(n))
+        self.ema_decays = {span: 1 - 2 / (span + 1) for span in spec.ema_spans}
+        self.ema_numerator = {span: np.zeros(n) for span in spec.ema_spans}
+        self.ema_weight = {span: np.zeros(n) for span in spec.ema_spans}
+        self.gain, self.loss, self.seen = np.zeros(n), np.zeros(n), np.zeros(n)
+        self.peak = np.full(n, np.nan)
+        self.last = np.full(n, np.nan)
+        self.bars = 0
+
+    @classmethod
+    def from_history(cls, prices, indicators=None):
+        """
+        Engine positioned after the last row of a (T, N) price frame. The
+        state is built with the batch code, not T single-bar updates.
+        """
+        engine = cls(getattr(prices, "columns", range(_values(prices).shape[1])), indicators)
+        engine._warm_up(_values(prices))
+        return engine
+
+    def _ring_slot(self, ring, lag):
+        # Row pushed `lag` bars ago (lag=1 is the latest)
+        return ring[(self.bars - lag) % len(ring)]
+
+    def _ring_recent(self, ring, count):
+        # The last `count` rows pushed, oldest first
+        return ring[(self.bars - np.arange(count, 0, -1)) % len(ring)]
+
+    def _warm_up(self, values):
+        spec = self.spec
+        t = len(values)
+        self.bars = t
+        self.shift = _column_means(values)
+        returns = _returns(values)
+        for ring, history in ((self.prices, values), (self.returns, returns)):
+            size = len(ring)
+            recent = history[-size:]
+            for lag, row in enumerate(recent[::-1], 1):
+                ring[(t - lag) % size] = row
+        self.price_sums = {w: _RollingSums(w, np.nan_to_num(self.shift)) for w in self.price_windows}
+        for w, sums in self.price_sums.items():
+            sums.rebuild(values[-w:])
+        self.return_sums.rebuild(returns[-spec.volatility_window:])
+        if t:
+            for span in spec.ema_spans:
+                numerator, weight = _ema_sums(values, span)
+                self.ema_numerator[span], self.ema_weight[span] = numerator[-1], weight[-1]
+            gains, losses, counts = _wilder(values, spec.rsi_period)
+            self.gain, self.loss, self.seen = gains[-1], losses[-1], counts[-1]
+            with np.errstate(invalid="ignore"):
+                self.peak = np.fmax.reduce(values, axis=0)
+            self.last = values[-1]
+
+    def update(self, bar):
+        """
+        Fold in one new bar (N prices) and return the indicators for it.
+        """
+        bar = np.asarray(bar, dtype=float).ravel()
+        spec = self.spec
+        if self.price_sums is None:
+            self.price_sums = {w: _RollingSums(w, np.zeros(len(bar))) for w in self.price_windows}
+        # A ticker's first price becomes its shift; its sums are still empty
+        first = np.isnan(self.shift) & ~np.isnan(bar)
+        if first.any():
+            self.shift = np.where(first, bar, self.shift)
+            for sums in self.price_sums.values():
+                sums.shift = np.where(first, bar, sums.shift)
+
+        returns = bar / self.last - 1
+        for w, sums in self.price_sums.items():
+            sums.slide(bar, self._ring_slot(self.prices, w))
+        self.return_sums.slide(returns, self._ring_slot(self.returns, spec.volatility_window))
+        self.prices[self.bars % len(self.prices)] = bar
+        self.returns[self.bars % len(self.returns)] = returns
+        self.bars += 1
+        for w, sums in self.price_sums.items():
+            if sums.slides >= w:
+                sums.rebuild(self._ring_recent(self.prices, w))
+        if self.return_sums.slides >= spec.volatility_window:
+            self.return_sums.rebuild(self._ring_recent(self.returns, spec.volatility_window))
+
+        valid = ~np.isnan(bar)
+        for span, decay in self.ema_decays.items():
+            self.ema_numerator[span] = decay * self.ema_numerator[span] + np.where(valid, bar, 0.0)
+            self.ema_weight[span] = decay * self.ema_weight[span] + valid
+        self.gain, self.loss, self.seen = _wilder_step(self.gain, self.loss, self.seen,
+                                                       bar - self.last, spec.rsi_period)
+        self.peak = np.fmax(self.peak, bar)
+        self.last = bar
+        return self.values()
+
+    def values(self):
+        """
+        Every indicator for the latest bar, as {name: (N,) array}.
+        """
+        spec = self.spec
+        result = {f"sma_{w}": self.price_sums[w].mean_std()[0] for w in spec.sma_windows}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for span in spec.ema_spans:
+                weight = self.ema_weight[span]
+                result[f"ema_{span}"] = np.where(weight > 0, self.ema_numerator[span] / weight, np.nan)
+            std = self.return_sums.mean_std()[1]
+            result[f"volatility_{spec.volatility_window}"] = std * np.sqrt(spec.trading_days)
+            result[f"rsi_{spec.rsi_period}"] = _rsi_from(self.gain, self.loss, self.seen, self.last,
+                                                         spec.rsi_period)
+            mean, std = self.price_sums[spec.bollinger_window].mean_std()
+            result["bollinger_middle"] = mean
+            result["bollinger_upper"] = mean + spec.bollinger_width * std
+            result["bollinger_lower"] = mean - spec.bollinger_width * std
+            result["drawdown"] = self.last / self.peak - 1
+        return result
+
+    def snapshot(self):
+        """
+        values() as a DataFrame, one row per ticker.
+        """
+        return pd.DataFrame(self.values(), index=self.symbols)
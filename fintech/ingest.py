@@ -0,0 +1,224 @@
+"""
+Typed CSV ingest with a cached binary sidecar.
+
+The scripts used to call pd.read_csv and then pd.to_datetime with the format
+inferred (or dayfirst=True), leaving text columns as Python objects. Here
+every dataset has a Schema with explicit date formats and compact dtypes:
+
+    data = ingest.load("bank_transactions.csv")
+
+The first load parses the CSV and writes the typed frame next to it, in
+<source>.ingest/ (Parquet when pyarrow is installed, a pickle otherwise).
+Later loads read the sidecar while the source is unchanged. The check is
+mtime and size first; when only the mtime moved, a content hash decides,
+so touching or re-copying a file does not force a re-parse.
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+# Bump when the sidecar layout changes so old caches are ignored
+CACHE_VERSION = 1
+HASH_BLOCK = 1 << 20
+
+
+@dataclass
+class Schema:
+    """
+    How to read one dataset.
+
+    dates         {column: strftime format}; unparseable values become NaT
+                  when coerce_dates is set, otherwise they raise
+    dtypes        dtypes handed to read_csv, e.g. "category" or "float32"
+    index         column to use as the index after parsing
+    read_options  any other read_csv keyword arguments
+    """
+    dates: dict = field(default_factory=dict)
+    dtypes: dict = field(default_factory=dict)
+    coerce_dates: bool = False
+    index: str = None
+    read_options: dict = field(default_factory=dict)
+
+    def fingerprint(self):
+        return hashlib.sha1(json.dumps(asdict(self), sort_keys=True, default=str).encode()).hexdigest()
+
+
+# Datasets shipped with the repo, keyed by file name without .csv
+SCHEMAS = {
+    "bank_transactions": Schema(
+        dates={"date": "%Y-%m-%d %H:%M:%S"},
+        dtypes={"transaction_id": "string", "account_id": "category", "customer_name": "category",
+                "transaction_type": "category", "amount": "float64", "channel": "category",
+                "balance": "float64"},
+    ),
+    "financial_time_series": Schema(
+        dates={"date": "%d-%m-%Y %H:%M"},
+        dtypes={"transaction_id": "string", "account_id": "category", "amount": "float64",
+                "transaction_type": "category"},
+        # The header ends in two unnamed empty columns
+        read_options={"usecols": ["transaction_id", "account_id", "date", "amount", "transaction_type"]},
+    ),
+    "Uncleaned": Schema(
+        # Salary holds text such as "Sixty Thousand" and Hire Date bad dates;
+        # both stay text for the cleaning engine to repair, and so do the
+        # misspelled categorical columns
+        dtypes={"Employee ID": "int32", "Age": "float32"},
+    ),
+    "historical_stock_prices2": Schema(
+        dates={"Date": "%Y-%m-%d"},
+        dtypes={"Close": "float64"},
+        index="Date",
+    ),
+    "Updated_Portfolio_Management": Schema(
+        dates={"Date": "%Y-%m-%d"},
+        read_options={"index_col": 0},
+    ),
+    "Loan_Repayment_Training_Data": Schema(
+        dtypes={"Age": "int16", "Annual Income (LPA)": "float32", "Borrowed Amount (LPA)": "float32",
+                "Credit Score": "int16", "Loan Tenure (months)": "int16", "Existing Loans": "int8",
+                "Employment Status": "category", "Marital Status": "category",
+                "Education Level": "category", "Repayment Probability": "float32"},
+    ),
+    "House_Price_Training_Data": Schema(
+        dtypes={"Furnishing_Status": "category", "Locality_Category": "category",
+                "Distance_from_CityCenter_km": "float32", "Crime_Rate_Index": "float32"},
+    ),
+}
+
+
+def schema_for(path):
+    """
+    Schema registered for a file name, or an empty schema (plain read_csv).
+    """
+    return SCHEMAS.get(Path(path).stem, Schema())
+
+
+def read_csv(path, schema=None, **read_options):
+    """
+    Parse a CSV with a schema, without any cache.
+    """
+    schema = schema or schema_for(path)
+    return _finish(pd.read_csv(path, **_csv_options(schema, read_options)), schema)
+
+
+def read_chunks(path, schema=None, chunk_size=1_000_000, **read_options):
+    """
+    Same as read_csv, one typed chunk at a time.
+    """
+    schema = schema or schema_for(path)
+    for chunk in pd.read_csv(path, chunksize=chunk_size, **_csv_options(schema, read_options)):
+        yield _finish(chunk, schema)
+
+
+def _csv_options(schema, read_options):
+    options = {**schema.read_options, **read_options}
+    usecols = options.get("usecols")
+    options["dtype"] = {column: dtype for column, dtype in schema.dtypes.items()
+                        if usecols is None or column in usecols}
+    return options
+
+
+def _finish(data, schema):
+    errors = "coerce" if schema.coerce_dates else "raise"
+    for column, date_format in schema.dates.items():
+        data[column] = pd.to_datetime(data[column], format=date_format, errors=errors)
+    if schema.index:
+        data = data.set_index(schema.index)
+    return data
+
+
+def _file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _has_parquet():
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+class Sidecar:
+    """
+    Cached typed copy of one CSV, stored in <source>.ingest/.
+    """
+
+    def __init__(self, source, schema=None, directory=None):
+        self.source = Path(source)
+        self.schema = schema or schema_for(source)
+        self.directory = Path(directory or self.source.with_name(self.source.name + ".ingest"))
+        self.format = "parquet" if _has_parquet() else "pickle"
+        self.data_path = self.directory / f"data.{self.format}"
+        self.meta_path = self.directory / "meta.json"
+
+    def _source_meta(self):
+        stat = self.source.stat()
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+    def _stored_meta(self):
+        if not (self.meta_path.exists() and self.data_path.exists()):
+            return None
+        meta = json.loads(self.meta_path.read_text())
+        if meta.get("version") != CACHE_VERSION or meta.get("schema") != self.schema.fingerprint():
+            return None
+        return meta
+
+    def is_fresh(self):
+        """
+        True when the sidecar matches the source; refreshes a stale mtime if
+        the content hash still matches.
+        """
+        meta = self._stored_meta()
+        if meta is None:
+            return False
+        current = self._source_meta()
+        if current["size"] != meta["size"]:
+            return False
+        if current["mtime_ns"] == meta["mtime_ns"]:
+            return True
+        if _file_hash(self.source) != meta["sha1"]:
+            return False
+        meta["mtime_ns"] = current["mtime_ns"]
+        self.meta_path.write_text(json.dumps(meta))
+        return True
+
+    def _write(self, data):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Write then rename so a crash never leaves a half-written sidecar
+        temporary = self.directory / f"data.tmp.{self.format}"
+        if self.format == "parquet":
+            data.to_parquet(temporary)
+        else:
+            data.to_pickle(temporary)
+        os.replace(temporary, self.data_path)
+        meta = {"version": CACHE_VERSION, "schema": self.schema.fingerprint(),
+                "sha1": _file_hash(self.source), **self._source_meta()}
+        self.meta_path.write_text(json.dumps(meta))
+
+    def _read(self):
+        if self.format == "parquet":
+            return pd.read_parquet(self.data_path)
+        return pd.read_pickle(self.data_path)
+
+    def load(self):
+        if self.is_fresh():
+            return self._read()
+        data = read_csv(self.source, self.schema)
+        self._write(data)
+        return data
+
+
+def load(path, schema=None, cache=True):
+    """
+    Typed frame for a CSV, from the sidecar when the source is unchanged.
+    """
+    if not cache:
+        return read_csv(path, schema)
+    return Sidecar(path, schema).load()
@@ -0,0 +1,372 @@
+"""
+Stage timings and memory use of a run, written as JSON next to its output.
+
+The scripts print "[Step 1] ...", "[Step 2] ..." banners but record nothing
+about how long each step took. A Recorder collects, per named stage,
+
+  - calls, wall time (perf_counter) and CPU time (process_time)
+  - resident memory growth and the process's peak RSS at the end of the stage
+  - with trace_memory, the peak Python / NumPy allocation inside the stage
+    (tracemalloc)
+  - with profile, the top functions of every outermost stage (cProfile)
+
+Stages nest ("var/monte_carlo") and calls of the same stage are added up,
+so a stage inside a chunk loop is one entry however many chunks there are.
+
+    recorder = Recorder("var", trace_memory=True)
+    with recorder:
+        with recorder.stage("download"):
+            prices = store.close_prices(...)
+        results = var_engine.compute_var(...)   # reports its own stages
+    recorder.write("reports")
+
+Library code marks its hot paths with the module level stage() and
+iterate(), which report to the recorder that is active (entered with
+`with recorder:`). With no active recorder they return a shared no-op
+context manager / the iterable itself, so instrumented code costs one
+global lookup per call when metrics are off.
+
+cProfile and pstats are only imported when profiling is on. Scripts read
+their settings from the environment with from_environment():
+FINTECH_METRICS=1 turns recording on ("profile" and "memory" may be added,
+e.g. FINTECH_METRICS=profile,memory). FINTECH_METRICS_DIR, through
+metrics_directory(), replaces a script's default output folder; a folder
+passed to write() explicitly is always used as is.
+"""
+
+import contextlib
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+METRICS_VARIABLE = "FINTECH_METRICS"
+METRICS_DIR_VARIABLE = "FINTECH_METRICS_DIR"
+PROFILE_FUNCTIONS = 15
+
+_NULL = contextlib.nullcontext()
+_active = None
+
+
+def _rss():
+    """
+    Current resident set size in bytes (None where /proc is not available).
+    """
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _peak_rss():
+    """
+    Highest resident set size of the process so far, in bytes.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class _StageStats:
+    def __init__(self):
+        self.calls = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.rss_delta_bytes = 0
+        self.peak_rss_bytes = None
+        self.traced_peak_bytes = None
+        self.profile = None
+
+    def as_dict(self, name):
+        result = {
+            "stage": name,
+            "calls": self.calls,
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "rss_delta_bytes": self.rss_delta_bytes,
+            "peak_rss_bytes": self.peak_rss_bytes,
+        }
+        if self.traced_peak_bytes is not None:
+            result["traced_peak_bytes"] = self.traced_peak_bytes
+        if self.profile is not None:
+            result["profile"] = _top_functions(self.profile)
+        return result
+
+
+def _top_functions(profile, limit=PROFILE_FUNCTIONS):
+    import pstats
+
+    stats = pstats.Stats(profile)
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [{"function": f"{path}:{line}({name})", "calls": calls, "total_seconds": total,
+             "cumulative_seconds": cumulative}
+            for (path, line, name), (_, calls, total, cumulative, _) in rows]
+
+
+class _Frame:
+    """
+    One open stage on a thread's stack.
+    """
+    __slots__ = ("path", "wall", "cpu", "rss", "traced_start", "traced_peak")
+
+
+class Recorder:
+    """
+    Collects stage metrics for one run.
+
+    name          run name, used in the metrics file name
+    enabled       False makes every method a no-op
+    profile       cProfile every outermost stage
+    trace_memory  track allocations with tracemalloc (slows allocation-heavy code)
+    """
+
+    def __init__(self, name, enabled=True, profile=False, trace_memory=False):
+        self.name = name
+        self.enabled = enabled
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self.started = None
+        self.wall_seconds = None
+        self._start_wall = None
+        self._started_tracing = False
+        self._previous = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._profilers = {}
+
+    @classmethod
+    def from_environment(cls, name):
+        """
+        Recorder configured by $FINTECH_METRICS (disabled when it is unset or "0").
+        """
+        setting = os.environ.get(METRICS_VARIABLE, "").lower()
+        options = {option.strip() for option in setting.split(",")}
+        enabled = bool(setting) and setting not in ("0", "off", "false")
+        return cls(name, enabled, profile="profile" in options, trace_memory="memory" in options)
+
+    # ------------------------------------------------------------------
+    # Activation
+    # ------------------------------------------------------------------
+    def start(self):
+        """
+        Make this the active recorder; same as entering `with recorder:`.
+        Returns the recorder, for scripts that cannot indent into a with block.
+        """
+        global _active
+        if not self.enabled:
+            return self
+        self.started = datetime.now(timezone.utc)
+        self._start_wall = time.perf_counter()
+        # Only stop tracemalloc at the end if this recorder started it
+        self._started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+        self._previous, _active = _active, self
+        return self
+
+    def stop(self):
+        global _active
+        if not self.enabled or self._start_wall is None:
+            return self
+        _active = self._previous
+        self.wall_seconds = time.perf_counter() - self._start_wall
+        if self._started_tracing:
+            tracemalloc.stop()
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+        return False
+
+    # ------------------------------------------------------------------
+    # Stages
+    # ------------------------------------------------------------------
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def stage(self, name):
+        """
+        Context manager timing one stage, nested under the stage already open.
+        """
+        if not self.enabled:
+            return _NULL
+        return self._stage(name)
+
+    @contextlib.contextmanager
+    def _stage(self, name):
+        stack = self._stack()
+        frame = _Frame()
+        frame.path = f"{stack[-1].path}/{name}" if stack else name
+        profiler = None
+        if self.profile and not stack:
+            import cProfile
+
+            # Only outermost stages are profiled: cProfile cannot nest
+            if frame.path not in self._profilers:
+                self._profilers[frame.path] = cProfile.Profile()
+            profiler = self._profilers[frame.path]
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].traced_peak = max(stack[-1].traced_peak, peak)
+            tracemalloc.reset_peak()
+            frame.traced_start = frame.traced_peak = current
+        stack.append(frame)
+        frame.rss = _rss()
+        frame.cpu = time.process_time()
+        frame.wall = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            wall = time.perf_counter() - frame.wall
+            cpu = time.process_time() - frame.cpu
+            rss = _rss()
+            stack.pop()
+            traced_peak = None
+            if tracing:
+                frame.traced_peak = max(frame.traced_peak, tracemalloc.get_traced_memory()[1])
+                traced_peak = frame.traced_peak - frame.traced_start
+                tracemalloc.reset_peak()
+                if stack:
+                    stack[-1].traced_peak = max(stack[-1].traced_peak, frame.traced_peak)
+            self._add(frame.path, wall, cpu, rss - frame.rss if rss is not None and frame.rss is not None else 0,
+                      traced_peak, profiler)
+
+    def _add(self, path, wall, cpu, rss_delta, traced_peak, profiler):
+        with self._lock:
+            stats = self.stages.setdefault(path, _StageStats())
+            stats.calls += 1
+            stats.wall_seconds += wall
+            stats.cpu_seconds += cpu
+            stats.rss_delta_bytes += rss_delta
+            stats.peak_rss_bytes = _peak_rss()
+            if traced_peak is not None:
+                stats.traced_peak_bytes = max(stats.traced_peak_bytes or 0, traced_peak)
+            if profiler is not None:
+                stats.profile = profiler
+
+    def iterate(self, iterable, name):
+        """
+        Yield from `iterable`, timing each step under stage `name`, e.g. to
+        measure reading the chunks of a file separately from processing them.
+        """
+        if not self.enabled:
+            return iterable
+        return self._iterate(iterable, name)
+
+    def _iterate(self, iterable, name):
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+    def metrics(self):
+        """
+        The run and its stages (in the order they first finished) as a dict.
+        """
+        return {
+            "run": self.name,
+            "started": self.started.isoformat(timespec="seconds") if self.started else None,
+            "wall_seconds": self.wall_seconds,
+            "argv": sys.argv,
+            "pid": os.getpid(),
+            "python": platform.python_version(),
+            "peak_rss_bytes": _peak_rss(),
+            "stages": [stats.as_dict(path) for path, stats in self.stages.items()],
+        }
+
+    def write(self, directory):
+        """
+        Write <directory>/<name>-<start time>.metrics.json, plus one .prof
+        file per profiled stage for pstats / snakeviz. Returns the JSON path,
+        or None when disabled. Use metrics_directory(default) for a folder
+        that $FINTECH_METRICS_DIR may override.
+        """
+        if not self.enabled:
+            return None
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        stem = f"{self.name}-{(self.started or datetime.now(timezone.utc)).strftime('%Y%m%dT%H%M%S')}"
+        path = directory / f"{stem}.metrics.json"
+        path.write_text(json.dumps(self.metrics(), indent=2))
+        for stage, profiler in self._profilers.items():
+            profiler.dump_stats(directory / f"{stem}.{stage.replace('/', '.')}.prof")
+        return path
+
+    def summary(self):
+        """
+        Text table of the stages, for printing at the end of a run.
+        """
+        lines = [f"{'stage':<40}{'calls':>7}{'wall s':>10}{'cpu s':>10}{'rss MiB':>10}"]
+        for path, stats in self.stages.items():
+            lines.append(f"{path:<40}{stats.calls:>7}{stats.wall_seconds:>10.3f}{stats.cpu_seconds:>10.3f}"
+                         f"{stats.rss_delta_bytes / 2 ** 20:>10.1f}")
+        return "\n".join(lines)
+
+
+def metrics_directory(default):
+    """
+    Output directory for metrics: $FINTECH_METRICS_DIR if set, otherwise `default`.
+    """
+    return Path(os.environ.get(METRICS_DIR_VARIABLE) or default)
+
+
+# ----------------------------------------------------------------------
+# Hooks for library code
+# ----------------------------------------------------------------------
+def active():
+    """
+    The recorder currently collecting metrics, or None.
+    """
+    return _active
+
+
+def stage(name):
+    """
+    recorder.stage(name) on the active recorder; a no-op without one.
+    """
+    if _active is None:
+        return _NULL
+    return _active.stage(name)
+
+
+def iterate(iterable, name):
+    """
+    recorder.iterate(iterable, name) on the active recorder; the iterable
+    itself without one.
+    """
+    if _active is None:
+        return iterable
+    return _active.iterate(iterable, name)
@@ -0,0 +1,290 @@
+"""
+Correlated multi-asset Monte Carlo simulation for VaR / CVaR.
+
+Asset returns are drawn from a multivariate normal through the Cholesky
+factor of the covariance matrix. Paths are generated in chunks of
+chunk_size_for(N) paths, which depends on the number of assets only, and
+each chunk's shocks are applied to the portfolios a block of columns at a
+time, each block folded into its own TailEstimator. So the full (paths,
+portfolios) matrix never exists, and a portfolio gets the same paths for a
+given seed however many other portfolios share the batch. Memory is
+bounded by
+
+  - a chunk: chunk_size * N * 8 bytes of shocks plus chunk_size * 2 B * 8
+    for a block of B portfolios (its returns and the stacked copy
+    TailEstimator.update makes); chunk_size and B (portfolio_block_for)
+    keep this under DEFAULT_CHUNK_BYTES, and
+  - the tail: tail_size() * K * 8 bytes, about (1 - c) * paths * K * 8 for
+    the lowest confidence level c. The tail is kept exactly, so this part
+    still grows linearly with the number of paths: 1e6 paths at 95% for
+    K = 2000 portfolios is ~800 MB.
+
+Chunk i always draws from the i-th child of SeedSequence(seed), so the same
+seed gives the same paths however the chunks are processed. With workers > 1
+the chunks are dealt out to a ProcessPoolExecutor; the portfolio means and
+Cholesky loadings are placed in shared memory once instead of being pickled
+for every task, and the per-worker tails are merged into the same exact tail
+a serial run produces, so results are bit-identical for any worker count.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 50000
+DEFAULT_CHUNK_BYTES = 64 * 2 ** 20
+
+
+def cholesky_factor(cov):
+    """
+    Lower triangular L with L @ L.T == cov.
+    Falls back to an eigen decomposition when cov is only positive semi-definite
+    (e.g. two identical assets), clipping tiny negative eigenvalues to zero.
+    """
+    cov = np.atleast_2d(np.asarray(cov, dtype=float))
+    try:
+        return np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        eigenvalues, eigenvectors = np.linalg.eigh(cov)
+        return eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+
+
+def tail_size(num_simulations, confidence_levels):
+    """
+    Number of smallest paths needed for the lowest percentile (np.percentile, linear).
+    """
+    position = (1 - np.min(confidence_levels)) * (num_simulations - 1)
+    return int(min(num_simulations, np.floor(position) + 2))
+
+
+def chunk_size_for(n_assets, budget=DEFAULT_CHUNK_BYTES):
+    """
+    Paths per chunk so that one chunk's shocks plus the returns of at least
+    one portfolio (and their stacked copy) stay within `budget` bytes.
+    Depends on the number of assets only, so the draws do not change with
+    the number of portfolios; never above DEFAULT_CHUNK_SIZE.
+    """
+    per_path = 8 * (n_assets + 2)
+    return int(max(1, min(DEFAULT_CHUNK_SIZE, budget // per_path)))
+
+
+def portfolio_block_for(n_assets, chunk_size, budget=DEFAULT_CHUNK_BYTES):
+    """
+    Portfolios applied to a chunk at a time: as many as fit in the budget
+    left over by the chunk's shocks, at least one.
+    """
+    return int(max(1, (budget - 8 * chunk_size * n_assets) // (16 * chunk_size)))
+
+
+def chunk_seeds(seed, num_simulations, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    (chunk_length, SeedSequence) for every chunk of the simulation.
+    """
+    n_chunks = -(-num_simulations // chunk_size)
+    children = np.random.SeedSequence(seed).spawn(n_chunks)
+    lengths = [min(chunk_size, num_simulations - i * chunk_size) for i in range(n_chunks)]
+    return list(zip(lengths, children))
+
+
+class TailEstimator:
+    """
+    Streaming estimator that keeps the `size` smallest values of every portfolio.
+    The kept set is exact, so VaR and CVaR match a full in-memory percentile.
+    """
+
+    def __init__(self, n_portfolios, size):
+        self.size = size
+        self.count = 0
+        self.tail = np.empty((0, n_portfolios))
+
+    def update(self, chunk):
+        """
+        Fold a (paths, K) chunk into the tail.
+        """
+        self.count += chunk.shape[0]
+        self._keep(np.vstack([self.tail, chunk]))
+        return self
+
+    def merge(self, other):
+        """
+        Combine with an estimator that saw a different set of paths.
+        """
+        self.count += other.count
+        self._keep(np.vstack([self.tail, other.tail]))
+        return self
+
+    @classmethod
+    def side_by_side(cls, estimators):
+        """
+        One estimator over the portfolios of several that saw the same paths.
+        """
+        combined = cls(sum(estimator.tail.shape[1] for estimator in estimators), estimators[0].size)
+        combined.count = estimators[0].count
+        combined.tail = np.hstack([estimator.tail for estimator in estimators])
+        return combined
+
+    def _keep(self, values):
+        if values.shape[0] > self.size:
+            values = np.partition(values, self.size - 1, axis=0)[:self.size]
+        self.tail = values
+
+    def estimate(self, confidence_levels):
+        """
+        VaR and CVaR per portfolio and confidence level, both (K, C).
+        """
+        confidence_levels = np.atleast_1d(confidence_levels)
+        # Sorting first makes the result independent of the order chunks arrived in
+        ordered = np.sort(self.tail, axis=0)
+        cumulative = np.cumsum(ordered, axis=0)
+        columns = np.arange(ordered.shape[1])
+
+        var = np.empty((ordered.shape[1], len(confidence_levels)))
+        cvar = np.empty_like(var)
+        for j, level in enumerate(confidence_levels):
+            position = (1 - level) * (self.count - 1)
+            lower = int(np.floor(position))
+            upper = min(lower + 1, ordered.shape[0] - 1)
+            fraction = position - lower
+            var[:, j] = ordered[lower] + fraction * (ordered[upper] - ordered[lower])
+            # CVaR is the average of the paths at or below the VaR
+            n_tail = (ordered <= var[None, :, j]).sum(axis=0)
+            cvar[:, j] = cumulative[n_tail - 1, columns] / n_tail
+        return var, cvar
+
+
+def draw_shocks(length, seed_sequence, n_assets):
+    """
+    One chunk's independent standard normal shocks, shape (length, N).
+    """
+    return np.random.default_rng(seed_sequence).standard_normal((length, n_assets))
+
+
+def simulate_chunk(length, seed_sequence, portfolio_mean, loadings):
+    """
+    One chunk of one-day portfolio returns, shape (length, K).
+    loadings = L.T @ W.T maps the N correlated shocks straight onto the K portfolios.
+    """
+    return portfolio_mean[None, :] + draw_shocks(length, seed_sequence, loadings.shape[0]) @ loadings
+
+
+def _fold_chunks(chunks, portfolio_mean, loadings, size, block):
+    """
+    Fold chunks of paths into one tail, `block` portfolios at a time.
+    """
+    n_assets, n_portfolios = loadings.shape
+    starts = range(0, n_portfolios, block)
+    estimators = [TailEstimator(len(portfolio_mean[start:start + block]), size) for start in starts]
+    for length, seed_sequence in chunks:
+        shocks = draw_shocks(length, seed_sequence, n_assets)
+        for start, estimator in zip(starts, estimators):
+            columns = slice(start, start + block)
+            estimator.update(portfolio_mean[None, columns] + shocks @ loadings[:, columns])
+    return TailEstimator.side_by_side(estimators)
+
+
+def _share(array):
+    """
+    Copy an array into a new shared memory block; returns (block, spec).
+    """
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+def _attach(spec):
+    name, shape, dtype = spec
+    try:
+        block = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: pool workers share the parent's resource tracker,
+        # so attaching again is harmless and the parent still owns the unlink
+        block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+
+
+# Shared inputs of the current worker process, set once by _init_worker
+_worker_inputs = {}
+
+
+def _init_worker(mean_spec, loadings_spec):
+    _worker_inputs["mean"] = _attach(mean_spec)
+    _worker_inputs["loadings"] = _attach(loadings_spec)
+
+
+def _simulate_shard(chunks, size, block):
+    """
+    Worker task: simulate a group of chunks and return their (count, tail).
+    """
+    estimator = _fold_chunks(chunks, _worker_inputs["mean"][1], _worker_inputs["loadings"][1], size, block)
+    return estimator.count, estimator.tail
+
+
+def _simulate_parallel(portfolio_mean, loadings, chunks, estimator, block, workers):
+    # A few tasks per worker keeps every core busy when chunk counts don't divide evenly
+    n_shards = min(len(chunks), workers * 4)
+    shards = [chunks[i::n_shards] for i in range(n_shards)]
+
+    mean_block, mean_spec = _share(portfolio_mean)
+    loadings_block, loadings_spec = _share(loadings)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(mean_spec, loadings_spec)) as executor:
+            for count, tail in executor.map(_simulate_shard, shards, [estimator.size] * n_shards,
+                                            [block] * n_shards):
+                other = TailEstimator(loadings.shape[1], estimator.size)
+                other.count, other.tail = count, tail
+                estimator.merge(other)
+    finally:
+        for block in (mean_block, loadings_block):
+            block.close()
+            block.unlink()
+    return estimator
+
+
+def simulate_tail(mean, cov, weights, num_simulations, confidence_levels,
+                  chunk_size=None, seed=42, workers=None):
+    """
+    Run the chunked simulation and return the filled TailEstimator.
+    chunk_size defaults to chunk_size_for(assets).
+    workers > 1 shards the chunks across a process pool.
+    """
+    weights = np.atleast_2d(np.asarray(weights, dtype=float))
+    if chunk_size is None:
+        chunk_size = chunk_size_for(weights.shape[1])
+    portfolio_mean = weights @ np.asarray(mean, dtype=float)
+    loadings = cholesky_factor(cov).T @ weights.T
+
+    estimator = TailEstimator(weights.shape[0], tail_size(num_simulations, confidence_levels))
+    chunks = chunk_seeds(seed, num_simulations, chunk_size)
+    block = portfolio_block_for(weights.shape[1], chunk_size)
+    if workers and workers > 1 and len(chunks) > 1:
+        return _simulate_parallel(portfolio_mean, loadings, chunks, estimator, block, workers)
+
+    return _fold_chunks(chunks, portfolio_mean, loadings, estimator.size, block)
+
+
+def scale_to_horizon(one_day, portfolio_mean, holding_periods):
+    """
+    Scale one-day (K, C) tail statistics to (K, C, H).
+    Under i.i.d. normal returns the h-day return is mean * h + sqrt(h) * (r - mean).
+    """
+    holding_periods = np.atleast_1d(holding_periods)
+    mean = portfolio_mean[:, None, None]
+    return mean * holding_periods + np.sqrt(holding_periods) * (one_day[:, :, None] - mean)
+
+
+def correlated_var(mean, cov, weights, confidence_levels=0.95, holding_periods=1,
+                   num_simulations=10000, chunk_size=None, seed=42, workers=None):
+    """
+    Monte Carlo VaR and CVaR, both (K, C, H), from asset means and covariance.
+    """
+    confidence_levels = np.atleast_1d(np.asarray(confidence_levels, dtype=float))
+    weights = np.atleast_2d(np.asarray(weights, dtype=float))
+    portfolio_mean = weights @ np.asarray(mean, dtype=float)
+
+    estimator = simulate_tail(mean, cov, weights, num_simulations, confidence_levels,
+                              chunk_size, seed, workers)
+    var, cvar = estimator.estimate(confidence_levels)
+    return (scale_to_horizon(var, portfolio_mean, holding_periods),
+            scale_to_horizon(cvar, portfolio_mean, holding_periods))
@@ -0,0 +1,267 @@
+"""
+Long-only mean-variance optimisation: minimum variance, maximum Sharpe and
+the efficient frontier, with per-asset weight bounds.
+
+    optimizer = MeanVarianceOptimizer.from_returns(returns, bounds=(0, 0.4))
+    frontier = optimizer.frontier(points=100)
+    best = optimizer.max_sharpe(risk_free=0.05)
+
+Every point is the quadratic programme
+
+    minimise  w' C w   subject to  sum(w) = 1,  mu' w = target,  low <= w <= high
+
+solved with ADMM (the splitting OSQP uses): the equality-constrained step
+is a linear solve with C + rho I, the bound step is a clip. C is
+eigendecomposed once, so that linear solve is two matrix-vector products
+for any rho and any target, and the whole frontier shares the one
+factorisation. Each point starts from the solution of the previous one,
+which is already close, and a final "polish" solves the KKT system on the
+assets that are not at a bound to get the exact answer.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from fintech import covariance
+from fintech.portfolio import TRADING_DAYS
+
+MAX_ITERATIONS = 5000
+MAX_ACTIVE_SET_STEPS = 50
+TOLERANCE = 1e-8
+GOLDEN = (np.sqrt(5) - 1) / 2
+
+
+@dataclass
+class OptimalPortfolio:
+    weights: pd.Series
+    expected_return: float
+    volatility: float
+    sharpe: float
+
+
+@dataclass
+class Frontier:
+    """
+    Efficient frontier points, lowest target return first.
+    """
+    returns: np.ndarray
+    volatilities: np.ndarray
+    weights: pd.DataFrame
+
+    def to_frame(self):
+        return pd.DataFrame({"expected_return": self.returns, "volatility": self.volatilities})
+
+
+class MeanVarianceOptimizer:
+    """
+    mean    expected (annual) returns, one per asset
+    cov     (annual) covariance matrix
+    bounds  (low, high) weight bounds, scalars or one value per asset
+    """
+
+    def __init__(self, mean, cov, bounds=(0.0, 1.0)):
+        self.assets = getattr(mean, "index", None)
+        self.mean = np.asarray(mean, dtype=float)
+        self.cov = np.asarray(cov, dtype=float)
+        n = len(self.mean)
+        self.low = np.broadcast_to(np.asarray(bounds[0], dtype=float), n).copy()
+        self.high = np.broadcast_to(np.asarray(bounds[1], dtype=float), n).copy()
+        if self.low.sum() > 1 or self.high.sum() < 1 or (self.low > self.high).any():
+            raise ValueError("Weight bounds leave no fully invested portfolio")
+
+        # The single factorisation every solve reuses
+        self.eigenvalues, self.eigenvectors = np.linalg.eigh(self.cov)
+        self.eigenvalues = np.maximum(self.eigenvalues, 0.0)
+        self.rho = max(self.eigenvalues.mean(), 1e-12)
+        self._warm = None
+
+    @classmethod
+    def from_returns(cls, returns, bounds=(0.0, 1.0), trading_days=TRADING_DAYS,
+                     covariance_method="sample", window=None):
+        """
+        Annualised mean and covariance of a (T, N) daily returns frame; the
+        covariance comes from the shared estimate in fintech/covariance.py.
+        """
+        returns = pd.DataFrame(returns)
+        cov = covariance.estimate(returns, covariance_method, window)
+        return cls(returns.mean() * trading_days, cov * trading_days, bounds)
+
+    # ------------------------------------------------------------------
+    # QP solver
+    # ------------------------------------------------------------------
+    def _solve_shifted(self, rhs, rho):
+        """
+        (C + rho I)^-1 rhs from the eigendecomposition; rhs is (N,) or (N, k).
+        """
+        projected = self.eigenvectors.T @ rhs
+        scale = 1.0 / (self.eigenvalues + rho)
+        return self.eigenvectors @ (projected * (scale if projected.ndim == 1 else scale[:, None]))
+
+    def _solve(self, equality, targets, start=None):
+        """
+        ADMM on  min w' C w  s.t. equality @ w = targets, low <= w <= high,
+        polished to the exact optimum as soon as the active set is right.
+        """
+        n = len(self.mean)
+        if start is None:
+            z = np.clip(np.full(n, 1.0 / n), self.low, self.high)
+            u = np.zeros(n)
+        else:
+            # A warm start usually has the right active set already
+            z, u = start[0].copy(), start[1].copy()
+            polished = self._polish(z, equality, targets)
+            if polished is not None:
+                return polished
+
+        rho = self.rho
+        shifted_a = self._solve_shifted(equality.T, rho)
+        schur = np.linalg.pinv(equality @ shifted_a)
+        polished = None
+        for iteration in range(MAX_ITERATIONS):
+            # Equality-constrained step
+            x = self._solve_shifted(rho * (z - u), rho)
+            x -= shifted_a @ (schur @ (equality @ x - targets))
+            # Over-relaxation and bound step
+            relaxed = 1.6 * x + (1 - 1.6) * z
+            previous = z
+            z = np.clip(relaxed + u, self.low, self.high)
+            u += relaxed - z
+
+            primal = np.abs(x - z).max()
+            dual = np.abs(z - previous).max()
+            converged = primal < TOLERANCE and dual < TOLERANCE
+            if converged or iteration % 10 == 9:
+                polished = self._polish(z, equality, targets)
+                if polished is not None or converged:
+                    break
+            # Rebalance rho now and then; the eigendecomposition makes it free
+            if iteration % 25 == 24 and (primal > 10 * dual or dual > 10 * primal):
+                factor = np.sqrt(primal / max(dual, 1e-300))
+                rho *= factor
+                u /= factor
+                shifted_a = self._solve_shifted(equality.T, rho)
+                schur = np.linalg.pinv(equality @ shifted_a)
+
+        self._warm = (z, u * rho / self.rho)
+        return polished if polished is not None else z
+
+    def _polish(self, weights, equality, targets):
+        """
+        Exact solution from the active set of `weights`, or None if it cannot
+        be found. The KKT system on the free assets is small; assets that come
+        out past a bound are fixed at it and fixed assets whose multiplier has
+        the wrong sign are freed (a primal-dual active set step) until the
+        active set is optimal.
+        """
+        at_low = weights <= self.low + 1e-7
+        at_high = ~at_low & (weights >= self.high - 1e-7)
+        m = len(targets)
+        for step in range(MAX_ACTIVE_SET_STEPS):
+            free = ~(at_low | at_high)
+            fixed = np.where(at_low, self.low, self.high)
+            n_free = free.sum()
+            system = np.zeros((n_free + m, n_free + m))
+            system[:n_free, :n_free] = 2 * self.cov[np.ix_(free, free)]
+            system[:n_free, n_free:] = equality[:, free].T
+            system[n_free:, :n_free] = equality[:, free]
+            rhs = np.concatenate([-2 * self.cov[np.ix_(free, ~free)] @ fixed[~free],
+                                  targets - equality[:, ~free] @ fixed[~free]])
+            try:
+                solution = np.linalg.solve(system, rhs)
+            except np.linalg.LinAlgError:
+                return None
+
+            polished = fixed.copy()
+            polished[free] = solution[:n_free]
+            gradient = 2 * self.cov @ polished + equality.T @ solution[n_free:]
+            tolerance = 1e-9 * (1 + np.abs(gradient).max())
+            below = free & (polished < self.low - 1e-10)
+            above = free & (polished > self.high + 1e-10)
+            # Bound multipliers must have the right sign for this to be the optimum
+            release = (at_low & (gradient < -tolerance)) | (at_high & (gradient > tolerance))
+            if not (below.any() or above.any() or release.any()):
+                return np.clip(polished, self.low, self.high)
+            at_low = (at_low & ~release) | below
+            at_high = (at_high & ~release) | above
+        return None
+
+    # ------------------------------------------------------------------
+    # Portfolios
+    # ------------------------------------------------------------------
+    def _portfolio(self, weights, risk_free=0.0):
+        expected = float(self.mean @ weights)
+        volatility = float(np.sqrt(max(weights @ self.cov @ weights, 0.0)))
+        sharpe = (expected - risk_free) / volatility if volatility > 0 else np.nan
+        return OptimalPortfolio(pd.Series(weights, index=self.assets), expected, volatility, sharpe)
+
+    def min_variance_weights(self):
+        return self._solve(np.ones((1, len(self.mean))), np.array([1.0]))
+
+    def min_variance(self):
+        return self._portfolio(self.min_variance_weights())
+
+    def target_return_weights(self, target, warm_start=True):
+        """
+        Minimum variance weights with expected return `target`.
+        """
+        equality = np.vstack([np.ones(len(self.mean)), self.mean])
+        start = self._warm if warm_start else None
+        return self._solve(equality, np.array([1.0, target]), start)
+
+    def max_return_weights(self):
+        """
+        Highest expected return the bounds allow: fill the best assets first.
+        """
+        weights = self.low.copy()
+        budget = 1.0 - weights.sum()
+        for asset in np.argsort(-self.mean):
+            step = min(self.high[asset] - self.low[asset], budget)
+            weights[asset] += step
+            budget -= step
+        return weights
+
+    def frontier(self, points=100):
+        """
+        `points` frontier portfolios evenly spaced in expected return, from
+        the minimum variance portfolio up to the highest attainable return.
+        """
+        lowest = self.min_variance_weights()
+        highest = self.max_return_weights()
+        targets = np.linspace(self.mean @ lowest, self.mean @ highest, points)
+        # The end points are known; the top one is usually a single vertex of
+        # the bounds, where the KKT system on the free assets is empty
+        weights = [lowest] + [self.target_return_weights(target) for target in targets[1:-1]] + [highest]
+        weights = np.array(weights[:points])
+        volatilities = np.sqrt(np.maximum(np.einsum("pi,ij,pj->p", weights, self.cov, weights), 0.0))
+        return Frontier(weights @ self.mean, volatilities, pd.DataFrame(weights, columns=self.assets))
+
+    def max_sharpe(self, risk_free=0.0, frontier=None):
+        """
+        Maximum Sharpe ratio portfolio: the best frontier point, refined by a
+        golden-section search on the target return between its neighbours.
+        """
+        frontier = frontier or self.frontier(points=20)
+        sharpe = (frontier.returns - risk_free) / frontier.volatilities
+        best = int(np.nanargmax(sharpe))
+        low = frontier.returns[max(best - 1, 0)]
+        high = frontier.returns[min(best + 1, len(frontier.returns) - 1)]
+
+        def score(target):
+            weights = self.target_return_weights(target)
+            return self._portfolio(weights, risk_free).sharpe, weights
+
+        # Sharpe is unimodal along the frontier
+        left, right = high - GOLDEN * (high - low), low + GOLDEN * (high - low)
+        left_score, right_score = score(left)[0], score(right)[0]
+        while high - low > 1e-7 * max(abs(high), 1.0):
+            if left_score > right_score:
+                high, right, right_score = right, left, left_score
+                left = high - GOLDEN * (high - low)
+                left_score = score(left)[0]
+            else:
+                low, left, left_score = left, right, right_score
+                right = low + GOLDEN * (high - low)
+                right_score = score(right)[0]
+        return self._portfolio(score((low + high) / 2)[1], risk_free)
@@ -0,0 +1,142 @@
+"""
+Batched portfolio analytics over a whole returns matrix.
+
+updated_portfolio.ipynb annualises one stock at a time with Series
+operations. Here every statistic is computed for all N stocks at once from
+a handful of masked sums over the (T, N) returns matrix:
+
+    market, stocks = split_returns(data)
+    stats = stock_stats(stocks, market, risk_free=0.05)
+
+Missing returns (e.g. the first row, or stocks listed later) are handled
+with a 0/1 mask instead of dropping rows, so each stock uses all of its own
+observations, the same as the pandas per-column mean / std / cov. The cost
+is a few matrix-vector products, O(T * N), and O(T * N^2) for the full
+covariance matrix, with no Python loop over stocks.
+"""
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+STAT_COLUMNS = ["annual_return", "annual_volatility", "beta", "alpha", "sharpe", "tracking_error"]
+
+
+def split_returns(data, market="NSE_Return", suffix="_Return"):
+    """
+    Market return Series and a (T, N) frame of stock returns named without
+    the suffix, from a frame with <name>_Return columns.
+    """
+    columns = [column for column in data.columns if column.endswith(suffix) and column != market]
+    stocks = data[columns].astype(float)
+    stocks.columns = [column[:-len(suffix)] for column in columns]
+    return data[market].astype(float), stocks
+
+
+def _masked(returns):
+    values = np.asarray(returns, dtype=float)
+    mask = ~np.isnan(values)
+    return np.where(mask, values, 0.0), mask.astype(float)
+
+
+def _centred_terms(returns, market):
+    """
+    Per-row terms whose sums give every statistic. Each series is centred on
+    its overall mean first so the sums do not lose precision to
+    cancellation; only the means need the shift added back.
+    """
+    values, mask = _masked(returns)
+    market_values, market_mask = _masked(market)
+    count = mask.sum(axis=0)
+    shift = values.sum(axis=0) / np.maximum(count, 1)
+    market_shift = market_values.sum() / max(market_mask.sum(), 1)
+
+    values = (values - shift) * mask
+    market_values = ((market_values - market_shift) * market_mask)[:, None]
+    both = mask * market_mask[:, None]
+    x = values * both
+    terms = {
+        # The stock's own observations
+        "own_n": mask, "own_x": values, "own_xx": values ** 2,
+        # Rows where the stock and the market are both known
+        "n": both, "x": x, "xx": x * x, "m": both * market_values,
+        "mm": both * market_values ** 2, "xm": x * market_values,
+    }
+    return terms, shift, market_shift
+
+
+def _stats_from_sums(sums, shift, market_shift, risk_free, trading_days):
+    own_n, n = sums["own_n"], sums["n"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        own_mean = sums["own_x"] / own_n
+        own_var = (sums["own_xx"] - own_n * own_mean ** 2) / (own_n - 1)
+        mean_x, mean_m = sums["x"] / n, sums["m"] / n
+        cov_xm = (sums["xm"] - n * mean_x * mean_m) / (n - 1)
+        var_m = (sums["mm"] - n * mean_m ** 2) / (n - 1)
+        var_x = (sums["xx"] - n * mean_x ** 2) / (n - 1)
+        beta = cov_xm / var_m
+
+        annual_return = (own_mean + shift) * trading_days
+        annual_volatility = np.sqrt(own_var * trading_days)
+        market_return = (mean_m + market_shift) * trading_days
+        # Jensen's alpha against the market over the stock's own dates
+        alpha = annual_return - (risk_free + beta * (market_return - risk_free))
+        sharpe = (annual_return - risk_free) / annual_volatility
+        tracking_error = np.sqrt(np.maximum(var_x + var_m - 2 * cov_xm, 0) * trading_days)
+    return [annual_return, annual_volatility, beta, alpha, sharpe, tracking_error]
+
+
+def stock_stats(returns, market, risk_free=0.0, trading_days=TRADING_DAYS):
+    """
+    Annual return / volatility, beta and alpha against the market, Sharpe
+    ratio and tracking error for every column of `returns`, as a DataFrame
+    with one row per stock. `risk_free` is an annual rate.
+    """
+    terms, shift, market_shift = _centred_terms(returns, market)
+    sums = {name: term.sum(axis=0) for name, term in terms.items()}
+    columns = _stats_from_sums(sums, shift, market_shift, risk_free, trading_days)
+    return pd.DataFrame(dict(zip(STAT_COLUMNS, columns)), index=getattr(returns, "columns", None))
+
+
+def covariance(returns, trading_days=TRADING_DAYS, min_periods=2):
+    """
+    Annualised (N, N) covariance with pairwise-complete observations, as
+    DataFrame.cov() gives, from three matrix products.
+    """
+    values, mask = _masked(returns)
+    values = (values - values.sum(axis=0) / np.maximum(mask.sum(axis=0), 1)) * mask
+    n = mask.T @ mask
+    sum_x = values.T @ mask  # [i, j]: sum of stock i over the rows stock j is known
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = (values.T @ values - sum_x * sum_x.T / n) / (n - 1)
+    cov[n < min_periods] = np.nan
+    cov *= trading_days
+    if isinstance(returns, pd.DataFrame):
+        return pd.DataFrame(cov, index=returns.columns, columns=returns.columns)
+    return cov
+
+
+def _window_sums(values, window):
+    # Sums over the trailing `window` rows for every row, from one cumulative sum
+    total = np.cumsum(values, axis=0)
+    total[window:] = total[window:] - total[:-window].copy()
+    return total
+
+
+def rolling_stats(returns, market, window=TRADING_DAYS, risk_free=0.0, trading_days=TRADING_DAYS):
+    """
+    stock_stats over a trailing window ending at every row, as a dict of
+    (T, N) DataFrames keyed by STAT_COLUMNS. Rows before the first full
+    window are NaN. Every row costs O(N) whatever the window length.
+    """
+    terms, shift, market_shift = _centred_terms(returns, market)
+    sums = {name: _window_sums(term, window) for name, term in terms.items()}
+    columns = _stats_from_sums(sums, shift, market_shift, risk_free, trading_days)
+
+    index = getattr(returns, "index", None)
+    names = getattr(returns, "columns", None)
+    result = {}
+    for name, stat in zip(STAT_COLUMNS, columns):
+        stat[:window - 1] = np.nan
+        result[name] = pd.DataFrame(stat, index=index, columns=names)
+    return result
@@ -0,0 +1,260 @@
+"""
+Local market-data store in front of the price downloads.
+
+Daily OHLCV prices are kept on disk in a columnar layout, one directory per
+symbol and one .npy file per column:
+
+    <root>/<symbol>/Date.npy, Open.npy, ..., Volume.npy, meta.json
+
+meta.json records which [start, end) date ranges have already been fetched,
+so a repeat request only downloads the missing ranges (holidays and weekends
+are not asked for again). An open-ended request stops before today, whose
+bar is still changing, and a fetched range never includes today. A gap that
+comes back empty is marked as fetched too (a weekend, a holiday, the years
+before listing) unless nothing at all has been fetched for the symbol yet:
+that is what a failed download looks like (yfinance returns an empty frame),
+so it is retried on the next request.
+
+meta.json also records the fetcher's version() of the source, if it has one.
+FixtureFetcher's is the CSV file's mtime and size, so editing a fixture
+drops the stored prices and they are read again.
+
+Columns are read back with np.load(mmap_mode="r") and the frames returned by
+get() are built on those mappings, one block per column, so reading does not
+copy the prices. arrays() hands out the same mappings while the files are
+unchanged.
+
+Where prices come from is pluggable: YFinanceFetcher downloads from Yahoo
+Finance and FixtureFetcher reads CSV files from a local directory.
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from fintech import ingest
+
+COLUMNS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+DEFAULT_START = "1970-01-01"
+DEFAULT_ROOT = Path(__file__).resolve().parents[1] / ".market_data"
+
+
+class YFinanceFetcher:
+    """
+    Downloads daily prices with yfinance (imported on first use).
+    """
+
+    def version(self, symbol):
+        # Downloaded history is not versioned
+        return None
+
+    def fetch(self, symbol, start, end):
+        import yfinance as yf
+
+        data = yf.download(symbol, start=start, end=end, progress=False, auto_adjust=False)
+        if isinstance(data.columns, pd.MultiIndex):
+            # Newer yfinance returns (Price, Ticker) columns even for one ticker
+            data.columns = data.columns.get_level_values(0)
+        return data
+
+
+class FixtureFetcher:
+    """
+    Reads prices from <directory>/<symbol>.csv with a date index column.
+    Used for offline runs and for files that ship with the repo.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def _path(self, symbol):
+        return self.directory / f"{symbol}.csv"
+
+    def version(self, symbol):
+        """
+        [mtime_ns, size] of the symbol's CSV; the store refetches when it changes.
+        """
+        stat = self._path(symbol).stat()
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def fetch(self, symbol, start, end):
+        path = self._path(symbol)
+        if symbol in ingest.SCHEMAS:
+            data = ingest.read_csv(path)
+        else:
+            data = pd.read_csv(path, index_col=0, parse_dates=True)
+        return data[(data.index >= start) & (data.index < end)]
+
+
+def _parse_range(start, end):
+    # Without an end, stop at the last completed session: today's bar is still open
+    start = pd.Timestamp(start or DEFAULT_START).normalize()
+    end = pd.Timestamp(end).normalize() if end else pd.Timestamp.today().normalize()
+    return start, end
+
+
+def _merge_ranges(ranges):
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class PriceStore:
+    """
+    Columnar on-disk cache of daily OHLCV prices, partitioned by symbol.
+    """
+
+    def __init__(self, root=None, fetcher=None):
+        self.root = Path(root or os.environ.get("FINTECH_DATA_DIR", DEFAULT_ROOT))
+        self.fetcher = fetcher or YFinanceFetcher()
+        self._mapped = {}
+
+    def _symbol_dir(self, symbol):
+        return self.root / symbol.replace("/", "_")
+
+    def _read_meta(self, symbol):
+        path = self._symbol_dir(symbol) / "meta.json"
+        if not path.exists():
+            return {"ranges": [], "version": None}
+        return json.loads(path.read_text())
+
+    def _is_current(self, symbol):
+        # Stored prices from an older version of the source do not count
+        return self._read_meta(symbol).get("version") == self.fetcher.version(symbol)
+
+    def covered_ranges(self, symbol):
+        """
+        Date ranges already fetched for a symbol, as [(start, end), ...].
+        """
+        if not self._is_current(symbol):
+            return []
+        return [(pd.Timestamp(s), pd.Timestamp(e)) for s, e in self._read_meta(symbol)["ranges"]]
+
+    def missing_ranges(self, symbol, start=None, end=None):
+        """
+        Parts of [start, end) that have not been fetched yet.
+        """
+        start, end = _parse_range(start, end)
+        missing = []
+        cursor = start
+        for covered_start, covered_end in self.covered_ranges(symbol):
+            if covered_end <= cursor or covered_start >= end:
+                continue
+            if covered_start > cursor:
+                missing.append((cursor, covered_start))
+            cursor = max(cursor, covered_end)
+        if cursor < end:
+            missing.append((cursor, end))
+        return missing
+
+    def arrays(self, symbol):
+        """
+        Every stored column as a read-only memory-mapped array (no copy).
+        The mappings are reused until the symbol's files are rewritten.
+        """
+        directory = self._symbol_dir(symbol)
+        try:
+            # meta.json is written last, so its stamp changes with every update
+            stat = (directory / "meta.json").stat()
+        except FileNotFoundError:
+            return {}
+        if not (directory / "Date.npy").exists():
+            return {}
+        stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        cached = self._mapped.get(symbol)
+        if cached is None or cached[0] != stamp:
+            cached = self._mapped[symbol] = (stamp, {
+                column: np.load(directory / f"{column}.npy", mmap_mode="r") for column in ["Date"] + COLUMNS
+            })
+        return dict(cached[1])
+
+    def _write(self, symbol, frame, ranges, version):
+        directory = self._symbol_dir(symbol)
+        directory.mkdir(parents=True, exist_ok=True)
+        columns = {"Date": frame.index.values.astype("datetime64[ns]")}
+        columns.update({column: frame[column].to_numpy(dtype=float) for column in COLUMNS})
+        # Write to temporary files first so a crash never leaves half a symbol behind
+        for column, values in columns.items():
+            temporary = directory / f"{column}.tmp.npy"
+            np.save(temporary, values)
+            os.replace(temporary, directory / f"{column}.npy")
+        meta = {"ranges": [(s.isoformat(), e.isoformat()) for s, e in ranges], "version": version}
+        temporary = directory / "meta.tmp.json"
+        temporary.write_text(json.dumps(meta))
+        os.replace(temporary, directory / "meta.json")
+        self._mapped.pop(symbol, None)
+
+    def _stored_frame(self, symbol, copy=False):
+        columns = self.arrays(symbol) if self._is_current(symbol) else {}
+        if not columns:
+            return pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([], name="Date"), dtype=float)
+        dates = columns.pop("Date")
+        if copy:
+            columns = {name: np.array(values) for name, values in columns.items()}
+        # A dict of same-dtype arrays with copy=False keeps one block per column
+        # (no consolidation into a 2D copy), so the columns stay on the mappings
+        return pd.DataFrame(columns, index=pd.DatetimeIndex(dates, name="Date"), copy=copy)
+
+    def update(self, symbol, start=None, end=None):
+        """
+        Fetch only the missing parts of [start, end) and add them to the store.
+        Fetched ranges are marked as such up to the start of today; empty
+        ones only once the symbol has rows (see the module docstring).
+        """
+        missing = self.missing_ranges(symbol, start, end)
+        if not missing:
+            return
+
+        today = pd.Timestamp.today().normalize()
+        version = self.fetcher.version(symbol)
+        covered = self.covered_ranges(symbol)
+        pieces = [self._stored_frame(symbol, copy=True)] if self._is_current(symbol) else []
+        fetched_ranges = []
+        for gap_start, gap_end in missing:
+            fetched = self.fetcher.fetch(symbol, gap_start, gap_end)
+            if fetched is not None and not fetched.empty:
+                fetched = fetched.reindex(columns=COLUMNS).astype(float)
+                fetched.index = pd.DatetimeIndex(fetched.index, name="Date").tz_localize(None)
+                pieces.append(fetched)
+            if gap_start < today:
+                fetched_ranges.append((gap_start, min(gap_end, today)))
+
+        pieces = [piece for piece in pieces if not piece.empty]
+        if not pieces:
+            # Nothing stored and nothing fetched: a failed download, retry next time
+            return
+        frame = pd.concat(pieces)
+        frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+        self._write(symbol, frame, _merge_ranges(covered + fetched_ranges), version)
+
+    def get(self, symbol, start=None, end=None):
+        """
+        OHLCV frame for [start, end), fetching only what is not stored yet.
+        """
+        self.update(symbol, start, end)
+        frame = self._stored_frame(symbol)
+        start, end = _parse_range(start, end)
+        dates = frame.index.values
+        lower, upper = np.searchsorted(dates, [start.to_datetime64(), end.to_datetime64()])
+        return frame.iloc[lower:upper]
+
+    def close_prices(self, symbols, start=None, end=None, column="Adj Close"):
+        """
+        Wide frame of one price column per symbol (falls back to Close when
+        the source has no adjusted prices), rows with gaps dropped.
+        """
+        closes = {}
+        for symbol in symbols:
+            frame = self.get(symbol, start, end)
+            values = frame[column]
+            if values.isna().all():
+                values = frame["Close"]
+            closes[symbol] = values
+        return pd.DataFrame(closes).dropna()
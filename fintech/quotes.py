@@ -0,0 +1,137 @@
+"""
+Concurrent batched stock quotes.
+
+Batch version of get_stock_data() from Advance Web Scrapping/WebScrapping_ADV.ipynb:
+instead of one yf.Ticker(symbol).info call at a time, a whole watchlist is
+fetched through a thread pool that shares one pooled requests.Session.
+
+    quotes = QuoteFetcher().fetch(["NTPC.NS", "NHPC.NS", "AAPL"])
+
+Quotes come from the Yahoo Finance chart endpoint. base_url can point at any
+server with the same JSON layout, e.g. a local stub server for offline runs
+(`python -m benchmarks offline` checks the fetcher against one).
+
+Symbols that still fail after the retries are logged (logger "fintech.quotes")
+and listed in QuoteFetcher.errors instead of stopping the batch.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from fintech.http_client import get_with_retry, pooled_session
+
+YAHOO_CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/"
+QUOTE_COLUMNS = ["Symbol", "Company Name", "Current Price", "Previous Close", "Change", "% Change"]
+
+logger = logging.getLogger(__name__)
+
+
+class QuoteFetcher:
+    """
+    Fetches quotes for many symbols concurrently.
+
+    max_concurrency  requests in flight at once (also the connection pool size)
+    retries          extra attempts after a failed request
+    backoff          first retry delay in seconds, doubled on every retry; each
+                     delay is jittered to 50-100% so clients that failed
+                     together do not retry together
+    ttl              seconds a fetched quote is reused before asking again
+    """
+
+    def __init__(self, base_url=YAHOO_CHART_URL, max_concurrency=16, retries=3,
+                 backoff=0.5, ttl=60, timeout=10):
+        self.base_url = base_url.rstrip("/") + "/"
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.ttl = ttl
+        self.timeout = timeout
+
+        # One session for every request so TCP/TLS connections are reused
+        self.session = pooled_session(max_concurrency)
+
+        self._cache = {}
+        self._lock = threading.Lock()
+        # {symbol: error message} of the last fetch()
+        self.errors = {}
+
+    def _cached(self, symbol):
+        with self._lock:
+            entry = self._cache.get(symbol)
+        if entry and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+        return None
+
+    def _request(self, symbol):
+        response = get_with_retry(self.session, self.base_url + symbol, self.retries, self.backoff,
+                                  self.timeout, params={"range": "1d", "interval": "1d"})
+        return response.json()
+
+    def fetch_one(self, symbol):
+        """
+        Quote for one symbol as a dict with QUOTE_COLUMNS keys.
+        """
+        quote = self._cached(symbol)
+        if quote is not None:
+            return quote
+
+        payload = self._request(symbol)
+        meta = payload["chart"]["result"][0]["meta"]
+        current_price = meta.get("regularMarketPrice")
+        previous_close = meta.get("previousClose", meta.get("chartPreviousClose"))
+
+        change = pct_change = None
+        if current_price is not None and previous_close:
+            change = current_price - previous_close
+            pct_change = change / previous_close * 100
+
+        quote = {
+            "Symbol": symbol,
+            "Company Name": meta.get("longName") or meta.get("shortName") or symbol,
+            "Current Price": current_price,
+            "Previous Close": previous_close,
+            "Change": change,
+            "% Change": pct_change,
+        }
+        with self._lock:
+            self._cache[symbol] = (time.monotonic(), quote)
+        return quote
+
+    def _fetch_or_report(self, symbol):
+        try:
+            return self.fetch_one(symbol)
+        except Exception as error:
+            logger.warning("Error retrieving data for %s: %s", symbol, error)
+            with self._lock:
+                self.errors[symbol] = str(error)
+            return None
+
+    def fetch(self, symbols):
+        """
+        DataFrame of quotes, one row per symbol in the order given.
+        Symbols that still fail after all retries are left out and recorded
+        in self.errors.
+        """
+        symbols = list(dict.fromkeys(symbol.strip().upper() for symbol in symbols))
+        self.errors = {}
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            quotes = list(executor.map(self._fetch_or_report, symbols))
+        return pd.DataFrame([quote for quote in quotes if quote], columns=QUOTE_COLUMNS)
+
+    def close(self):
+        self.session.close()
+
+
+def fetch_quotes(symbols, **options):
+    """
+    One-off batch fetch with a temporary QuoteFetcher.
+    """
+    fetcher = QuoteFetcher(**options)
+    try:
+        return fetcher.fetch(symbols)
+    finally:
+        fetcher.close()
@@ -0,0 +1,246 @@
+"""
+Out-of-core linear regression from streamed X'X / X'y sums.
+
+ML2.ipynb and ML3.ipynb build the whole one-hot design matrix in memory
+before LinearRegression().fit. StreamingLinearRegression reads the
+training file in chunks instead and keeps only the sufficient statistics:
+row count, column sums, X'X, X'y and y'y. Memory is O(p^2) for p design
+columns, whatever the number of rows, and the normal equations are solved
+once at the end.
+
+    trainer = StreamingLinearRegression("Repayment Probability", categorical_cols, folds=5)
+    trainer.fit_csv("Loan_Repayment_Training_Data.csv")
+    trainer.cross_validate()
+
+Every chunk is encoded by a CategoricalEncoder (fintech/encoding.py) and
+X'X is accumulated from its CSR output, so the vocabulary and the column
+order (get_dummies layout: numeric columns, then sorted categories) have a
+single source, which ScoringModel.from_encoder can take over as is. Without
+a fitted encoder the trainer grows its own chunk by chunk: a category first
+seen in a later chunk is slotted into its sorted place as a zero row and
+column of the sums. The solution is the minimum-norm least-squares one on
+centred data, which is what LinearRegression returns, including when the
+full set of dummies makes the design rank deficient.
+
+For k-fold evaluation every row is hashed to a fold and the sums are kept
+per fold. The model for "all folds but f" comes from the totals minus
+fold f, and its squared error on fold f follows from fold f's sums, so no
+fold needs the file again.
+"""
+
+import numpy as np
+import pandas as pd
+
+from fintech.encoding import CategoricalEncoder
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+# Relative eigenvalue cutoff of the scaled X'X; smaller directions are the null space
+RCOND = 1e-10
+_FOLD_HASH = np.uint64(0x9E3779B97F4A7C15)
+
+
+class _Sums:
+    """
+    Sufficient statistics of one fold around fixed shifts.
+    """
+
+    def __init__(self, p):
+        self.n = 0
+        self.x = np.zeros(p)
+        self.y = 0.0
+        self.xx = np.zeros((p, p))
+        self.xy = np.zeros(p)
+        self.yy = 0.0
+
+    def add(self, design, target):
+        # design is a CSR block; its products come back sparse or as np.matrix
+        self.n += len(target)
+        self.x += np.asarray(design.sum(axis=0)).ravel()
+        self.y += target.sum()
+        self.xx += (design.T @ design).toarray()
+        self.xy += design.T @ target
+        self.yy += target @ target
+
+    def remap(self, positions, p):
+        """
+        Move column i of the sums to positions[i] of p columns; the new
+        columns are zero.
+        """
+        x, xy, xx = np.zeros(p), np.zeros(p), np.zeros((p, p))
+        x[positions], xy[positions] = self.x, self.xy
+        xx[np.ix_(positions, positions)] = self.xx
+        self.x, self.xy, self.xx = x, xy, xx
+
+    def __add__(self, other):
+        total = _Sums(len(self.x))
+        for name in ("n", "x", "y", "xx", "xy", "yy"):
+            setattr(total, name, getattr(self, name) + getattr(other, name))
+        return total
+
+    def __sub__(self, other):
+        total = _Sums(len(self.x))
+        for name in ("n", "x", "y", "xx", "xy", "yy"):
+            setattr(total, name, getattr(self, name) - getattr(other, name))
+        return total
+
+
+def _min_norm_solve(gram, rhs):
+    """
+    Minimum-norm solution of gram @ beta = rhs for a symmetric PSD gram.
+    Solved on the unit-diagonal scaling for conditioning; the null space is
+    then projected out in the original coordinates, where the minimum norm
+    is defined.
+    """
+    scale = np.sqrt(np.diag(gram))
+    scale[scale == 0] = 1.0
+    values, vectors = np.linalg.eigh(gram / np.outer(scale, scale))
+    keep = values > RCOND * max(values.max(), 0.0)
+    kept = vectors[:, keep]
+    beta = kept @ ((kept.T @ (rhs / scale)) / values[keep]) / scale
+    null = vectors[:, ~keep] / scale[:, None]
+    if null.size:
+        beta -= null @ np.linalg.lstsq(null, beta, rcond=None)[0]
+    return beta
+
+
+class StreamingLinearRegression:
+    """
+    target       name of the target column
+    categorical  columns to one-hot encode; every other column is numeric
+    folds        number of cross-validation folds (None for a plain fit)
+    seed         changes the row-to-fold assignment
+    encoder      optional fitted CategoricalEncoder (fintech/encoding.py) whose
+                 vocabulary is used as is; other categories get no dummy.
+                 Without one the trainer fits its own, as self.encoder
+    """
+
+    def __init__(self, target, categorical=(), folds=None, seed=0, encoder=None):
+        self.target = target
+        self.folds = folds or 1
+        self.seed = seed
+        self.numeric = None
+        self.fixed_vocabulary = encoder is not None
+        self.encoder = encoder if encoder is not None else CategoricalEncoder(categorical)
+        self.categorical = list(self.encoder.columns)
+        self.sums = None
+        self.rows_seen = 0
+        self.x_shift = None
+        self.y_shift = 0.0
+
+    # ------------------------------------------------------------------
+    # Accumulation
+    # ------------------------------------------------------------------
+    @property
+    def n_features(self):
+        return len(self.numeric) + self.encoder.n_features
+
+    def _dummy_keys(self):
+        return [(column, value) for column, values in self.encoder.categories.items() for value in values]
+
+    def _grow_vocabulary(self, chunk):
+        """
+        Add the chunk's new categories to the encoder and move the sums'
+        columns to the encoder's new (sorted) layout.
+        """
+        old = self._dummy_keys()
+        self.encoder.partial_fit(chunk)
+        new = self._dummy_keys()
+        if new == old:
+            return
+        where = {key: i for i, key in enumerate(new)}
+        positions = np.concatenate([np.arange(len(self.numeric)),
+                                    len(self.numeric) + np.array([where[key] for key in old], dtype=int)])
+        for sums in self.sums:
+            sums.remap(positions, self.n_features)
+
+    def _design(self, chunk):
+        """
+        CSR design block from the encoder: shifted numeric columns, then the dummies.
+        """
+        if not self.fixed_vocabulary:
+            self._grow_vocabulary(chunk)
+        frame = chunk[self.categorical].copy()
+        frame[self.numeric] = chunk[self.numeric].to_numpy(dtype=float) - self.x_shift
+        return self.encoder.transform(frame, self.numeric)
+
+    def _fold_of(self, count):
+        # Fibonacci hash of the global row number, so folds do not depend on chunking
+        rows = np.arange(self.rows_seen, self.rows_seen + count, dtype=np.uint64) ^ np.uint64(self.seed)
+        with np.errstate(over="ignore"):
+            return ((rows * _FOLD_HASH) >> np.uint64(32)) % np.uint64(self.folds)
+
+    def partial_fit(self, chunk):
+        """
+        Fold one chunk of rows into the sums.
+        """
+        if self.numeric is None:
+            self.numeric = [column for column in chunk.columns
+                            if column != self.target and column not in self.categorical]
+            # Shift by the first chunk's means to keep the sums well conditioned
+            self.x_shift = chunk[self.numeric].to_numpy(dtype=float).mean(axis=0)
+            self.y_shift = float(chunk[self.target].mean())
+            self.sums = [_Sums(self.n_features) for _ in range(self.folds)]
+
+        design = self._design(chunk)
+        target = chunk[self.target].to_numpy(dtype=float) - self.y_shift
+        fold = self._fold_of(len(chunk))
+        for f, sums in enumerate(self.sums):
+            selected = fold == f
+            sums.add(design[selected], target[selected])
+        self.rows_seen += len(chunk)
+        return self
+
+    def fit_csv(self, path, chunk_size=DEFAULT_CHUNK_SIZE, **read_options):
+        """
+        One streamed pass over a CSV, then solve.
+        """
+        for chunk in pd.read_csv(path, chunksize=chunk_size, **read_options):
+            self.partial_fit(chunk)
+        return self.solve()
+
+    def fit(self, frame):
+        return self.partial_fit(frame).solve()
+
+    # ------------------------------------------------------------------
+    # Solving
+    # ------------------------------------------------------------------
+    def _solve_sums(self, sums):
+        """
+        (coefficients, intercept in the shifted coordinates) from a set of sums.
+        """
+        mean_x, mean_y = sums.x / sums.n, sums.y / sums.n
+        gram = sums.xx - sums.n * np.outer(mean_x, mean_x)
+        rhs = sums.xy - sums.n * mean_x * mean_y
+        beta = _min_norm_solve(gram, rhs)
+        return beta, mean_y - mean_x @ beta
+
+    def solve(self):
+        """
+        Solve the normal equations on all rows; sets coef_, intercept_ and
+        feature_names_ like a fitted LinearRegression on get_dummies output,
+        in the column order of self.encoder.transform(frame, self.numeric).
+        """
+        beta, shifted_intercept = self._solve_sums(sum(self.sums[1:], self.sums[0]))
+        shift = np.zeros(len(beta))
+        shift[:len(self.numeric)] = self.x_shift
+        self.coef_ = beta
+        self.intercept_ = shifted_intercept + self.y_shift - shift @ beta
+        self.feature_names_ = self.encoder.feature_names(self.numeric)
+        return self
+
+    def cross_validate(self):
+        """
+        Out-of-fold mean squared error per fold, from the per-fold sums.
+        """
+        if self.folds < 2:
+            raise ValueError("Cross validation needs folds >= 2")
+        total = sum(self.sums[1:], self.sums[0])
+        results = []
+        for f, held_out in enumerate(self.sums):
+            beta, intercept = self._solve_sums(total - held_out)
+            # sum over the held-out rows of (y - intercept - x . beta)^2
+            sse = (held_out.yy - 2 * intercept * held_out.y - 2 * beta @ held_out.xy
+                   + held_out.n * intercept ** 2 + 2 * intercept * beta @ held_out.x
+                   + beta @ held_out.xx @ beta)
+            results.append({"fold": f, "rows": held_out.n, "mse": sse / held_out.n})
+        return pd.DataFrame(results)
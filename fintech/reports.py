@@ -0,0 +1,274 @@
+"""
+Headless chart rendering for the analysis scripts.
+
+The scripts used to end in plt.show(), which blocks until the window is
+closed and never returns on a server without a display. Here a chart is a
+plain description (Chart -> Panels -> Layers) that is rendered with the Agg
+canvas to a PNG in an output directory, several charts at a time in a
+process pool:
+
+    chart = Chart("returns.png", [Panel([histogram(returns), vline(var, color="red")],
+                                        title="Returns", grid={"alpha": 0.3})])
+    render([chart], report_directory("var_revision"), workers=chart_workers())
+
+A Layer is one Axes method call (plot, bar, hist, axvline, ...) with its
+arguments, so anything matplotlib can draw can be described. The helpers
+below shrink the data before it is sent to a worker:
+
+  - line()       downsamples long series with Largest-Triangle-Three-Buckets
+                 (Steinarsson 2013), which keeps the visual peaks and troughs
+  - histogram()  bins with np.histogram and sends only the bin counts
+  - density()    kernel density estimate on binned data
+
+so a chart of a 10M-point return series costs O(n) to prepare and a fixed
+amount to draw.
+
+The scripts write their charts to reports/<script>/ at the repo root, which
+is gitignored, or to $FINTECH_REPORT_DIR, and render with one process per
+CPU unless $FINTECH_CHART_WORKERS says otherwise.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+DEFAULT_MAX_POINTS = 2000
+DEFAULT_BINS = 50
+KDE_GRID = 2048
+REPORT_DIR_VARIABLE = "FINTECH_REPORT_DIR"
+WORKERS_VARIABLE = "FINTECH_CHART_WORKERS"
+DEFAULT_REPORT_ROOT = Path(__file__).resolve().parents[1] / "reports"
+
+
+@dataclass
+class Layer:
+    """
+    One call ax.<method>(*args, **options). bar_labels, if given, are put
+    on the bars the call returns.
+    """
+    method: str
+    args: tuple = ()
+    options: dict = field(default_factory=dict)
+    bar_labels: list = None
+
+
+@dataclass
+class Panel:
+    """
+    One Axes: its layers and decorations. grid holds ax.grid() options
+    (None for no grid).
+    """
+    layers: list
+    title: str = None
+    xlabel: str = None
+    ylabel: str = None
+    grid: dict = None
+    legend: bool = False
+    xtick_rotation: float = None
+
+
+@dataclass
+class Chart:
+    """
+    A figure of panels laid out on a (rows, columns) grid, saved as `filename`.
+    """
+    filename: str
+    panels: list
+    shape: tuple = (1, 1)
+    figsize: tuple = (8, 6)
+    dpi: int = 100
+
+
+# ----------------------------------------------------------------------
+# Data reduction
+# ----------------------------------------------------------------------
+def _positions(x):
+    # Numeric x for the triangle areas: datetimes as int64, labels as 0..n-1
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.view("i8").astype(float)
+    if np.issubdtype(x.dtype, np.number):
+        return x.astype(float)
+    return np.arange(len(x), dtype=float)
+
+
+def lttb(x, y, max_points=DEFAULT_MAX_POINTS):
+    """
+    Indices of at most `max_points` points of (x, y) chosen by
+    Largest-Triangle-Three-Buckets: the first and last points, plus from
+    each bucket the point forming the largest triangle with the previous
+    pick and the next bucket's average. O(n).
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+    xs = _positions(x)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(xs[:-1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(y[:-1], edges[:-1]) / counts
+
+    selected = np.empty(max_points, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 1 < max_points - 2:
+            next_x, next_y = mean_x[bucket + 1], mean_y[bucket + 1]
+        else:
+            next_x, next_y = xs[-1], y[-1]
+        area = np.abs((xs[previous] - next_x) * (y[start:end] - y[previous])
+                      - (xs[previous] - xs[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def line(x, y, max_points=DEFAULT_MAX_POINTS, **options):
+    """
+    ax.plot layer of y against x, downsampled to `max_points` with LTTB.
+    Points with a missing y are dropped.
+    """
+    x, y = np.asarray(x), np.asarray(y, dtype=float)
+    keep = ~np.isnan(y)
+    x, y = x[keep], y[keep]
+    index = lttb(x, y, max_points)
+    return Layer("plot", (x[index], y[index]), options)
+
+
+def histogram(values, bins=DEFAULT_BINS, range=None, **options):
+    """
+    ax.hist layer drawn from np.histogram counts, so only the counts and
+    bin edges go to the renderer. Missing values are ignored.
+    """
+    values = np.asarray(values, dtype=float)
+    counts, edges = np.histogram(values[~np.isnan(values)], bins=bins, range=range)
+    return Layer("hist", (edges[:-1], edges), {"weights": counts, **options})
+
+
+def density(values, points=200, cut=3, **options):
+    """
+    ax.plot layer of a Gaussian kernel density estimate with Scott's
+    bandwidth, computed on a fine histogram (a binned KDE), so the cost
+    does not grow with points * len(values).
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if len(values) < 2 or values.min() == values.max():
+        raise ValueError("A density needs at least two distinct values")
+    bandwidth = values.std(ddof=1) * len(values) ** (-1 / 5)
+    low, high = values.min() - cut * bandwidth, values.max() + cut * bandwidth
+    counts, edges = np.histogram(values, bins=KDE_GRID, range=(low, high))
+    step = edges[1] - edges[0]
+    half = int(4 * bandwidth / step) + 1
+    offsets = np.arange(-half, half + 1) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+    # Full convolution cut back to the grid; mode="same" returns the kernel's
+    # length when the kernel is the longer of the two (few, spread out values)
+    smoothed = np.convolve(counts, kernel)[half:half + len(counts)] / len(values)
+    centres = (edges[:-1] + edges[1:]) / 2
+    grid = np.linspace(low, high, points)
+    return Layer("plot", (grid, np.interp(grid, centres, smoothed)), options)
+
+
+def palette(name, n, low=0.35, high=0.9):
+    """
+    n colours sampled from a matplotlib colormap, light to dark, e.g. for bar colours.
+    """
+    from matplotlib import colormaps
+
+    colours = colormaps[name](np.linspace(low, high, n))
+    return [tuple(float(channel) for channel in colour) for colour in colours]
+
+
+def bar(x, heights, value_labels=None, **options):
+    """
+    ax.bar layer, optionally with a text label on each bar.
+    """
+    return Layer("bar", (list(x), np.asarray(heights, dtype=float)), options,
+                 None if value_labels is None else list(value_labels))
+
+
+def vline(x, **options):
+    return Layer("axvline", (float(x),), options)
+
+
+def hline(y, **options):
+    return Layer("axhline", (float(y),), options)
+
+
+# ----------------------------------------------------------------------
+# Rendering
+# ----------------------------------------------------------------------
+def report_directory(name):
+    """
+    Output directory of one script's charts: $FINTECH_REPORT_DIR if set,
+    otherwise reports/<name> at the repo root (gitignored).
+    """
+    return Path(os.environ.get(REPORT_DIR_VARIABLE) or DEFAULT_REPORT_ROOT / name)
+
+
+def chart_workers(default=None):
+    """
+    Chart rendering processes: $FINTECH_CHART_WORKERS if set, otherwise
+    `default`, otherwise one per CPU.
+    """
+    value = os.environ.get(WORKERS_VARIABLE)
+    if value:
+        return int(value)
+    return default or os.cpu_count() or 1
+
+
+def _draw(ax, panel):
+    for layer in panel.layers:
+        drawn = getattr(ax, layer.method)(*layer.args, **layer.options)
+        if layer.bar_labels is not None:
+            ax.bar_label(drawn, labels=layer.bar_labels, fontweight="bold")
+    if panel.title:
+        ax.set_title(panel.title)
+    if panel.xlabel:
+        ax.set_xlabel(panel.xlabel)
+    if panel.ylabel:
+        ax.set_ylabel(panel.ylabel)
+    if panel.grid is not None:
+        ax.grid(True, **panel.grid)
+    if panel.legend:
+        ax.legend()
+    if panel.xtick_rotation is not None:
+        ax.tick_params(axis="x", labelrotation=panel.xtick_rotation)
+
+
+def render_chart(chart, output_dir):
+    """
+    Draw one chart on an Agg canvas and save it; returns the file path.
+    No pyplot state is touched, so this is safe in any process or thread.
+    """
+    figure = Figure(figsize=chart.figsize, dpi=chart.dpi)
+    FigureCanvasAgg(figure)
+    axes = figure.subplots(*chart.shape, squeeze=False).ravel()
+    for ax, panel in zip(axes, chart.panels):
+        _draw(ax, panel)
+    figure.tight_layout()
+    path = Path(output_dir) / chart.filename
+    figure.savefig(path, bbox_inches="tight")
+    return path
+
+
+def render(charts, output_dir, workers=None):
+    """
+    Render every chart into output_dir (created if needed) and return the
+    file paths in order. workers > 1 renders in a process pool.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    charts = list(charts)
+    if workers and workers > 1 and len(charts) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(charts))) as executor:
+            return list(executor.map(render_chart, charts, [output_dir] * len(charts)))
+    return [render_chart(chart, output_dir) for chart in charts]
@@ -0,0 +1,197 @@
+"""
+Incremental daily / weekly / monthly rollups of a transaction CSV.
+
+Financial Time Series/FinancialTime_Series.py resamples the whole file every
+time it runs. RollupStore instead keeps sum and count buckets per day, week
+(ending Sunday, like resample("W")) and month end (like resample("ME")) on
+disk, together with the byte offset of the source file already absorbed.
+refresh() only parses the rows appended since the last run, and query()
+answers from the buckets without touching the raw transactions.
+
+If the source file was rewritten rather than appended to (it shrank, or the
+first or last SIGNATURE_BYTES of the part already absorbed changed) the store
+is rebuilt from scratch. Edits in the middle of a large absorbed part, away
+from both ends, are not detected.
+
+A last line without a trailing newline may still be being written, so it is
+left for the next refresh, and absorbed then if the file has not grown in
+between. If that line is continued later the store is rebuilt.
+"""
+
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from fintech import instrumentation
+
+FREQUENCIES = ("D", "W", "ME")
+# Bytes hashed from the start and from the end of the absorbed part of the
+# source, to tell an append from a rewrite
+SIGNATURE_BYTES = 65536
+
+
+def _bucket(days, freq):
+    """
+    resample() bin label for each day.
+    """
+    if freq == "D":
+        return days
+    if freq == "W":
+        return days + pd.to_timedelta(6 - days.dayofweek, unit="D")
+    if freq == "ME":
+        return days + pd.offsets.MonthEnd(0)
+    raise ValueError(f"Unsupported frequency: {freq}")
+
+
+def _signature(path, offset):
+    """
+    Hash of the first and the last SIGNATURE_BYTES of path[:offset].
+    """
+    digest = hashlib.sha1()
+    with open(path, "rb") as handle:
+        head = handle.read(min(offset, SIGNATURE_BYTES))
+        digest.update(head)
+        tail_start = max(len(head), offset - SIGNATURE_BYTES)
+        handle.seek(tail_start)
+        digest.update(handle.read(offset - tail_start))
+    return digest.hexdigest()
+
+
+class RollupStore:
+    """
+    Persisted sum / count buckets for one transaction file.
+
+    store = RollupStore("financial_time_series.csv", date_format="%d-%m-%Y %H:%M")
+    store.refresh()
+    weekly_average = store.query("W")["mean"]
+    """
+
+    def __init__(self, source, directory=None, date_column="date", value_column="amount",
+                 date_format=None, dayfirst=False):
+        self.source = Path(source)
+        self.directory = Path(directory or self.source.with_name(self.source.name + ".rollups"))
+        self.date_column = date_column
+        self.value_column = value_column
+        self.date_format = date_format
+        self.dayfirst = dayfirst
+        self._load()
+
+    def _empty(self):
+        self.offset = 0
+        self.signature = None
+        self.size = None
+        self.header = None
+        self.buckets = {freq: pd.DataFrame({"sum": pd.Series(dtype=float),
+                                            "count": pd.Series(dtype="int64")},
+                                           index=pd.DatetimeIndex([], name=self.date_column))
+                        for freq in FREQUENCIES}
+
+    def _load(self):
+        self._empty()
+        meta_path = self.directory / "meta.json"
+        if not meta_path.exists():
+            return
+        meta = json.loads(meta_path.read_text())
+        self.offset, self.header = meta["offset"], meta["header"]
+        # Stores from before the tail signature have no "size"; their old
+        # signature will not match, so they are rebuilt once
+        self.signature, self.size = meta["signature"], meta.get("size")
+        with np.load(self.directory / "buckets.npz") as stored:
+            for freq in FREQUENCIES:
+                index = pd.DatetimeIndex(stored[f"{freq}_date"], name=self.date_column)
+                self.buckets[freq] = pd.DataFrame({"sum": stored[f"{freq}_sum"],
+                                                   "count": stored[f"{freq}_count"]}, index=index)
+
+    def _save(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        arrays = {}
+        for freq, buckets in self.buckets.items():
+            arrays[f"{freq}_date"] = buckets.index.values.astype("datetime64[ns]")
+            arrays[f"{freq}_sum"] = buckets["sum"].to_numpy()
+            arrays[f"{freq}_count"] = buckets["count"].to_numpy()
+        # Write then rename so a crash never leaves buckets and offset out of step
+        temporary = self.directory / "buckets.tmp.npz"
+        np.savez(temporary, **arrays)
+        os.replace(temporary, self.directory / "buckets.npz")
+        meta = {"offset": self.offset, "header": self.header,
+                "signature": self.signature, "size": self.size}
+        (self.directory / "meta.json").write_text(json.dumps(meta))
+
+    def _absorb(self, text):
+        positions = [self.header.index(self.date_column), self.header.index(self.value_column)]
+        rows = pd.read_csv(io.BytesIO(text), header=None, usecols=positions)
+        rows.columns = [self.header[i] for i in sorted(positions)]
+        dates = pd.to_datetime(rows[self.date_column], format=self.date_format, dayfirst=self.dayfirst)
+        days = pd.DatetimeIndex(dates).normalize()
+        values = rows[self.value_column].astype(float)
+
+        for freq in FREQUENCIES:
+            grouped = values.groupby(_bucket(days, freq)).agg(["sum", "count"])
+            merged = self.buckets[freq].add(grouped, fill_value=0)
+            merged["count"] = merged["count"].astype("int64")
+            merged.index.name = self.date_column
+            self.buckets[freq] = merged.sort_index()
+
+    def _line_extended(self):
+        """
+        True if a last line absorbed without its newline has since been
+        continued, so the row already counted was incomplete.
+        """
+        with open(self.source, "rb") as handle:
+            handle.seek(self.offset - 1)
+            around = handle.read(2)
+        return len(around) == 2 and around[0] not in b"\r\n" and around[1] not in b"\r\n"
+
+    def refresh(self):
+        """
+        Absorb the rows appended to the source since the last refresh.
+        Returns the number of new bytes read.
+        """
+        size = self.source.stat().st_size
+        if self.header is not None:
+            # Already absorbed bytes must be unchanged, otherwise start again
+            rewritten = size < self.offset or _signature(self.source, self.offset) != self.signature
+            if rewritten or self._line_extended():
+                self._empty()
+
+        with open(self.source, "rb") as handle:
+            if self.header is None:
+                header_line = handle.readline()
+                self.header = header_line.decode().rstrip("\r\n").split(",")
+                self.offset = len(header_line)
+            handle.seek(self.offset)
+            text = handle.read()
+
+        # Only whole lines: a last line without a newline may be half written, so
+        # it waits for the next refresh, unless the file has not grown since the last one
+        if size != self.size:
+            text = text[:text.rfind(b"\n") + 1]
+        if text.strip():
+            with instrumentation.stage("absorb"):
+                self._absorb(text)
+        self.offset += len(text)
+        self.size = size
+        self.signature = _signature(self.source, self.offset)
+        self._save()
+        return len(text)
+
+    def query(self, freq="D", start=None, end=None):
+        """
+        sum / count / mean per bucket, with empty buckets filled in like resample().
+        Cost is proportional to the number of buckets, not transactions.
+        """
+        buckets = self.buckets[freq]
+        if buckets.empty:
+            return buckets.assign(mean=pd.Series(dtype=float))
+        full = pd.date_range(buckets.index[0], buckets.index[-1],
+                             freq="W-SUN" if freq == "W" else freq, name=self.date_column)
+        result = buckets.reindex(full, fill_value=0)
+        result["count"] = result["count"].astype("int64")
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result["mean"] = result["sum"] / result["count"].where(result["count"] > 0)
+        return result.loc[start:end]
@@ -0,0 +1,212 @@
+"""
+Persisted linear scoring models for the ML notebooks.
+
+The notebooks fit LinearRegression on pd.get_dummies(...) columns (ML3 also
+on StandardScaler output) and then score a new file by calling get_dummies
+again, which gives a different column layout whenever the new file has a
+different set of categories. ScoringModel freezes everything needed to
+score into one artifact:
+
+  - the numeric input columns, in order
+  - the category vocabulary of every one-hot encoded column
+  - the coefficients, with a fitted StandardScaler folded into them
+
+    artifact = ScoringModel.from_fitted(model, X.columns, categorical_cols, scaler)
+    artifact.save("loan_model.npz")
+    ScoringModel.load("loan_model.npz").score_csv("new.csv", "scored.csv")
+
+Scoring is X_numeric @ w plus, per categorical column, the coefficient of
+the row's category looked up through its code in the fixed vocabulary,
+which is the one-hot dot product without building the dummy columns.
+Categories that were not seen in training contribute nothing, as an
+all-False dummy row would. Files are scored in chunks, so their size is
+not limited by memory.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from fintech import instrumentation
+from fintech.encoding import CategoricalEncoder
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+
+def _raw_coefficients(model, scaler=None):
+    # w . (x - mean) / scale + b  ==  (w / scale) . x + (b - w . mean / scale)
+    coefficients = np.asarray(model.coef_, dtype=float).ravel()
+    intercept = float(np.ravel(model.intercept_)[0])
+    if scaler is not None:
+        coefficients = coefficients / np.where(scaler.scale_ == 0, 1.0, scaler.scale_)
+        # StandardScaler(with_mean=False), needed for sparse input, only divides
+        if getattr(scaler, "with_mean", True):
+            intercept -= coefficients @ scaler.mean_
+    return coefficients, intercept
+
+
+class ScoringModel:
+    """
+    numeric       numeric input columns, in the order of `weights`
+    categories    {column: [category, ...]} vocabulary of each one-hot column
+    weights       coefficients of the numeric columns (on the raw scale)
+    category_weights  {column: coefficient per category}
+    intercept     constant term
+    """
+
+    def __init__(self, numeric, categories, weights, category_weights, intercept, target=None):
+        self.numeric = list(numeric)
+        self.encoder = CategoricalEncoder(categories=categories)
+        self.categories = self.encoder.categories
+        self.weights = np.asarray(weights, dtype=float)
+        self.category_weights = {column: np.asarray(values, dtype=float)
+                                 for column, values in category_weights.items()}
+        self.intercept = float(intercept)
+        self.target = target
+
+    @classmethod
+    def from_fitted(cls, model, columns, categorical=(), scaler=None, target=None, data=None):
+        """
+        Build from a fitted linear model (anything with coef_ and intercept_)
+        trained on get_dummies(columns=categorical) output with these
+        `columns`, optionally after a fitted StandardScaler.
+
+        Dummy columns are assigned to the longest categorical column name
+        they start with, so "Status_Code_A" belongs to "Status_Code", not
+        "Status". The categories are parsed from the names and are strings;
+        pass the training frame as `data` to map them back to the column's
+        own values (e.g. integers). Without it, predict() refuses numeric
+        values in those columns rather than scoring them as unseen.
+        """
+        columns = list(columns)
+        coefficients, intercept = _raw_coefficients(model, scaler)
+        numeric, weights = [], []
+        categories = {column: [] for column in categorical}
+        category_weights = {column: [] for column in categorical}
+        longest_first = sorted(categorical, key=len, reverse=True)
+        for name, coefficient in zip(columns, coefficients):
+            owner = next((column for column in longest_first if name.startswith(f"{column}_")), None)
+            if owner is None:
+                numeric.append(name)
+                weights.append(coefficient)
+            else:
+                categories[owner].append(name[len(owner) + 1:])
+                category_weights[owner].append(coefficient)
+
+        if data is not None:
+            for column, names in categories.items():
+                # get_dummies names a dummy f"{column}_{value}", so str(value) finds the value
+                values = {str(value): value for value in data[column].dropna().unique().tolist()}
+                unmatched = [name for name in names if name not in values]
+                if unmatched:
+                    raise ValueError(f"Dummy columns of {column!r} not found in data: {unmatched}")
+                categories[column] = [values[name] for name in names]
+        return cls(numeric, categories, weights, category_weights, intercept, target)
+
+    @classmethod
+    def from_encoder(cls, model, encoder, numeric=(), scaler=None, target=None):
+        """
+        Build from a linear model fitted on encoder.transform(frame, numeric).
+        The coefficients are split by position, so no column names are
+        parsed and the categories keep their original types.
+        """
+        numeric = list(numeric)
+        coefficients, intercept = _raw_coefficients(model, scaler)
+        category_weights, offset = {}, len(numeric)
+        for column, values in encoder.categories.items():
+            category_weights[column] = coefficients[offset:offset + len(values)]
+            offset += len(values)
+        return cls(numeric, encoder.categories, coefficients[:len(numeric)], category_weights,
+                   intercept, target)
+
+    # ------------------------------------------------------------------
+    # Artifact
+    # ------------------------------------------------------------------
+    def save(self, path):
+        """
+        One .npz file: coefficient arrays plus the layout as JSON, no pickle.
+        """
+        layout = {"numeric": self.numeric, "categories": self.categories,
+                  "intercept": self.intercept, "target": self.target}
+        arrays = {f"category_{i}": self.category_weights[column]
+                  for i, column in enumerate(self.categories)}
+        with open(path, "wb") as handle:
+            np.savez(handle, layout=np.array(json.dumps(layout)), weights=self.weights, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as stored:
+            layout = json.loads(str(stored["layout"]))
+            category_weights = {column: stored[f"category_{i}"]
+                                for i, column in enumerate(layout["categories"])}
+            return cls(layout["numeric"], layout["categories"], stored["weights"],
+                       category_weights, layout["intercept"], layout["target"])
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+    @property
+    def input_columns(self):
+        return self.numeric + list(self.categories)
+
+    def dtypes(self):
+        """
+        read_csv dtypes that parse categorical columns straight to codes.
+        """
+        return self.encoder.dtypes()
+
+    def predict(self, frame):
+        """
+        Predictions for a frame with the raw input columns (not dummies).
+        """
+        missing = [column for column in self.input_columns if column not in frame]
+        if missing:
+            raise KeyError(f"Missing input columns: {missing}")
+        self._check_category_types(frame)
+        prediction = frame[self.numeric].to_numpy(dtype=float) @ self.weights + self.intercept
+        codes = self.encoder.codes(frame)
+        for column in self.categories:
+            # UNKNOWN_CODE (-1: unseen or missing category) looks up the appended 0
+            prediction += np.append(self.category_weights[column], 0.0)[codes[column].to_numpy()]
+        return prediction
+
+    def _check_category_types(self, frame):
+        # Numbers never equal the string categories parsed from dummy names and
+        # would all score as unseen, so fail instead of returning 0 contributions
+        for column, values in self.categories.items():
+            if not values or not all(isinstance(value, str) for value in values):
+                continue
+            dtype = frame[column].dtype
+            if isinstance(dtype, pd.CategoricalDtype):
+                dtype = dtype.categories.dtype
+            if pd.api.types.is_numeric_dtype(dtype):
+                raise TypeError(f"Column {column!r} holds {dtype} values but the model's categories are "
+                                "strings; build the model with from_fitted(..., data=training_frame) "
+                                "or from_encoder()")
+
+    def score_chunks(self, chunks, output_column="prediction", transform=None):
+        """
+        Add `output_column` to every frame of an iterable of chunks.
+        """
+        for chunk in chunks:
+            with instrumentation.stage("predict"):
+                prediction = self.predict(chunk)
+            chunk[output_column] = transform(prediction) if transform is not None else prediction
+            yield chunk
+
+    def score_csv(self, source, destination, output_column="prediction", transform=None,
+                  chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Stream a CSV through the model and write it with the predictions added.
+        Returns the number of rows scored.
+        """
+        reader = pd.read_csv(source, dtype=self.dtypes(), chunksize=chunk_size)
+        rows, header = 0, True
+        chunks = instrumentation.iterate(reader, "read")
+        for chunk in self.score_chunks(chunks, output_column, transform):
+            with instrumentation.stage("write"):
+                chunk.to_csv(destination, mode="w" if header else "a", header=header, index=False)
+            rows += len(chunk)
+            header = False
+        return rows
@@ -0,0 +1,331 @@
+"""
+Batch resume crawler for the skills extractor.
+
+Batch version of Beautiful Soup/Beautiful soup 1st.ipynb, which fetches one
+resume page and runs extract_skills(soup). SkillsCrawler takes a list of
+URLs and
+
+  - fetches them through a thread pool sharing one pooled requests.Session,
+    with a per-host limit on requests per second
+  - keeps the raw HTML in a cache directory: a page is revalidated with its
+    ETag / Last-Modified and a 304 reuses the cached copy, and bodies are
+    stored by content hash, so identical pages are stored and parsed once
+  - parses with lxml, in a process pool when workers > 1, as soon as each
+    page arrives
+  - writes every extracted skill to one CSV or Parquet file; pages that
+    cannot be fetched are logged (logger "fintech.skills") and counted in
+    stats["failed"]
+
+    skills = SkillsCrawler(rate_limit=2).crawl(urls, "extracted_skills.csv")
+
+extract_skills() applies the notebook's three strategies (skills id/class,
+heading followed by lists, list under a skills heading) with XPath queries
+on the lxml tree instead of repeated soup.find scans.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import pandas as pd
+from lxml import etree, html
+
+from fintech.http_client import get_with_retry, pooled_session
+
+SKILL_COLUMNS = ["URL", "Skill_Number", "Skill"]
+DEFAULT_CACHE = Path(__file__).resolve().parents[1] / ".skills_cache"
+
+logger = logging.getLogger(__name__)
+
+HEADINGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+_LOWER = "translate({}, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')"
+_ANY_HEADING = " or ".join(f"self::{name}" for name in HEADINGS)
+SKILL_ID_XPATH = f"//*[contains({_LOWER.format('@id')}, 'skill')]"
+SKILL_CLASS_XPATH = f"//*[contains({_LOWER.format('@class')}, 'skill')]"
+HEADING_XPATH = f"//*[{_ANY_HEADING}]"
+LIST_XPATH = "//ul | //ol"
+NEAREST_HEADING_XPATH = f"(ancestor::*[{_ANY_HEADING}] | preceding::*[{_ANY_HEADING}])[last()]"
+
+# Parser shared by every parse in a process; comments are dropped like get_text() does
+_PARSER = html.HTMLParser(remove_comments=True)
+# Text pieces under an element, skipping script / style like BeautifulSoup.get_text
+_TEXT = etree.XPath(".//text()[not(ancestor::script or ancestor::style)]", smart_strings=False)
+
+
+# ----------------------------------------------------------------------
+# Extraction
+# ----------------------------------------------------------------------
+def _text(element):
+    """
+    get_text(strip=True): every text piece stripped and joined.
+    """
+    return "".join(piece.strip() for piece in _TEXT(element))
+
+
+def _lines(element):
+    """
+    get_text(separator="\\n", strip=True).split("\\n") without empty lines.
+    """
+    text = "\n".join(piece.strip() for piece in _TEXT(element) if piece.strip())
+    return [line.strip() for line in text.split("\n") if line.strip()]
+
+
+def extract_skills(document):
+    """
+    Skills listed on a resume page, from its HTML (str / bytes) or an lxml tree.
+    """
+    tree = html.fromstring(document, parser=_PARSER) if isinstance(document, (str, bytes)) else document
+    skills = []
+
+    # Strategy 1: the first element with 'skill' in its id, else in its class
+    section = next(iter(tree.xpath(SKILL_ID_XPATH) or tree.xpath(SKILL_CLASS_XPATH)), None)
+    if section is not None:
+        for item in section.xpath(".//li | .//span | .//p"):
+            text = _text(item)
+            if text:
+                skills.append(text)
+        if not skills:
+            skills = _lines(section)
+
+    # Strategy 2: lists and paragraphs after a heading that mentions skills
+    if not skills:
+        for heading in tree.xpath(HEADING_XPATH):
+            if "skill" not in "".join(_TEXT(heading)).lower():
+                continue
+            for sibling in heading.itersiblings():
+                if sibling.tag in HEADINGS:
+                    break
+                if sibling.tag in ("ul", "ol"):
+                    skills.extend(_text(item) for item in sibling.iter("li"))
+                elif sibling.tag in ("p", "div"):
+                    text = _text(sibling)
+                    if text:
+                        skills.append(text)
+            if skills:
+                break
+
+    # Strategy 3: the first list whose nearest heading above mentions skills
+    if not skills:
+        for lst in tree.xpath(LIST_XPATH):
+            heading = lst.xpath(NEAREST_HEADING_XPATH)
+            if heading and "skill" in "".join(_TEXT(heading[0])).lower():
+                skills.extend(_text(item) for item in lst.iter("li"))
+                break
+
+    return skills
+
+
+def _parse(body):
+    return extract_skills(body) if body.strip() else []
+
+
+# ----------------------------------------------------------------------
+# Fetching
+# ----------------------------------------------------------------------
+class _HostLimiter:
+    """
+    Spaces requests to one host at least 1 / rate seconds apart.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_time = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        # Reserve a slot under the lock, sleep outside it
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_time)
+            self.next_time = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class HtmlCache:
+    """
+    Raw HTML on disk: <directory>/pages/<sha256>.html holds each distinct
+    body once and <directory>/urls/<sha1 of url>.json the URL's ETag,
+    Last-Modified and body hash.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE):
+        self.directory = Path(directory)
+        (self.directory / "pages").mkdir(parents=True, exist_ok=True)
+        (self.directory / "urls").mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, url):
+        return self.directory / "urls" / (hashlib.sha1(url.encode()).hexdigest() + ".json")
+
+    def _write(self, path, data):
+        # Write then rename, so a concurrent reader never sees half a file
+        temporary = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temporary.write_bytes(data)
+        os.replace(temporary, path)
+
+    def entry(self, url):
+        path = self._entry_path(url)
+        if not path.exists():
+            return None
+        entry = json.loads(path.read_text())
+        return entry if (self.directory / "pages" / f"{entry['sha256']}.html").exists() else None
+
+    def body(self, entry):
+        return (self.directory / "pages" / f"{entry['sha256']}.html").read_bytes()
+
+    def store(self, url, body, headers):
+        digest = hashlib.sha256(body).hexdigest()
+        page = self.directory / "pages" / f"{digest}.html"
+        if not page.exists():
+            self._write(page, body)
+        entry = {"url": url, "sha256": digest, "etag": headers.get("ETag"),
+                 "last_modified": headers.get("Last-Modified")}
+        self._write(self._entry_path(url), json.dumps(entry).encode())
+        return entry
+
+
+class SkillsCrawler:
+    """
+    Fetches resume pages concurrently and extracts their skills.
+
+    max_concurrency  requests in flight at once (also the connection pool size)
+    rate_limit       requests per second to any one host (None for no limit)
+    workers          parse processes; None or 1 parses in this process
+    cache_dir        HTML cache directory (None to disable the cache)
+    retries          extra attempts after a failed request
+    backoff          first retry delay in seconds, doubled (and jittered) on every retry
+    """
+
+    def __init__(self, max_concurrency=16, rate_limit=5, workers=None, cache_dir=DEFAULT_CACHE,
+                 retries=3, backoff=0.5, timeout=10):
+        self.max_concurrency = max_concurrency
+        self.rate_limit = rate_limit
+        self.workers = workers
+        self.cache = HtmlCache(cache_dir) if cache_dir is not None else None
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+        # One session for every request so TCP/TLS connections are reused
+        self.session = pooled_session(max_concurrency)
+
+        self._limiters = {}
+        self._lock = threading.Lock()
+        self.stats = {"fetched": 0, "not_modified": 0, "failed": 0}
+
+    def _limiter(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._limiters:
+                self._limiters[host] = _HostLimiter(self.rate_limit)
+            return self._limiters[host]
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _request(self, url, headers):
+        # Every attempt, retries included, waits for the host's rate limit
+        return get_with_retry(self.session, url, self.retries, self.backoff, self.timeout,
+                              before_attempt=self._limiter(url).wait, headers=headers)
+
+    def fetch(self, url):
+        """
+        (body, content hash) of one page, revalidating a cached copy.
+        """
+        entry = self.cache.entry(url) if self.cache else None
+        headers = {}
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = self._request(url, headers)
+        if response.status_code == 304 and entry:
+            self._count("not_modified")
+            return self.cache.body(entry), entry["sha256"]
+        self._count("fetched")
+        body = response.content
+        if self.cache:
+            return body, self.cache.store(url, body, response.headers)["sha256"]
+        return body, hashlib.sha256(body).hexdigest()
+
+    def _fetch_or_report(self, url):
+        try:
+            return url, *self.fetch(url)
+        except Exception as error:
+            self._count("failed")
+            logger.warning("Error fetching %s: %s", url, error)
+            return url, None, None
+
+    def crawl(self, urls, destination=None):
+        """
+        DataFrame with SKILL_COLUMNS, one row per skill, URLs in the order
+        given; pages that cannot be fetched are left out. Written to
+        `destination` too (.parquet, otherwise CSV) when given.
+        """
+        urls = list(dict.fromkeys(url.strip() for url in urls if url.strip()))
+        skills = {}
+        parsed = {}  # content hash -> skills, so identical pages parse once
+        urls_by_page = {}  # content hash -> URLs serving that page
+        pool = ProcessPoolExecutor(self.workers) if self.workers and self.workers > 1 else None
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                parses = []
+                for done in as_completed([executor.submit(self._fetch_or_report, url) for url in urls]):
+                    url, body, digest = done.result()
+                    if body is None:
+                        continue
+                    if digest in urls_by_page:
+                        urls_by_page[digest].append(url)
+                        continue
+                    urls_by_page[digest] = [url]
+                    if pool is None:
+                        parsed[digest] = _parse(body)
+                    else:
+                        # Parse while the remaining pages are still downloading
+                        parses.append((digest, pool.submit(_parse, body)))
+                for digest, future in parses:
+                    parsed[digest] = future.result()
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        for digest, page_urls in urls_by_page.items():
+            for url in page_urls:
+                skills[url] = parsed[digest]
+        rows = [(url, number, skill) for url in urls if url in skills
+                for number, skill in enumerate(skills[url], 1)]
+        result = pd.DataFrame(rows, columns=SKILL_COLUMNS)
+        if destination is not None:
+            write_skills(result, destination)
+        return result
+
+    def close(self):
+        self.session.close()
+
+
+def write_skills(skills, destination):
+    destination = Path(destination)
+    if destination.suffix == ".parquet":
+        skills.to_parquet(destination, index=False)
+    else:
+        skills.to_csv(destination, index=False)
+
+
+def crawl_skills(urls, destination=None, **options):
+    """
+    One-off crawl with a temporary SkillsCrawler.
+    """
+    crawler = SkillsCrawler(**options)
+    try:
+        return crawler.crawl(urls, destination)
+    finally:
+        crawler.close()
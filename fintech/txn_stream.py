@@ -0,0 +1,216 @@
+"""
+Streaming, out-of-core version of the Data Cleaning/2nd.py analysis.
+
+The transaction file is read once in chunks. Each chunk is validated, folded
+into running daily totals and scanned for suspicious transactions, which are
+handed to a sink straight away. The rows themselves are never all in memory:
+the totals grow with the number of distinct days and the suspicious rows go
+to the sink. The duplicate-id check is the exception: SeenIds keeps one
+8-byte key per distinct transaction id (about 800 MB for 10^8 ids, plus a
+copy of the largest run while runs merge), so its memory grows with the
+number of rows. For files whose ids do not fit, skip that check with
+check_duplicates=False and run dedup.find_duplicates(path, method="bloom")
+or method="partition" instead, which bound memory by the Bloom filter or
+partition size.
+
+    summary = analyse_transactions("bank_transactions.csv", sink=CsvSink("suspicious.csv"))
+
+Duplicate ids are found in the same pass. Ids that are not "TXN1000"-style
+are compared by hash, so when such ids look duplicated the file is read once
+more (ids only) by dedup.find_duplicates to confirm them exactly.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from fintech import dedup, ingest, instrumentation
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+SUSPICIOUS_AMOUNT = 8000
+
+
+def large_amount(chunk, threshold=SUSPICIOUS_AMOUNT):
+    """
+    Default suspicious rule from 2nd.py: amount above a fixed threshold.
+    """
+    return chunk["amount"] > threshold
+
+
+class ExcelSink:
+    """
+    Streams suspicious transactions into an .xlsx file chunk by chunk
+    (openpyxl write-only mode, imported on first use), so the rows are
+    never all in memory. Call close() to finish the file. An .xlsx sheet
+    holds at most 1,048,576 rows; use CsvSink for bigger outputs.
+    """
+
+    def __init__(self, path, sheet_name="Sheet1"):
+        self.path = path
+        self.sheet_name = sheet_name
+        self._workbook = None
+        self._sheet = None
+
+    def __call__(self, rows):
+        if self._workbook is None:
+            from openpyxl import Workbook
+
+            self._workbook = Workbook(write_only=True)
+            self._sheet = self._workbook.create_sheet(self.sheet_name)
+            self._sheet.append([str(column) for column in rows.columns])
+        # Missing values become empty cells, as DataFrame.to_excel writes them
+        values = rows.astype(object).where(rows.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            self._sheet.append(row)
+
+    def close(self):
+        if self._workbook is None:
+            # Nothing was written: still produce an (empty) sheet
+            pd.DataFrame().to_excel(self.path, sheet_name=self.sheet_name, index=False)
+            return
+        self._workbook.save(self.path)
+        self._workbook = self._sheet = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+class CsvSink:
+    """
+    Appends suspicious transactions to a CSV file chunk by chunk.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._header = True
+
+    def __call__(self, rows):
+        rows.to_csv(self.path, mode="w" if self._header else "a", header=self._header, index=False)
+        self._header = False
+
+
+class SeenIds:
+    """
+    Transaction ids seen so far, used for the duplicate check across chunks.
+    Ids are kept as compact integer keys (see fintech/dedup.py), not strings.
+    Non "TXN1000"-style ids are hashed, so for those a duplicate is only a
+    candidate until dedup.find_duplicates confirms it (self.exact is False).
+    """
+
+    def __init__(self):
+        self.encoder = dedup.IdEncoder()
+        self.keys = dedup.KeySet()
+        self._reported = set()
+
+    @property
+    def exact(self):
+        return self.encoder.exact
+
+    def add(self, ids):
+        """
+        Record a chunk of ids and return the ones that were already seen,
+        each id only the first time it turns up again.
+        """
+        ids = pd.Series(ids).reset_index(drop=True)
+        keys = self.encoder.encode(ids)
+        duplicates = self.keys.add(keys)
+        found = [value for value in ids[np.isin(keys, duplicates)].unique() if value not in self._reported]
+        self._reported.update(found)
+        return sorted(found)
+
+
+@dataclass
+class TransactionSummary:
+    rows: int = 0
+    min_amount: float = np.inf
+    min_balance: float = np.inf
+    duplicate_ids: list = field(default_factory=list)
+    suspicious_count: int = 0
+    daily_total: pd.Series = None
+
+    @property
+    def errors(self):
+        """
+        Validation messages, same checks and wording as 2nd.py.
+        """
+        errors = []
+        if self.min_amount <= 0:
+            errors.append("Invalid Transaction amount found")
+        if self.duplicate_ids:
+            errors.append("Duplicate transaction found")
+        if self.min_balance <= 0:
+            errors.append("Negative balance found")
+        return errors
+
+    @property
+    def daily_summary(self):
+        # Same shape as data.set_index("date").resample("D")["amount"].sum()
+        return self.daily_total.resample("D").sum()
+
+    @property
+    def monthly_summary(self):
+        return self.daily_total.resample("ME").sum()
+
+
+def analyse_transactions(path, chunk_size=DEFAULT_CHUNK_SIZE, sink=None,
+                         is_suspicious=large_amount, date_format=None, schema=None, check_duplicates=True):
+    """
+    One pass over a transaction CSV: validation, daily/monthly totals and
+    suspicious transactions (passed to `sink` chunk by chunk).
+    Chunks are read with the file's ingest schema (explicit date format,
+    categorical ids and channels); `date_format` is used for files without one.
+    check_duplicates=False skips the duplicate-id check, whose memory grows
+    with the number of ids (see the module docstring).
+    """
+    schema = schema or ingest.schema_for(path)
+    if not schema.dtypes:
+        schema = ingest.Schema(dtypes={"amount": "float64", "balance": "float64"})
+    summary = TransactionSummary()
+    seen = SeenIds() if check_duplicates else None
+    daily_parts = []
+
+    # Stages show up in the metrics of an active instrumentation.Recorder
+    for chunk in instrumentation.iterate(ingest.read_chunks(path, schema, chunk_size), "read"):
+        if not pd.api.types.is_datetime64_any_dtype(chunk["date"]):
+            chunk["date"] = pd.to_datetime(chunk["date"], format=date_format)
+
+        with instrumentation.stage("validate"):
+            summary.rows += len(chunk)
+            summary.min_amount = min(summary.min_amount, chunk["amount"].min())
+            summary.min_balance = min(summary.min_balance, chunk["balance"].min())
+            if seen is not None:
+                summary.duplicate_ids.extend(seen.add(chunk["transaction_id"]))
+
+        with instrumentation.stage("resample"):
+            daily_parts.append(chunk.groupby(chunk["date"].dt.floor("D"))["amount"].sum())
+            # Keep the partial totals small: fold them together every few chunks
+            if len(daily_parts) > 16:
+                daily_parts = [pd.concat(daily_parts).groupby(level=0).sum()]
+
+        with instrumentation.stage("suspicious"):
+            suspicious = chunk[is_suspicious(chunk)]
+            summary.suspicious_count += len(suspicious)
+            # Empty chunks are passed on too so a sink always sees the columns
+            if sink is not None:
+                sink(suspicious)
+
+    if summary.duplicate_ids and not seen.exact:
+        # Hashed ids can collide: keep only the duplicates an exact pass confirms
+        with instrumentation.stage("validate"):
+            confirmed = dedup.find_duplicates(path, "transaction_id", chunk_size=chunk_size)
+            summary.duplicate_ids = sorted(confirmed.index)
+    summary.duplicate_ids = sorted(summary.duplicate_ids)
+
+    if daily_parts:
+        with instrumentation.stage("resample"):
+            summary.daily_total = pd.concat(daily_parts).groupby(level=0).sum().sort_index()
+    else:
+        summary.daily_total = pd.Series(dtype=float, index=pd.DatetimeIndex([]))
+    summary.daily_total.index.name = "date"
+    summary.daily_total.name = "amount"
+    return summary
@@ -1,7 +1,12 @@
-import numpy as np
+import sys
+from pathlib import Path
+
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+HERE = Path(__file__).resolve().parent
+# Make the shared fintech package importable when run from this folder
+sys.path.insert(0, str(HERE.parent))
+from fintech import reports
 
 # Load the Haberman dataset
 df = pd.read_csv('haberman.csv')
@@ -15,8 +20,6 @@ df = pd.read_csv('haberman.csv')
 # print(df['Survival_status'].value_counts())
 
 print(df.head(20))
-# Create Bar Plot visualization
-plt.figure(figsize=(10, 6))
 
 # 1. Survival Status Distribution (Bar Plot)
 survival_counts = df['Survival_status'].value_counts()
@@ -43,28 +46,36 @@ print(Survived_no.describe())
 # plt.xlabel('Status')
 # # plt.grid(axis='y', alpha=0.3)
 
-# Bar Graph of Survived and not Survived
-plt.figure(figsize=(6, 4))
-sns.countplot(x="Survival_status", data=df)
-plt.title("Survived vs not survived")
-plt.ylabel("No. of Patients")
-plt.show()
-
-# Histogram of patient age distribution
-plt.figure(figsize=(8, 6))
-sns.histplot(x="patient_age", data=df,bins=10)
-plt.title("Patient age distribution")
-plt.show()
-
-# boxplot of Survival Status vs Age
-plt.figure(figsize=(8, 6))
-sns.boxplot(x="Survival_status", y="patient_age", data = df)
-plt.title("Survival Status vs Age")
-plt.show()
-
-# Density plot of age distribution
-plt.figure(figsize=(8, 6))
-sns.kdeplot(x="patient_age", data = df)
-plt.title("Age distribution")
-plt.show()
+# The charts are rendered headless (Agg) to PNG files by fintech/reports.py
+# into reports/graphs/ (or $FINTECH_REPORT_DIR), one process per CPU unless
+# $FINTECH_CHART_WORKERS is set
+REPORT_DIR = reports.report_directory("graphs")
+CHART_WORKERS = reports.chart_workers()
+status_counts = df["Survival_status"].value_counts()
+status_groups = df.groupby("Survival_status", sort=False)["patient_age"]
 
+charts = [
+    # Bar Graph of Survived and not Survived
+    reports.Chart("survival_counts.png", figsize=(6, 4), panels=[reports.Panel(
+        [reports.bar(status_counts.index, status_counts.values)],
+        title="Survived vs not survived", xlabel="Survival_status", ylabel="No. of Patients",
+    )]),
+    # Histogram of patient age distribution
+    reports.Chart("age_histogram.png", [reports.Panel(
+        [reports.histogram(df["patient_age"], bins=10, edgecolor="black")],
+        title="Patient age distribution", xlabel="patient_age", ylabel="Count",
+    )]),
+    # boxplot of Survival Status vs Age
+    reports.Chart("survival_vs_age.png", [reports.Panel(
+        [reports.Layer("boxplot", ([ages.to_numpy() for _, ages in status_groups],),
+                       {"tick_labels": list(status_groups.groups)})],
+        title="Survival Status vs Age", xlabel="Survival_status", ylabel="patient_age",
+    )]),
+    # Density plot of age distribution
+    reports.Chart("age_density.png", [reports.Panel(
+        [reports.density(df["patient_age"])],
+        title="Age distribution", xlabel="patient_age", ylabel="Density",
+    )]),
+]
+for path in reports.render(charts, REPORT_DIR, workers=CHART_WORKERS):
+    print(f"Chart saved to: {path}")